@@ -1,8 +1,16 @@
 if __name__ == "__main__":
     import signal
 
+    from sys import argv
+
+    from .cli import COMMANDS
+
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
-    from .lms import main
+    # Subcommands run headless, PyQt6 is only imported for the GUI
+    if len(argv) > 1 and argv[1] in COMMANDS:
+        from .cli import main
+    else:
+        from .lms import main
 
     exit(main())
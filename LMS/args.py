@@ -1,8 +1,8 @@
-from sys import argv
 from typing import Optional
 from argparse import ArgumentParser, Namespace
 
 from .config import CONFIG, config_load
+from .backend import BACKENDS
 
 class TypedArgumentParser(Namespace):
     config: Optional[str] = None
@@ -11,18 +11,31 @@ class TypedArgumentParser(Namespace):
     db: str = "LMS_DB"
     user: Optional[str] = None
     passwd: Optional[str] = None
+    pool_size: Optional[int] = None
+    backend: Optional[str] = None
+    query_stats: bool = False
 
-def argument_parser() -> None:
-    parser = ArgumentParser()
+def _needs_host() -> bool:
+    # --config and --backend decide whether --host is required, read them before the full parse
+    parser = ArgumentParser(add_help=False)
     parser.add_argument("--config", type=str)
-    parser.add_argument("--host", type=str, required=("--config" not in argv))
+    parser.add_argument("--backend", type=str)
+    args, _ = parser.parse_known_args()
+
+    return args.config is None and (args.backend or CONFIG.REMOTE.BACKEND) == "mysql"
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--config", type=str)
+    parser.add_argument("--host", type=str, required=_needs_host())
     parser.add_argument("--port", type=int)
     parser.add_argument("--db", type=str)
     parser.add_argument("--user", type=str)
     parser.add_argument("--passwd", type=str)
+    parser.add_argument("--pool-size", type=int)
+    parser.add_argument("--backend", type=str, choices=BACKENDS)
+    parser.add_argument("--query-stats", action="store_true")
 
-    args = parser.parse_args(namespace=TypedArgumentParser())
-
+def apply_arguments(args: TypedArgumentParser) -> None:
     if args.config is not None:
         config_load(args.config)
     else:
@@ -30,7 +43,23 @@ def argument_parser() -> None:
         CONFIG.REMOTE.PORT = args.port
         CONFIG.REMOTE.DATABASE = args.db
 
+    if args.backend is not None:
+        CONFIG.REMOTE.BACKEND = args.backend
+    if args.query_stats:
+        CONFIG.LMS.QUERY_STATS = True
+    if args.pool_size is not None:
+        CONFIG.REMOTE.POOL_SIZE = args.pool_size
     if args.user is not None:
         CONFIG.USER.USERNAME = args.user
     if args.passwd is not None:
         CONFIG.USER.PASSWORD = args.passwd
+
+def argument_parser(parser: Optional[ArgumentParser] = None) -> TypedArgumentParser:
+    if parser is None:
+        parser = ArgumentParser()
+
+    add_arguments(parser)
+    args = parser.parse_args(namespace=TypedArgumentParser())
+    apply_arguments(args)
+
+    return args
@@ -0,0 +1,63 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Awaitable, Callable, Iterable, Optional, Any
+
+from .config import CONFIG
+from .db_session import DBSession, Session
+from .lms_types import ExecuteResult
+
+class AsyncDBSession:
+    session: DBSession
+    executor: Optional[ThreadPoolExecutor]
+    lock: Lock
+
+    # init/close manage the shared pool, streams hold a connection between rows
+    BLOCKING_ONLY: tuple[str, ...] = (
+        "init", "close", "streamBook", "streamUser", "streamBorrowHistory",
+        "streamBookIsbn", "streamBorrowWithoutOpenHistory", "streamOpenHistoryWithoutBorrow", "streamReturnedBeforeBorrowed"
+    )
+
+    def __init__(self, session: DBSession) -> None:
+        self.session = session
+        self.executor = None
+        self.lock = Lock()
+
+    def _getExecutor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # More threads than pooled connections would only queue up in _getConnection
+                concurrency = min(CONFIG.REMOTE.ASYNC_CONCURRENCY or CONFIG.REMOTE.POOL_SIZE, CONFIG.REMOTE.POOL_SIZE)
+                self.executor = ThreadPoolExecutor(concurrency, thread_name_prefix="AsyncDBSession")
+            return self.executor
+
+    async def run(self, func: Callable[..., ExecuteResult[Any]], *args: Any, **kwargs: Any) -> ExecuteResult[Any]:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._getExecutor(), partial(func, *args, **kwargs))
+        except Exception as err:
+            return (False, str(err))
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[ExecuteResult[Any]]]:
+        method: Callable[..., ExecuteResult[Any]] = getattr(self.session, name)
+        if name.startswith("_") or name in self.BLOCKING_ONLY or not callable(method):
+            raise AttributeError(f"'{type(self).__name__}' has no awaitable '{name}'")
+
+        async def call(*args: Any, **kwargs: Any) -> ExecuteResult[Any]:
+            return await self.run(method, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def gather(self, name: str, calls: Iterable[tuple]) -> list[ExecuteResult[Any]]:
+        method = getattr(self, name)
+        return list(await asyncio.gather(*(method(*args) for args in calls)))
+
+    def close(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                self.executor = None
+
+AsyncSession = AsyncDBSession(Session)
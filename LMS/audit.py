@@ -0,0 +1,136 @@
+import os
+
+from sys import stdout, stderr
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from argparse import ArgumentParser
+from typing import Generator, Iterable, Optional
+
+from .args import argument_parser
+from .backend import Row
+from .config import CONFIG
+from .db_session import Session
+from .export import WRITERS
+from .isbn import check_isbn10, check_isbn13
+
+# (check, table, row id, detail)
+Finding = tuple[str, str, int, str]
+
+FINDING_COLUMNS: list[str] = ["check", "table", "rowId", "detail"]
+
+def _check_digit(value: int) -> str:
+    return "X" if value == 10 else str(value)
+
+def check_isbn_chunk(rows: list[Row]) -> list[Finding]:
+    # Runs in a worker process, only the rows that fail are sent back
+    import numpy
+
+    bookIds = [row[0] for row in rows]
+    isbn10 = [row[1] for row in rows]
+    isbn13 = [row[2] for row in rows]
+    result10 = check_isbn10(isbn10)
+    result13 = check_isbn13(isbn13)
+    present10 = numpy.array([value is not None for value in isbn10], dtype=bool)
+    present13 = numpy.array([value is not None for value in isbn13], dtype=bool)
+
+    findings: list[Finding] = []
+    for i in numpy.flatnonzero(present10 & ~result10.wellFormed):
+        findings.append(("isbn10-format", "Book", bookIds[i], f"isbn10 {isbn10[i]!r} is not 9 digits and a check digit"))
+    for i in numpy.flatnonzero(result10.wellFormed & ~result10.valid):
+        findings.append(("isbn10-check-digit", "Book", bookIds[i], f"isbn10 {isbn10[i]} should end in {_check_digit(result10.checkDigit[i])}"))
+    for i in numpy.flatnonzero(present13 & ~result13.wellFormed):
+        findings.append(("isbn13-format", "Book", bookIds[i], f"isbn13 {isbn13[i]!r} is not 13 digits"))
+    for i in numpy.flatnonzero(result13.wellFormed & ~result13.valid):
+        findings.append(("isbn13-check-digit", "Book", bookIds[i], f"isbn13 {isbn13[i]} should end in {result13.checkDigit[i]}"))
+
+    # Both are valid on their own but name different editions
+    stored13 = numpy.array(["" if value is None else value for value in isbn13], dtype="U13")
+    for i in numpy.flatnonzero(result10.valid & result13.valid & (result10.converted != stored13)):
+        findings.append(("isbn-pair", "Book", bookIds[i], f"isbn10 {isbn10[i]} is {result10.converted[i]} as ISBN-13, not {isbn13[i]}"))
+
+    return sorted(findings, key=lambda finding: finding[2])
+
+def _chunks(rows: Iterable[Row], size: int) -> Generator[list[Row], None, None]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+def isbn_findings(chunk_size: int, workers: int) -> Generator[Finding, None, None]:
+    _, rows = Session.streamBookIsbn()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Reading stops while this many chunks are in flight, so memory stays bounded on any table size
+        pending: deque[Future[list[Finding]]] = deque()
+        for chunk in _chunks(rows, chunk_size):
+            pending.append(pool.submit(check_isbn_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+
+        while len(pending) > 0:
+            yield from pending.popleft().result()
+
+def circulation_findings() -> Generator[Finding, None, None]:
+    _, rows = Session.streamBorrowWithoutOpenHistory()
+    for bookId, userId, historyId, historyBookId, historyUserId, returned in rows:
+        if historyBookId is None:
+            detail = f"history {historyId} does not exist"
+        elif returned is not None:
+            detail = f"history {historyId} was returned at {returned}"
+        else:
+            detail = f"history {historyId} is book {historyBookId} for user {historyUserId}, not book {bookId} for user {userId}"
+        yield ("borrow-without-open-history", "Borrow", bookId, detail)
+
+    _, rows = Session.streamOpenHistoryWithoutBorrow()
+    for historyId, bookId, userId, borrowed in rows:
+        yield ("open-history-without-borrow", "BorrowHistory", historyId, f"book {bookId} borrowed by user {userId} at {borrowed} is not on loan")
+
+    _, rows = Session.streamReturnedBeforeBorrowed()
+    for historyId, bookId, userId, borrowed, returned in rows:
+        yield ("returned-before-borrowed", "BorrowHistory", historyId, f"book {bookId} returned at {returned}, borrowed at {borrowed}")
+
+def _counted(findings: Iterable[Finding], counts: Counter[str]) -> Generator[Finding, None, None]:
+    for finding in findings:
+        counts[finding[0]] += 1
+        yield finding
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--format", type=str, choices=tuple(WRITERS), default="csv")
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+
+def run(format: str, output: Optional[str], chunk_size: Optional[int], workers: Optional[int]) -> int:
+    counts: Counter[str] = Counter()
+    findings = _counted(chain(isbn_findings(chunk_size or CONFIG.LMS.AUDIT_CHUNK_SIZE, workers or os.cpu_count() or 1), circulation_findings()), counts)
+
+    try:
+        if output is None:
+            WRITERS[format](stdout, FINDING_COLUMNS, findings)
+        else:
+            with open(output, "w", encoding="utf-8", newline="") as file:
+                WRITERS[format](file, FINDING_COLUMNS, findings)
+    except ImportError as err:
+        print(f"Error: the ISBN checks need NumPy ({err})", file=stderr)
+        return 2
+
+    for check, count in sorted(counts.items()):
+        print(f"{check}: {count}", file=stderr)
+    print(f"found {sum(counts.values())} problems", file=stderr)
+    return 1 if len(counts) > 0 else 0
+
+def main() -> int:
+    parser = ArgumentParser(description="Check ISBNs and circulation records for inconsistencies")
+    add_arguments(parser)
+    args = argument_parser(parser)
+
+    Session.init()
+    try:
+        return run(args.format, args.output, args.chunk_size, args.workers)
+    finally:
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
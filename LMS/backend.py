@@ -0,0 +1,81 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Protocol, Sequence, Any
+
+Row = tuple[Any, ...]
+
+class Cursor(Protocol):
+    @property
+    def rowcount(self) -> int: ...
+    @property
+    def lastrowid(self) -> Optional[int]: ...
+    @property
+    def description(self) -> Any: ...
+    @property
+    def with_rows(self) -> bool: ...
+    def execute(self, operation: str, params: Sequence[Any] = ...) -> Any: ...
+    def executemany(self, operation: str, seq_params: Sequence[Sequence[Any]]) -> Any: ...
+    def fetchone(self) -> Optional[Row]: ...
+    def fetchmany(self, size: int = ...) -> list[Row]: ...
+    def fetchall(self) -> list[Row]: ...
+    def close(self) -> Any: ...
+
+class Connection(Protocol):
+    @property
+    def connection_id(self) -> Optional[int]: ...
+    @property
+    def in_transaction(self) -> bool: ...
+    def cursor(self, buffered: Optional[bool] = ..., prepared: Optional[bool] = ...) -> Any: ...
+    def commit(self) -> None: ...
+    def rollback(self) -> None: ...
+    def close(self) -> None: ...
+
+class Backend(ABC):
+    # The SQL in DBSession is shared, a backend supplies connections and the few statements that differ
+    Error: type[Exception]
+
+    @abstractmethod
+    def init(self) -> None: ...
+
+    @abstractmethod
+    def getConnection(self) -> Connection: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+    @abstractmethod
+    def isDuplicateKey(self, err: Exception) -> bool: ...
+
+    def isStatementLost(self, err: Exception) -> bool:
+        return False
+
+    def connectionKey(self, connection: Connection) -> int:
+        # Identifies the connection across checkouts, connection_id changes when it reconnects
+        return connection.connection_id or 0
+
+    @abstractmethod
+    def upsertSql(self, table: str, columns: tuple[str, ...], keyColumn: str, update: str) -> str: ...
+
+    @abstractmethod
+    def olderThanDaysSql(self, column: str) -> str: ...
+
+    @abstractmethod
+    def fulltextQuery(self, words: list[str]) -> str: ...
+
+    @abstractmethod
+    def bookSearchSql(self, select: str, fulltext: str, limit: int, offset: int) -> tuple[str, tuple]: ...
+
+    @abstractmethod
+    def usedIndex(self, cursor: Cursor, sql: str, params: tuple, table: str) -> Optional[str]: ...
+
+BACKENDS: tuple[str, ...] = ("mysql", "sqlite")
+
+def create_backend(name: str) -> Backend:
+    # Imported on demand, an SQLite install does not need mysql-connector
+    if name == "sqlite":
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    elif name == "mysql":
+        from .mysql_backend import MySQLBackend
+        return MySQLBackend()
+
+    raise ValueError(f"Unknown backend {name}, expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,156 @@
+import csv
+import json
+
+from sys import stderr
+from time import monotonic
+from pathlib import Path
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from typing import Callable, Generator, Iterable, Optional, TextIO, Any
+
+from .args import argument_parser
+from .config import CONFIG
+from .db_session import Session
+from .isbn import ISBN, ISBN10, ISBN13
+from .lms_types import BookData
+
+Record = dict[str, Any]
+
+BOOK_FIELD_LENGTH: dict[str, int] = {
+    "title": 64,
+    "author": 64,
+    "publication": 64,
+    "description": 1024
+}
+
+@dataclass
+class ImportProgress:
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    started: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        elapsed = monotonic() - self.started
+        return self.imported / elapsed if elapsed > 0 else 0.0
+
+def read_csv(file: TextIO) -> Generator[Record, None, None]:
+    for row in csv.DictReader(file):
+        yield row
+
+def read_jsonl(file: TextIO) -> Generator[Record, None, None]:
+    for line in file:
+        line = line.strip()
+        if line != "":
+            yield json.loads(line)
+
+READERS: dict[str, Callable[[TextIO], Generator[Record, None, None]]] = {
+    "csv": read_csv,
+    "jsonl": read_jsonl
+}
+
+def _text(record: Record, field: str) -> Optional[str]:
+    value = record.get(field)
+    if value is None:
+        return None
+
+    text = str(value).strip()
+    if text == "":
+        return None
+
+    if field in BOOK_FIELD_LENGTH and len(text) > BOOK_FIELD_LENGTH[field]:
+        raise ValueError(f"{field} is longer than {BOOK_FIELD_LENGTH[field]} characters")
+
+    return text
+
+def _isbn(record: Record, field: str, ClassISBN: type[ISBN]) -> Optional[str]:
+    value = _text(record, field)
+    if value is None:
+        return None
+
+    value = value.replace("-", "").replace(" ", "").upper()
+    if len(value) != ClassISBN.digit_length or not ClassISBN(value).verify():
+        raise ValueError(f"{field} {value} is not a valid ISBN")
+
+    return value
+
+def to_book(record: Record) -> BookData:
+    title = _text(record, "title")
+    if title is None:
+        raise ValueError("title is empty")
+
+    return BookData(
+        bookId=None,
+        image=None,
+        title=title,
+        author=_text(record, "author"),
+        isbn10=_isbn(record, "isbn10", ISBN10),
+        isbn13=_isbn(record, "isbn13", ISBN13),
+        publication=_text(record, "publication"),
+        description=_text(record, "description")
+    )
+
+def import_books(records: Iterable[Record], batch_size: int, progress: Optional[Callable[[ImportProgress], None]] = None) -> ImportProgress:
+    status = ImportProgress(started=monotonic())
+    batch: list[BookData] = []
+
+    def flush() -> None:
+        result = Session.addBooks(batch)
+        if result[0] == True:
+            status.imported += result[1]
+        else:
+            status.rejected += len(batch)
+            print(f"batch ending at record {status.read} rejected: {result[1]}", file=stderr)
+
+        batch.clear()
+        if progress is not None:
+            progress(status)
+
+    for record in records:
+        status.read += 1
+        try:
+            batch.append(to_book(record))
+        except Exception as err:
+            status.rejected += 1
+            print(f"record {status.read} rejected: {err}", file=stderr)
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if len(batch) > 0:
+        flush()
+
+    return status
+
+def print_progress(status: ImportProgress) -> None:
+    print(f"\rread {status.read}, imported {status.imported}, rejected {status.rejected} ({status.rate:.0f} books/s)", end="", file=stderr, flush=True)
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("file", type=str)
+    parser.add_argument("--format", type=str, choices=tuple(READERS), default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+
+def run(file: str, format: Optional[str], batch_size: Optional[int]) -> int:
+    if format is None:
+        format = "jsonl" if Path(file).suffix.lower() in (".jsonl", ".json", ".ndjson") else "csv"
+
+    with open(file, "r", encoding="utf-8", newline="") as stream:
+        status = import_books(READERS[format](stream), batch_size or CONFIG.LMS.IMPORT_BATCH_SIZE, print_progress)
+
+    print(file=stderr)
+    return 0 if status.rejected == 0 else 1
+
+def main() -> int:
+    parser = ArgumentParser(description="Import books from a CSV or JSONL file")
+    add_arguments(parser)
+    args = argument_parser(parser)
+
+    Session.init()
+    try:
+        return run(args.file, args.format, args.batch_size)
+    finally:
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
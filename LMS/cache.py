@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from .lms_types import CacheStatsData
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class TTLCache(Generic[K, V]):
+    name: str
+    capacity: int
+    ttl: float
+    items: OrderedDict[K, tuple[float, V]]
+    hits: int
+    misses: int
+    generation: int
+    lock: Lock
+
+    def __init__(self, name: str, capacity: int, ttl: float) -> None:
+        self.name = name
+        self.capacity = capacity
+        self.ttl = ttl
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self.lock = Lock()
+
+    def get(self, key: K) -> tuple[bool, Optional[V]]:
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None and item[0] > monotonic():
+                self.items.move_to_end(key)
+                self.hits += 1
+                return (True, item[1])
+
+            if item is not None:
+                del self.items[key]
+            self.misses += 1
+            return (False, None)
+
+    def put(self, key: K, value: V, generation: int) -> None:
+        with self.lock:
+            # Something was invalidated while the value was being read, it may already be stale
+            if generation != self.generation or self.capacity <= 0:
+                return None
+
+            self.items[key] = (monotonic() + self.ttl, value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.capacity:
+                self.items.popitem(last=False)
+
+    def remove(self, key: K) -> None:
+        with self.lock:
+            self.generation += 1
+            self.items.pop(key, None)
+
+    def removeWhere(self, predicate: Callable[[K], bool]) -> None:
+        with self.lock:
+            self.generation += 1
+            for key in [key for key in self.items if predicate(key)]:
+                del self.items[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.items.clear()
+
+    def stats(self) -> CacheStatsData:
+        with self.lock:
+            return CacheStatsData(name=self.name, hits=self.hits, misses=self.misses, size=len(self.items))
@@ -0,0 +1,29 @@
+from .args import argument_parser
+from .db_session import Session
+
+def run() -> int:
+    result = Session.explainIndexUsage()
+    if result[0] == False:
+        print(f"Error: {result[1]}")
+        return 2
+
+    failed = 0
+    for usage in result[1]:
+        status = "OK" if usage.used == usage.expected else "FAIL"
+        if status == "FAIL":
+            failed += 1
+        print(f"[{status}] {usage.name}: {usage.table} uses {usage.used or 'no index'} (expected {usage.expected})")
+
+    return 1 if failed else 0
+
+def main() -> int:
+    argument_parser()
+
+    Session.init()
+    try:
+        return run()
+    finally:
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
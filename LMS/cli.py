@@ -0,0 +1,158 @@
+from sys import stderr
+from argparse import ArgumentParser, Namespace
+from typing import Callable
+
+from . import args as common
+from . import bulk_import, export, check_indexes, migrate_covers, audit
+from .config import CONFIG
+from .db_session import Session
+from .instrumentation import format_stats
+
+def _no_arguments(parser: ArgumentParser) -> None:
+    pass
+
+def borrow_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("bookId", type=int)
+    parser.add_argument("userId", type=int)
+
+def return_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("bookId", type=int)
+
+def search_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("query", type=str)
+    parser.add_argument("--limit", type=int, default=None)
+
+def prune_changes_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--days", type=int, default=CONFIG.LMS.CHANGE_LOG_RETENTION_DAYS)
+
+def borrow(args: Namespace) -> int:
+    result = Session.borrowBook(args.bookId, args.userId)
+    if result[0] == False:
+        print(f"Error: {result[1]}", file=stderr)
+        return 1
+
+    print(f"Book {args.bookId} borrowed by user {args.userId}")
+    return 0
+
+def return_(args: Namespace) -> int:
+    result = Session.returnBook(args.bookId)
+    if result[0] == False:
+        print(f"Error: {result[1]}", file=stderr)
+        return 1
+
+    print(f"Book {args.bookId} returned")
+    return 0
+
+def search(args: Namespace) -> int:
+    result = Session.searchBook(args.query, 0, args.limit)
+    if result[0] == False:
+        print(f"Error: {result[1]}", file=stderr)
+        return 1
+
+    for book in result[1]:
+        print("\t".join(str(value if value is not None else "") for value in (book.bookId, book.isbn13, book.title, book.author)))
+
+    return 0
+
+def stats(args: Namespace) -> int:
+    result = Session.getDashboardStats()
+    if result[0] == False:
+        print(f"Error: {result[1]}", file=stderr)
+        return 1
+
+    print(f"Books: {result[1].bookCount}")
+    print(f"Users: {result[1].userCount}")
+    print(f"Borrowing: {result[1].borrowingCount}")
+    print(f"Returned: {result[1].returnedCount}")
+    print(f"All time borrowed: {result[1].allTimeBorrowedCount}")
+    return 0
+
+def prune_changes(args: Namespace) -> int:
+    result = Session.pruneChangeLog(args.days)
+    if result[0] == False:
+        print(f"Error: {result[1]}", file=stderr)
+        return 1
+
+    print(f"Removed {result[1]} change log entries older than {args.days} days")
+    return 0
+
+COMMANDS: dict[str, tuple[str, Callable[[ArgumentParser], None], Callable[[Namespace], int]]] = {
+    "borrow": (
+        "Borrow a book",
+        borrow_arguments,
+        borrow
+    ),
+    "return": (
+        "Return a book",
+        return_arguments,
+        return_
+    ),
+    "search": (
+        "Search books by title, author, publication or description",
+        search_arguments,
+        search
+    ),
+    "stats": (
+        "Show library counters",
+        _no_arguments,
+        stats
+    ),
+    "prune-changes": (
+        "Remove old change log entries",
+        prune_changes_arguments,
+        prune_changes
+    ),
+    "import": (
+        "Import books from a CSV or JSONL file",
+        bulk_import.add_arguments,
+        lambda args: bulk_import.run(args.file, args.format, args.batch_size)
+    ),
+    "export": (
+        "Export a table to CSV or JSONL",
+        export.add_arguments,
+        lambda args: export.run(args.table, args.format, args.output, args.include_images)
+    ),
+    "check-indexes": (
+        "Check that the history queries use their indexes",
+        _no_arguments,
+        lambda args: check_indexes.run()
+    ),
+    "migrate-covers": (
+        "Move covers stored in Book into the CoverImage table",
+        _no_arguments,
+        lambda args: migrate_covers.run()
+    ),
+    "audit": (
+        "Check ISBNs and circulation records for inconsistencies",
+        audit.add_arguments,
+        lambda args: audit.run(args.format, args.output, args.chunk_size, args.workers)
+    )
+}
+
+def main() -> int:
+    parser = ArgumentParser(prog="python -m LMS", description="Library Management System")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, (description, add_arguments, _) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=description, description=description)
+        add_arguments(subparser)
+        common.add_arguments(subparser)
+
+    args = parser.parse_args(namespace=common.TypedArgumentParser())
+    common.apply_arguments(args)
+
+    # A single command needs a single connection, don't open a whole pool up front
+    if args.pool_size is None:
+        CONFIG.REMOTE.POOL_SIZE = 1
+
+    Session.init()
+    try:
+        return COMMANDS[args.command][2](args)
+    finally:
+        stats = Session.getQueryStats()
+        if stats[0] == True:
+            print(format_stats(stats[1]), file=stderr)
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
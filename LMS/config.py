@@ -13,13 +13,42 @@ class CONFIG:
     class LMS:
         CONFIG_FILE: Optional[Path] = None
         DESIGNER_FILES: Path = Path(__file__).resolve().parents[0].joinpath("ui", "designer-files")
+        COMPILED_UI: Path = Path(__file__).resolve().parents[0].joinpath("ui", "compiled")
+        SQLITE_SCHEMA: Path = Path(__file__).resolve().parents[1].joinpath("db", "create_db_sqlite.sql")
+        USE_COMPILED_UI: bool = True
         VERSION: str = LMS_VERSION
+        BOOK_IMAGE_CACHE_SIZE: int = 64
+        PAGE_SIZE: int = 200
+        FULLTEXT_MIN_WORD_LENGTH: int = 3
+        IMPORT_BATCH_SIZE: int = 1000
+        EXPORT_FETCH_SIZE: int = 5000
+        AUDIT_CHUNK_SIZE: int = 50000
+        ENTITY_CACHE_SIZE: int = 1024
+        ENTITY_CACHE_TTL: float = 30.0
+        CHANGE_SYNC_LIMIT: int = 1000
+        CHANGE_SYNC_OVERLAP: int = 64
+        CHANGE_LOG_RETENTION_DAYS: int = 30
+        USER_INDEX_SYNC_INTERVAL: float = 5.0
+        QUERY_STATS: bool = False
+        SLOW_QUERY_MS: float = 200.0
+        SLOW_QUERY_LOG: Optional[str] = None
+        COVER_MAX_SIZE: tuple[int, int] = (600, 800)
+        COVER_THUMBNAIL_SIZE: tuple[int, int] = (180, 240)
+        COVER_FORMAT: str = "JPG"
+        COVER_QUALITY: int = 85
 
     @dataclass
     class REMOTE:
         HOST: str
         PORT: int
         DATABASE: str
+        BACKEND: str = "mysql"
+        POOL_SIZE: int = 5
+        POOL_TIMEOUT: float = 10.0
+        RECONNECT_ATTEMPTS: int = 3
+        RECONNECT_DELAY: float = 1.0
+        STATEMENT_CACHE_SIZE: int = 64
+        ASYNC_CONCURRENCY: Optional[int] = None
 
     @dataclass
     class USER:
@@ -32,10 +61,38 @@ def config_load(file: str):
 
         CONFIG.LMS.CONFIG_FILE = Path(file)
 
-        CONFIG.REMOTE.HOST = data["REMOTE"]["HOST"]
-        CONFIG.REMOTE.PORT = int(data["REMOTE"]["PORT"])
+        if "BACKEND" in data["REMOTE"]:
+            CONFIG.REMOTE.BACKEND = str(data["REMOTE"]["BACKEND"])
+
+        # SQLite only needs DATABASE, the path of the database file
+        if CONFIG.REMOTE.BACKEND != "sqlite" or "HOST" in data["REMOTE"]:
+            CONFIG.REMOTE.HOST = data["REMOTE"]["HOST"]
+            CONFIG.REMOTE.PORT = int(data["REMOTE"]["PORT"])
         CONFIG.REMOTE.DATABASE = data["REMOTE"]["DATABASE"]
 
+        if "POOL_SIZE" in data["REMOTE"]:
+            CONFIG.REMOTE.POOL_SIZE = int(data["REMOTE"]["POOL_SIZE"])
+        if "POOL_TIMEOUT" in data["REMOTE"]:
+            CONFIG.REMOTE.POOL_TIMEOUT = float(data["REMOTE"]["POOL_TIMEOUT"])
+        if "RECONNECT_ATTEMPTS" in data["REMOTE"]:
+            CONFIG.REMOTE.RECONNECT_ATTEMPTS = int(data["REMOTE"]["RECONNECT_ATTEMPTS"])
+        if "RECONNECT_DELAY" in data["REMOTE"]:
+            CONFIG.REMOTE.RECONNECT_DELAY = float(data["REMOTE"]["RECONNECT_DELAY"])
+        if "STATEMENT_CACHE_SIZE" in data["REMOTE"]:
+            CONFIG.REMOTE.STATEMENT_CACHE_SIZE = int(data["REMOTE"]["STATEMENT_CACHE_SIZE"])
+        if "ASYNC_CONCURRENCY" in data["REMOTE"]:
+            CONFIG.REMOTE.ASYNC_CONCURRENCY = int(data["REMOTE"]["ASYNC_CONCURRENCY"])
+
+        if "LMS" in data:
+            if "QUERY_STATS" in data["LMS"]:
+                CONFIG.LMS.QUERY_STATS = bool(data["LMS"]["QUERY_STATS"])
+            if "SLOW_QUERY_MS" in data["LMS"]:
+                CONFIG.LMS.SLOW_QUERY_MS = float(data["LMS"]["SLOW_QUERY_MS"])
+            if "SLOW_QUERY_LOG" in data["LMS"]:
+                CONFIG.LMS.SLOW_QUERY_LOG = str(data["LMS"]["SLOW_QUERY_LOG"])
+            if "USER_INDEX_SYNC_INTERVAL" in data["LMS"]:
+                CONFIG.LMS.USER_INDEX_SYNC_INTERVAL = float(data["LMS"]["USER_INDEX_SYNC_INTERVAL"])
+
         if "USER" in data:
             if "USERNAME" in data["USER"]:
                 CONFIG.USER.USERNAME = data["USER"]["USERNAME"]
@@ -1,48 +1,312 @@
-import mysql.connector
+import re
+import hashlib
 
-from typing import Optional, Generator, Callable, Union
+from typing import Callable, Optional, Generator, Union, Sequence, Any
 from datetime import datetime
-
-from mysql.connector.abstracts import  MySQLConnectionAbstract, MySQLCursorAbstract
-from mysql.connector.pooling import PooledMySQLConnection
-from mysql.connector.types import RowType
-from mysql.connector.errorcode import ER_DUP_ENTRY
-from mysql.connector.errors import Error as MysqlError
+from contextlib import contextmanager
+from collections import OrderedDict
+from copy import copy
+from time import monotonic
+from functools import lru_cache
 
 from .config import CONFIG
-from .lms_types import UserData, BookData, BookBorrowHistoryData, BookBorrowReviewData, BookReturnReviewData, ExecuteResult
+from .backend import Backend, Connection, Cursor, Row, create_backend
+from .cache import TTLCache
+from .errors import ISBNValueError
+from .isbn import parse_isbn
+from .instrumentation import QueryRecorder, InstrumentedCursor
+from .user_index import UserSearchIndex
+from .lms_types import UserData, BookData, BookBorrowHistoryData, BookBorrowReviewData, BookReturnReviewData, BooksBorrowReviewData, CirculationResultData, ChangeSetData, CacheStatsData, QueryStatsData, IndexUsageData, DashboardStatsData, ExecuteResult
 
 class DBSession:
-    connection: PooledMySQLConnection | MySQLConnectionAbstract
-
-    cursor: MySQLCursorAbstract
+    backend: Optional[Backend] = None
+    # Prepared cursors per pooled connection, with the connection_id of the server session they were prepared in
+    statements: dict[int, tuple[int, OrderedDict[str, Cursor]]] = {}
+    recorder: Optional[QueryRecorder] = None
+
+    bookCache: TTLCache[int, BookData] = TTLCache("book", 0, 0)
+    userCache: TTLCache[int, UserData] = TTLCache("user", 0, 0)
+    borrowReviewCache: TTLCache[tuple[int, int], BookBorrowReviewData] = TTLCache("borrowReview", 0, 0)
+    isbnCache: TTLCache[str, tuple[int, ...]] = TTLCache("isbn", 0, 0)
+    userIndex: UserSearchIndex = UserSearchIndex()
+
+    BOOK_UPDATE_COLUMNS: tuple[str, ...] = ("title", "author", "isbn10", "isbn13", "publication", "description", "imageHash")
+    USER_UPDATE_COLUMNS: tuple[str, ...] = ("prefixName", "firstName", "lastName", "email", "phone", "address")
+    BORROW_HISTORY_UPDATE_COLUMNS: tuple[str, ...] = ("bookId", "userId", "borrowed", "returned")
+
+    BORROW_HISTORY_SELECT: str = (
+        "SELECT BorrowHistory.historyId, BorrowHistory.bookId, Book.title, BorrowHistory.userId, User.prefixName, User.firstName, User.lastName, BorrowHistory.borrowed, BorrowHistory.returned " +
+        "FROM BorrowHistory " +
+        "INNER JOIN Book ON BorrowHistory.bookId = Book.bookId " +
+        "INNER JOIN User ON BorrowHistory.userId = User.userId "
+    )
 
     def init(self) -> None:
-        self.connection = mysql.connector.connect(
-            host=CONFIG.REMOTE.HOST,
-            port=CONFIG.REMOTE.PORT,
-            user=CONFIG.USER.USERNAME,
-            password=CONFIG.USER.PASSWORD,
-            database=CONFIG.REMOTE.DATABASE,
-            ssl_disabled=False
-        )
+        backend = create_backend(CONFIG.REMOTE.BACKEND)
+        backend.init()
+        self.backend = backend
+        self.statements = {}
+        self.bookCache = TTLCache("book", CONFIG.LMS.ENTITY_CACHE_SIZE, CONFIG.LMS.ENTITY_CACHE_TTL)
+        self.userCache = TTLCache("user", CONFIG.LMS.ENTITY_CACHE_SIZE, CONFIG.LMS.ENTITY_CACHE_TTL)
+        self.borrowReviewCache = TTLCache("borrowReview", CONFIG.LMS.ENTITY_CACHE_SIZE, CONFIG.LMS.ENTITY_CACHE_TTL)
+        self.isbnCache = TTLCache("isbn", CONFIG.LMS.ENTITY_CACHE_SIZE, CONFIG.LMS.ENTITY_CACHE_TTL)
+        self.userIndex = UserSearchIndex()
+        self.recorder = QueryRecorder(CONFIG.LMS.SLOW_QUERY_MS, CONFIG.LMS.SLOW_QUERY_LOG) if CONFIG.LMS.QUERY_STATS else None
+
+    def _getBackend(self) -> Backend:
+        if self.backend is None:
+            raise RuntimeError("Session is not initialized")
+        return self.backend
+
+    @staticmethod
+    def _pageLimit(limit: Optional[int]) -> int:
+        return limit if limit is not None else CONFIG.LMS.PAGE_SIZE
+
+    @contextmanager
+    def _cursor(self, buffered: bool = True) -> Generator[tuple[Connection, Cursor], None, None]:
+        backend = self._getBackend()
+        connection = backend.getConnection()
+        try:
+            cursor = connection.cursor(buffered=buffered)
+            if self.recorder is not None:
+                cursor = InstrumentedCursor(cursor, self.recorder)
+            try:
+                yield connection, cursor
+            except backend.Error:
+                try:
+                    connection.rollback()
+                except backend.Error:
+                    pass
+                raise
+            finally:
+                cursor.close()
+        finally:
+            try:
+                # Without the session reset, a snapshot left open by a read would be reused by the next checkout
+                if connection.in_transaction:
+                    connection.rollback()
+            except backend.Error:
+                pass
+            connection.close()
+
+    def _statements(self, connection: Connection) -> OrderedDict[str, Cursor]:
+        key = self._getBackend().connectionKey(connection)
+        connectionId = connection.connection_id or 0
+        cached = self.statements.get(key)
+
+        # Statement ids belong to the server session, a reconnect starts a new one with an empty cache.
+        # The old cursors are dropped without close(), their ids may name other statements in the new session
+        if cached is None or cached[0] != connectionId:
+            cached = self.statements[key] = (connectionId, OrderedDict())
+        return cached[1]
+
+    def _prepare(self, connection: Connection, statements: OrderedDict[str, Cursor], sql: str) -> Cursor:
+        cursor = connection.cursor(prepared=True)
+        statements[sql] = cursor
+        if len(statements) > CONFIG.REMOTE.STATEMENT_CACHE_SIZE:
+            statements.popitem(last=False)[1].close()
+        return cursor
+
+    def _prepared(self, connection: Connection, sql: str, params: Sequence[Any] = ()) -> Cursor:
+        statements = self._statements(connection)
+        cursor = statements.get(sql)
+
+        if cursor is None:
+            cursor = self._prepare(connection, statements, sql)
+        else:
+            statements.move_to_end(sql)
 
-        self.cursor = self.connection.cursor(buffered=False)
+        if self.recorder is not None:
+            cursor = InstrumentedCursor(cursor, self.recorder)
 
-    def addBook(self, data: BookData) -> ExecuteResult[Optional[int]]:
         try:
-            self.cursor.execute(
-                "INSERT INTO Book (image, title, author, isbn10, isbn13, publication, description) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (data.image, data.title, data.author, data.isbn10, data.isbn13, data.publication, data.description)
+            cursor.execute(sql, tuple(params))
+        except Exception as err:
+            if not self._getBackend().isStatementLost(err):
+                raise
+
+            # The server deallocated the handle, prepare it again on this connection and retry once
+            statements.pop(sql, None)
+            cursor = self._prepare(connection, statements, sql)
+            if self.recorder is not None:
+                cursor = InstrumentedCursor(cursor, self.recorder)
+            try:
+                cursor.execute(sql, tuple(params))
+            except Exception as retryErr:
+                if self._getBackend().isStatementLost(retryErr):
+                    statements.pop(sql, None)
+                raise
+
+        return cursor
+
+    def _queryPrepared(self, connection: Connection, sql: str, params: Sequence[Any] = ()) -> list[tuple]:
+        rows = self._prepared(connection, sql, params).fetchall()
+        return [tuple(bytes(value) if type(value) is bytearray else value for value in row) for row in rows]
+
+    @staticmethod
+    def _changedMask(values: Sequence[Any], oldValues: Optional[Sequence[Any]]) -> int:
+        if oldValues is None:
+            return (1 << len(values)) - 1
+        return sum(1 << i for i, (value, oldValue) in enumerate(zip(values, oldValues)) if value != oldValue)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _updateSql(table: str, keyColumn: str, columns: tuple[str, ...], mask: int) -> str:
+        return f"UPDATE {table} SET " + (", ".join([f"{column}=%s" for i, column in enumerate(columns) if mask & (1 << i)])) + f" WHERE {keyColumn} = %s"
+
+    def _update(self, connection: Connection, table: str, keyColumn: str, columns: tuple[str, ...], mask: int, values: Sequence[Any], key: Any) -> int:
+        params = [value for i, value in enumerate(values) if mask & (1 << i)] + [key]
+        return self._prepared(connection, self._updateSql(table, keyColumn, columns, mask), params).rowcount
+
+    def _updateStats(self, cursor: Cursor, **deltas: int) -> None:
+        deltas = {column: delta for column, delta in deltas.items() if delta != 0}
+        if len(deltas) > 0:
+            cursor.execute(
+                "UPDATE LibraryStats SET " + (", ".join([f"{column} = {column} + %s" for column in deltas])) + " WHERE statsId = 1",
+                tuple(deltas.values())
             )
-            self.connection.commit()
-            if self.cursor.rowcount > 0:
-                return (True, None)
-            else:
-                return (False, str("No update"))
-        except MysqlError as err:
-            self.connection.rollback()
+
+    def _resetStats(self, cursor: Cursor, *columns: str) -> None:
+        cursor.execute("UPDATE LibraryStats SET " + (", ".join([f"{column} = 0" for column in columns])) + " WHERE statsId = 1")
+
+    def _removeHistoryStats(self, cursor: Cursor, borrowRows: int, historyRows: int, **deltas: int) -> None:
+        # Every deleted Borrow row points at one of the deleted open history rows, the rest were returned
+        self._updateStats(cursor, borrowingCount=-borrowRows, returnedCount=-(historyRows - borrowRows), allTimeBorrowedCount=-historyRows, **deltas)
+
+    def _logChanges(self, cursor: Cursor, tableName: str, rowIds: Sequence[int], deleted: bool = False) -> None:
+        if len(rowIds) > 0:
+            cursor.execute(
+                "INSERT INTO ChangeLog (tableName, rowId, deleted) VALUES " + (", ".join(["(%s, %s, %s)"] * len(rowIds))),
+                tuple(value for rowId in rowIds for value in (tableName, rowId, deleted))
+            )
+
+    def _logChangesFrom(self, cursor: Cursor, tableName: str, column: str, fromWhere: str, params: tuple = (), deleted: bool = False) -> None:
+        cursor.execute(f"INSERT INTO ChangeLog (tableName, rowId, deleted) SELECT %s, {column}, %s " + fromWhere, (tableName, deleted, *params))
+
+    def _logCleared(self, cursor: Cursor, *tableNames: str) -> None:
+        # rowId 0 never exists, it tells clients to reload the whole table
+        for tableName in tableNames:
+            self._logChanges(cursor, tableName, [0], deleted=True)
+
+    def _getChanges(self, tableName: str, afterChangeId: Optional[int], listByIds: Callable[[list[int]], ExecuteResult[list[Any]]], rowId: Callable[[Any], Optional[int]]) -> ExecuteResult[ChangeSetData]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT COALESCE(MIN(changeId), 0), COALESCE(MAX(changeId), 0) FROM ChangeLog")
+                firstChangeId, lastChangeId = cursor.fetchone() # type: ignore
+                if afterChangeId is None:
+                    return (True, ChangeSetData(lastChangeId=lastChangeId))
+
+                # Change ids are handed out before commit, so a transaction may still land behind
+                # the last id a client saw. Re-reading a few older changes picks those up.
+                cursor.execute(
+                    "SELECT changeId, rowId, deleted FROM ChangeLog WHERE tableName = %s AND changeId > %s ORDER BY changeId LIMIT %s",
+                    (tableName, max(afterChangeId - CONFIG.LMS.CHANGE_SYNC_OVERLAP, 0), CONFIG.LMS.CHANGE_SYNC_LIMIT + 1)
+                )
+                result = cursor.fetchall()
+        except Exception as err:
             return (False, str(err))
+
+        # The log was pruned past the client or there is too much to patch, reload instead
+        if afterChangeId + 1 < firstChangeId or len(result) > CONFIG.LMS.CHANGE_SYNC_LIMIT:
+            return (True, ChangeSetData(lastChangeId=lastChangeId, cleared=True))
+
+        latest: dict[int, bool] = {}
+        for changeId, changedId, deleted in result: # type: ignore
+            if changedId == 0 and deleted:
+                return (True, ChangeSetData(lastChangeId=lastChangeId, cleared=True))
+            latest[changedId] = bool(deleted)
+            lastChangeId = max(lastChangeId, changeId)
+
+        rows = listByIds([changedId for changedId, deleted in latest.items() if not deleted])
+        if rows[0] == False:
+            return rows
+
+        found = {rowId(row) for row in rows[1]}
+        return (True, ChangeSetData(
+            lastChangeId=lastChangeId,
+            rows=rows[1],
+            deleted=[changedId for changedId in latest if changedId not in found]
+        ))
+
+    def pruneChangeLog(self, days: int) -> ExecuteResult[int]:
+        try:
+            with self._cursor() as (connection, cursor):
+                # Keep the newest change so clients can still tell how far the log was pruned
+                cursor.execute("SELECT COALESCE(MAX(changeId), 0) FROM ChangeLog")
+                lastChangeId = cursor.fetchone()[0] # type: ignore
+                cursor.execute("DELETE FROM ChangeLog WHERE " + self._getBackend().olderThanDaysSql("changed") + " AND changeId < %s", (days, lastChangeId))
+                rowcount = cursor.rowcount
+                connection.commit()
+            return (True, rowcount)
+        except Exception as err:
+            return (False, str(err))
+
+    def _storeCover(self, cursor: Cursor, image: Optional[bytes], thumbnail: Optional[bytes]) -> Optional[bytes]:
+        if image is None:
+            return None
+
+        imageHash = hashlib.sha256(image).digest()
+        # Most covers are already stored by another edition, only send the blob when they are not
+        cursor.execute("UPDATE CoverImage SET refCount = refCount + 1 WHERE imageHash = %s", (imageHash, ))
+        if cursor.rowcount == 0:
+            cursor.execute(
+                self._getBackend().upsertSql("CoverImage", ("imageHash", "image", "thumbnail", "refCount"), "imageHash", "refCount = refCount + 1"),
+                (imageHash, image, thumbnail, 1)
+            )
+
+        return imageHash
+
+    def _releaseCover(self, cursor: Cursor, imageHash: Optional[bytes]) -> None:
+        if imageHash is None:
+            return None
+
+        cursor.execute("UPDATE CoverImage SET refCount = refCount - 1 WHERE imageHash = %s", (imageHash, ))
+        cursor.execute("DELETE FROM CoverImage WHERE imageHash = %s AND refCount <= 0", (imageHash, ))
+
+    def _bookImageHash(self, cursor: Cursor, bookId: int) -> Optional[bytes]:
+        cursor.execute("SELECT imageHash FROM Book WHERE bookId = %s FOR UPDATE", (bookId, ))
+        result = cursor.fetchone()
+        return bytes(result[0]) if type(result) is tuple and isinstance(result[0], (bytes, bytearray)) else None
+
+    def addBook(self, data: BookData) -> ExecuteResult[Optional[int]]:
+        try:
+            with self._cursor() as (connection, cursor):
+                imageHash = self._storeCover(cursor, data.image, data.thumbnail)
+                cursor.execute(
+                    "INSERT INTO Book (imageHash, title, author, isbn10, isbn13, publication, description) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    (imageHash, data.title, data.author, data.isbn10, data.isbn13, data.publication, data.description)
+                )
+                rowcount = cursor.rowcount
+                if rowcount > 0:
+                    self._logChanges(cursor, "Book", [cursor.lastrowid or 0])
+                self._updateStats(cursor, bookCount=rowcount)
+                connection.commit()
+                self.isbnCache.clear()
+                if rowcount > 0:
+                    return (True, None)
+                else:
+                    return (False, str("No update"))
+        except Exception as err:
+            return (False, str(err))
+
+    def addBooks(self, books: list[BookData]) -> ExecuteResult[int]:
+        if len(books) == 0:
+            return (True, 0)
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT COALESCE(MAX(bookId), 0) FROM Book")
+                lastId = cursor.fetchone()[0] # type: ignore
+                cursor.executemany(
+                    "INSERT INTO Book (imageHash, title, author, isbn10, isbn13, publication, description) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    [(self._storeCover(cursor, data.image, data.thumbnail), data.title, data.author, data.isbn10, data.isbn13, data.publication, data.description) for data in books]
+                )
+                rowcount = cursor.rowcount
+                self._logChangesFrom(cursor, "Book", "bookId", "FROM Book WHERE bookId > %s", (lastId, ))
+                self._updateStats(cursor, bookCount=rowcount)
+                connection.commit()
+                self.isbnCache.clear()
+            return (True, rowcount)
         except Exception as err:
             return (False, str(err))
 
@@ -51,33 +315,36 @@ class DBSession:
             return False, "data.bookId is None"
 
         try:
-            colvals: list[tuple[str, Union[str, int, bytes, None]]] = []
-
-            if old_data is not None:
-                if data.image != old_data.image: colvals.append(("image", data.image))
-                if data.title != old_data.title: colvals.append(("title", data.title))
-                if data.author != old_data.author: colvals.append(("author", data.author))
-                if data.isbn10 != old_data.isbn10: colvals.append(("isbn10", data.isbn10))
-                if data.isbn13 != old_data.isbn13: colvals.append(("isbn13", data.isbn13))
-                if data.publication != old_data.publication: colvals.append(("publication", data.publication))
-                if data.description != old_data.description: colvals.append(("description", data.description))
-            else:
-                colvals = [("image", data.image), ("title", data.title), ("author", data.author), ("isbn10", data.isbn10), ("isbn13", data.isbn13), ("publication", data.publication), ("description", data.description)]
-
-            if len(colvals) > 0:
-                self.cursor.execute("UPDATE Book SET " + (", ".join([f"{i[0]}=%s" for i in colvals])) + " WHERE bookId = %s", tuple([i[1] for i in colvals] + [data.bookId]))
-                self.connection.commit()
+            values: list[Union[str, bytes, None]] = [data.title, data.author, data.isbn10, data.isbn13, data.publication, data.description, None]
+            imageChanged = old_data is None or data.image != old_data.image
+            mask = self._changedMask(values[:-1], None if old_data is None else [old_data.title, old_data.author, old_data.isbn10, old_data.isbn13, old_data.publication, old_data.description])
+            if imageChanged:
+                mask |= 1 << (len(values) - 1)
+
+            if mask != 0:
+                with self._cursor() as (connection, cursor):
+                    oldHash = self._bookImageHash(cursor, data.bookId) if imageChanged else None
+                    if imageChanged:
+                        values[-1] = self._storeCover(cursor, data.image, data.thumbnail)
+                    self._update(connection, "Book", "bookId", self.BOOK_UPDATE_COLUMNS, mask, values, data.bookId)
+                    self._releaseCover(cursor, oldHash)
+                    self._logChanges(cursor, "Book", [data.bookId])
+                    # The history list shows the title
+                    if mask & 1:
+                        self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM BorrowHistory WHERE bookId = %s", (data.bookId, ))
+                    connection.commit()
+                    self.bookCache.remove(data.bookId)
+                    self.borrowReviewCache.removeWhere(lambda key: key[0] == data.bookId)
+                    if mask & 0b1100:
+                        self.isbnCache.clear()
             else:
                 return (False, "No update")
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
         return (True, None)
 
-    def _RowTypeToBookData(self, row: RowType) -> BookData:
+    def _RowToBookData(self, row: Row) -> BookData:
         return BookData(
             bookId=row[0] if type(row[0]) is int else None,
             image=row[1] if type(row[1]) is bytes else None,
@@ -86,126 +353,323 @@ class DBSession:
             isbn10=row[4] if type(row[4]) is str else None,
             isbn13=row[5] if type(row[5]) is str else None,
             publication=row[6] if type(row[6]) is str else None,
-            description=row[7] if type(row[7]) is str else None
+            description=row[7] if type(row[7]) is str else None,
+            thumbnail=row[8] if len(row) > 8 and type(row[8]) is bytes else None
         )
 
     def getBook(self, bookId: int) -> ExecuteResult[Optional[BookData]]:
-        try:
-            self.cursor.execute("SELECT bookId, image, title, author, isbn10, isbn13, publication, description FROM Book WHERE bookId = %s LIMIT 1", (bookId, ))
-            result = self.cursor.fetchone()
+        generation = self.bookCache.generation
+        found, cached = self.bookCache.get(bookId)
+        if found:
+            return (True, copy(cached))
 
-            if type(result) is tuple:
-                data = self._RowTypeToBookData(result)
+        try:
+            with self._cursor() as (connection, cursor):
+                rows = self._queryPrepared(
+                    connection,
+                    "SELECT Book.bookId, CoverImage.image, Book.title, Book.author, Book.isbn10, Book.isbn13, Book.publication, Book.description, CoverImage.thumbnail FROM Book LEFT JOIN CoverImage ON Book.imageHash = CoverImage.imageHash WHERE Book.bookId = %s LIMIT 1",
+                    (bookId, )
+                )
+
+            if len(rows) > 0:
+                data = self._RowToBookData(rows[0])
+                self.bookCache.put(bookId, copy(data), generation)
             else:
                 return (True, None)
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
         return (True, data)
 
-    def removeBook(self, bookId: int) -> ExecuteResult[None]:
+    def getBookIdsByIsbn(self, isbn: str) -> ExecuteResult[list[int]]:
         try:
-            self.cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (bookId, ))
-            self.cursor.execute("DELETE FROM BorrowHistory WHERE bookId = %s", (bookId, ))
-            self.cursor.execute("DELETE FROM Book WHERE bookId = %s", (bookId, ))
-            self.connection.commit()
-            if self.cursor.rowcount > 0:
-                return (True, None)
-            else:
-                return (False, f"Not found book ID {bookId}")
-        except MysqlError as err:
-            self.connection.rollback()
+            isbn13 = parse_isbn(isbn)
+        except ISBNValueError:
+            return (False, f"Invalid ISBN {isbn}")
+
+        key = str(isbn13)
+        generation = self.isbnCache.generation
+        found, cached = self.isbnCache.get(key)
+        if found and cached is not None:
+            return (True, list(cached))
+
+        # Books may be catalogued with either form, every copy of an edition shares it
+        isbn10 = isbn13.to_isbn10()
+        try:
+            with self._cursor() as (connection, cursor):
+                rows = self._queryPrepared(
+                    connection,
+                    "SELECT bookId FROM Book WHERE isbn13 = %s OR isbn10 = %s ORDER BY bookId",
+                    (key, str(isbn10) if isbn10 is not None else None)
+                )
+        except Exception as err:
             return (False, str(err))
+
+        bookIds = tuple(row[0] for row in rows if type(row[0]) is int)
+        self.isbnCache.put(key, bookIds, generation)
+        return (True, list(bookIds))
+
+    def getBookByIsbn(self, isbn: str) -> ExecuteResult[Optional[BookData]]:
+        bookIds = self.getBookIdsByIsbn(isbn)
+        if bookIds[0] == False:
+            return bookIds
+        if len(bookIds[1]) == 0:
+            return (True, None)
+
+        return self.getBook(bookIds[1][0])
+
+    def resolveBookIsbns(self, isbns: list[str], borrowed: bool) -> ExecuteResult[list[Optional[int]]]:
+        copies: list[list[int]] = []
+        for isbn in isbns:
+            bookIds = self.getBookIdsByIsbn(isbn)
+            if bookIds[0] == False:
+                return bookIds
+            copies.append(bookIds[1])
+
+        # With several copies of an edition, borrowing takes one on the shelf and returning one on loan
+        shared = sorted({bookId for bookIds in copies if len(bookIds) > 1 for bookId in bookIds})
+        onLoan: set[int] = set()
+        if len(shared) > 0:
+            try:
+                with self._cursor() as (connection, cursor):
+                    cursor.execute(f"SELECT bookId FROM Borrow WHERE bookId IN ({self._placeholders(len(shared))})", tuple(shared))
+                    onLoan = {row[0] for row in cursor.fetchall()} # type: ignore
+            except Exception as err:
+                return (False, str(err))
+
+        resolved: list[Optional[int]] = []
+        for bookIds in copies:
+            free = [bookId for bookId in bookIds if bookId not in resolved]
+            preferred = [bookId for bookId in free if (bookId in onLoan) == borrowed]
+            resolved.append((preferred or free or [None])[0])
+
+        return (True, resolved)
+
+    def getBookImage(self, bookId: int) -> ExecuteResult[Optional[bytes]]:
+        try:
+            with self._cursor() as (connection, cursor):
+                rows = self._queryPrepared(
+                    connection,
+                    "SELECT COALESCE(CoverImage.thumbnail, CoverImage.image) FROM Book INNER JOIN CoverImage ON Book.imageHash = CoverImage.imageHash WHERE Book.bookId = %s LIMIT 1",
+                    (bookId, )
+                )
+
+            if len(rows) > 0 and type(rows[0][0]) is bytes:
+                return (True, rows[0][0])
+        except Exception as err:
+            return (False, str(err))
+
+        return (True, None)
+
+    def removeBook(self, bookId: int) -> ExecuteResult[None]:
+        try:
+            with self._cursor() as (connection, cursor):
+                imageHash = self._bookImageHash(cursor, bookId)
+                cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (bookId, ))
+                borrowRows = cursor.rowcount
+                self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM BorrowHistory WHERE bookId = %s", (bookId, ), deleted=True)
+                cursor.execute("DELETE FROM BorrowHistory WHERE bookId = %s", (bookId, ))
+                historyRows = cursor.rowcount
+                cursor.execute("DELETE FROM Book WHERE bookId = %s", (bookId, ))
+                rowcount = cursor.rowcount
+                if rowcount > 0:
+                    self._logChanges(cursor, "Book", [bookId], deleted=True)
+                self._releaseCover(cursor, imageHash)
+                self._removeHistoryStats(cursor, borrowRows, historyRows, bookCount=-rowcount)
+                connection.commit()
+                self.bookCache.remove(bookId)
+                self.isbnCache.clear()
+                self.borrowReviewCache.removeWhere(lambda key: key[0] == bookId)
+                if rowcount > 0:
+                    return (True, None)
+                else:
+                    return (False, f"Not found book ID {bookId}")
         except Exception as err:
             return False, str(err)
 
-    def _listBookProcess(self, execute: Callable[[], Optional[Generator[MySQLCursorAbstract, None, None]]]) -> ExecuteResult[list[BookData]]:
+    def migrateCovers(self, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[tuple[int, int]]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(
+                    "SELECT bookId, image, thumbnail FROM Book WHERE bookId > %s AND image IS NOT NULL AND imageHash IS NULL ORDER BY bookId LIMIT %s FOR UPDATE",
+                    (afterId, self._pageLimit(limit))
+                )
+                result = cursor.fetchall()
+
+                lastId = afterId
+                for row in result:
+                    if type(row) is tuple and type(row[0]) is int:
+                        imageHash = self._storeCover(cursor, bytes(row[1]), bytes(row[2]) if row[2] is not None else None) # type: ignore
+                        cursor.execute("UPDATE Book SET imageHash = %s, image = NULL, thumbnail = NULL WHERE bookId = %s", (imageHash, row[0]))
+                        lastId = row[0]
+
+                connection.commit()
+                self.bookCache.clear()
+                self.borrowReviewCache.clear()
+            return (True, (len(result), lastId))
+        except Exception as err:
+            return (False, str(err))
+
+    def _listBookProcess(self, sql: str, params: tuple = ()) -> ExecuteResult[list[BookData]]:
         try:
-            execute()
-            result = self.cursor.fetchall()
+            with self._cursor() as (connection, cursor):
+                cursor.execute(sql, params)
+                result = cursor.fetchall()
             data: list[BookData] = []
             if type(result) is list:
                 for row in result:
                     if type(row) is tuple:
-                        data.append(self._RowTypeToBookData(row))
+                        data.append(self._RowToBookData(row))
                 return (True, data)
             else:
                 return (False, str("Data process error"))
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
-    def listBook(self) -> ExecuteResult[list[BookData]]:
-        return self._listBookProcess(lambda: self.cursor.execute("SELECT bookId, image, title, author, isbn10, isbn13, publication, description FROM Book"))
+    def listBook(self, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[BookData]]:
+        return self._listBookProcess(
+            "SELECT bookId, NULL, title, author, isbn10, isbn13, publication, description FROM Book WHERE bookId > %s ORDER BY bookId LIMIT %s",
+            (afterId, self._pageLimit(limit))
+        )
+
+    def listBookByIds(self, bookIds: list[int]) -> ExecuteResult[list[BookData]]:
+        if len(bookIds) == 0:
+            return (True, [])
+
+        return self._listBookProcess(
+            f"SELECT bookId, NULL, title, author, isbn10, isbn13, publication, description FROM Book WHERE bookId IN ({self._placeholders(len(bookIds))}) ORDER BY bookId",
+            tuple(bookIds)
+        )
+
+    def getBookChanges(self, afterChangeId: Optional[int]) -> ExecuteResult[ChangeSetData]:
+        return self._getChanges("Book", afterChangeId, self.listBookByIds, lambda book: book.bookId)
 
     def clearBook(self) -> ExecuteResult[None]:
         try:
-            self.cursor.execute("DELETE FROM Borrow")
-            self.cursor.execute("DELETE FROM BorrowHistory")
-            self.cursor.execute("DELETE FROM Book")
-            self.connection.commit()
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
+            with self._cursor() as (connection, cursor):
+                cursor.execute("DELETE FROM Borrow")
+                cursor.execute("DELETE FROM BorrowHistory")
+                cursor.execute("DELETE FROM Book")
+                cursor.execute("DELETE FROM CoverImage")
+                self._resetStats(cursor, "bookCount", "borrowingCount", "returnedCount", "allTimeBorrowedCount")
+                self._logCleared(cursor, "Book", "BorrowHistory")
+                connection.commit()
+                self.bookCache.clear()
+                self.isbnCache.clear()
+                self.borrowReviewCache.clear()
         except Exception as err:
             return False, str(err)
 
         return (True, None)
 
-    def searchBookByTitle(self, title: str) -> ExecuteResult[list[BookData]]:
-        return self._listBookProcess(lambda: self.cursor.execute("SELECT bookId, image, title, author, isbn10, isbn13, publication, description FROM Book WHERE title LIKE %s", (f"%{title}%", )))
+    def searchBookByTitle(self, title: str, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[BookData]]:
+        return self._listBookProcess(
+            "SELECT bookId, NULL, title, author, isbn10, isbn13, publication, description FROM Book WHERE title LIKE %s AND bookId > %s ORDER BY bookId LIMIT %s",
+            (f"%{title}%", afterId, self._pageLimit(limit))
+        )
+
+    def _fulltextQuery(self, query: str) -> Optional[str]:
+        # Words shorter than innodb_ft_min_token_size are not indexed, so they can never match
+        words = [word for word in re.findall(r"\w+", query) if len(word) >= CONFIG.LMS.FULLTEXT_MIN_WORD_LENGTH]
+        if len(words) == 0:
+            return None
+        return self._getBackend().fulltextQuery(words)
+
+    def searchBook(self, query: str, offset: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[BookData]]:
+        fulltext = self._fulltextQuery(query)
+
+        if fulltext is None:
+            return self._listBookProcess(
+                "SELECT bookId, NULL, title, author, isbn10, isbn13, publication, description FROM Book WHERE title LIKE %s ORDER BY bookId LIMIT %s OFFSET %s",
+                (f"%{query}%", self._pageLimit(limit), offset)
+            )
+
+        return self._listBookProcess(*self._getBackend().bookSearchSql(
+            "SELECT bookId, NULL, title, author, isbn10, isbn13, publication, description",
+            fulltext, self._pageLimit(limit), offset
+        ))
 
     def addUser(self, data: UserData) -> ExecuteResult[None]:
         try:
-            self.cursor.execute(
-                "INSERT INTO User (prefixName, firstName, lastName, email, phone, address) VALUES (%s, %s, %s, %s, %s, %s)",
-                (data.prefixName, data.firstName, data.lastName, data.email, data.phone, data.address)
-            )
-            self.connection.commit()
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
+            with self._cursor() as (connection, cursor):
+                cursor.execute(
+                    "INSERT INTO User (prefixName, firstName, lastName, email, phone, address) VALUES (%s, %s, %s, %s, %s, %s)",
+                    (data.prefixName, data.firstName, data.lastName, data.email, data.phone, data.address)
+                )
+                userId = cursor.lastrowid or 0
+                self._logChanges(cursor, "User", [userId])
+                self._updateStats(cursor, userCount=1)
+                connection.commit()
+                self.userIndex.put([UserData(userId, data.prefixName, data.firstName, data.lastName, data.email, data.phone, data.address)])
         except Exception as err:
             return (False, str(err))
 
         return (True, None)
 
-    def removeUser(self, userId: int) -> ExecuteResult[None]:
+    def addUsers(self, users: list[UserData]) -> ExecuteResult[int]:
+        if len(users) == 0:
+            return (True, 0)
+
         try:
-            self.cursor.execute("DELETE FROM Borrow WHERE userId = %s", (userId, ))
-            self.cursor.execute("DELETE FROM BorrowHistory WHERE userId = %s", (userId, ))
-            self.cursor.execute("DELETE FROM User WHERE userId = %s", (userId, ))
-            self.connection.commit()
-            if self.cursor.rowcount > 0:
-                return (True, None)
-            else:
-                return (False, f"Not found user ID {userId}")
-        except MysqlError as err:
-            self.connection.rollback()
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT COALESCE(MAX(userId), 0) FROM User")
+                lastId = cursor.fetchone()[0] # type: ignore
+                cursor.executemany(
+                    "INSERT INTO User (prefixName, firstName, lastName, email, phone, address) VALUES (%s, %s, %s, %s, %s, %s)",
+                    [(data.prefixName, data.firstName, data.lastName, data.email, data.phone, data.address) for data in users]
+                )
+                rowcount = cursor.rowcount
+                self._logChangesFrom(cursor, "User", "userId", "FROM User WHERE userId > %s", (lastId, ))
+                self._updateStats(cursor, userCount=rowcount)
+                connection.commit()
+                # The new ids are only known to the change log, the next search reads it
+                self.userIndex.expire()
+            return (True, rowcount)
+        except Exception as err:
             return (False, str(err))
+
+    def removeUser(self, userId: int) -> ExecuteResult[None]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("DELETE FROM Borrow WHERE userId = %s", (userId, ))
+                borrowRows = cursor.rowcount
+                self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM BorrowHistory WHERE userId = %s", (userId, ), deleted=True)
+                cursor.execute("DELETE FROM BorrowHistory WHERE userId = %s", (userId, ))
+                historyRows = cursor.rowcount
+                cursor.execute("DELETE FROM User WHERE userId = %s", (userId, ))
+                rowcount = cursor.rowcount
+                if rowcount > 0:
+                    self._logChanges(cursor, "User", [userId], deleted=True)
+                self._removeHistoryStats(cursor, borrowRows, historyRows, userCount=-rowcount)
+                connection.commit()
+                self.userCache.remove(userId)
+                self.userIndex.remove([userId])
+                self.borrowReviewCache.removeWhere(lambda key: key[1] == userId)
+                if rowcount > 0:
+                    return (True, None)
+                else:
+                    return (False, f"Not found user ID {userId}")
         except Exception as err:
             return (False, str(err))
 
     def clearUser(self) -> ExecuteResult[None]:
         try:
-            self.cursor.execute("DELETE FROM Borrow")
-            self.cursor.execute("DELETE FROM BorrowHistory")
-            self.cursor.execute("DELETE FROM User")
-            self.connection.commit()
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
+            with self._cursor() as (connection, cursor):
+                cursor.execute("DELETE FROM Borrow")
+                cursor.execute("DELETE FROM BorrowHistory")
+                cursor.execute("DELETE FROM User")
+                self._resetStats(cursor, "userCount", "borrowingCount", "returnedCount", "allTimeBorrowedCount")
+                self._logCleared(cursor, "User", "BorrowHistory")
+                connection.commit()
+                self.userCache.clear()
+                self.userIndex.clear()
+                self.borrowReviewCache.clear()
         except Exception as err:
             return (False, str(err))
 
         return (True, None)
 
-    def _RowTypeToUserData(self, row: RowType) -> UserData:
+    def _RowToUserData(self, row: Row) -> UserData:
         return UserData(
             userId=(row[0] if type(row[0]) is int else None),
             prefixName=(row[1] if type(row[1]) is str else None),
@@ -217,17 +681,20 @@ class DBSession:
         )
 
     def getUser(self, userId: int) -> ExecuteResult[Optional[UserData]]:
+        generation = self.userCache.generation
+        found, cached = self.userCache.get(userId)
+        if found:
+            return (True, copy(cached))
+
         try:
-            self.cursor.execute("SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User WHERE userId = %s LIMIT 1", (userId, ))
-            result = self.cursor.fetchone()
+            with self._cursor() as (connection, cursor):
+                rows = self._queryPrepared(connection, "SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User WHERE userId = %s LIMIT 1", (userId, ))
 
-            if type(result) is tuple:
-                data = self._RowTypeToUserData(result)
+            if len(rows) > 0:
+                data = self._RowToUserData(rows[0])
+                self.userCache.put(userId, copy(data), generation)
             else:
                 return (True, None)
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
@@ -238,66 +705,132 @@ class DBSession:
             return False, "data.userId is None"
 
         try:
-            colvals: list[tuple[str, Union[str, None]]] = []
-
-            if old_data is not None:
-                if data.prefixName != old_data.prefixName: colvals.append(("prefixName", data.prefixName))
-                if data.firstName != old_data.firstName: colvals.append(("firstName", data.firstName))
-                if data.lastName != old_data.lastName: colvals.append(("lastName", data.lastName))
-                if data.email != old_data.email: colvals.append(("email", data.email))
-                if data.phone != old_data.phone: colvals.append(("phone", data.phone))
-                if data.address != old_data.address: colvals.append(("address", data.address))
-            else:
-                colvals = [("prefixName", data.prefixName), ("firstName", data.firstName), ("lastName", data.lastName), ("email", data.email), ("phone", data.phone), ("address", data.address)]
-
-            if len(colvals) > 0:
-                self.cursor.execute("UPDATE User SET " + (", ".join([f"{i[0]}=%s" for i in colvals])) + " WHERE userId = %s", tuple([i[1] for i in colvals] + [data.userId]))
-                self.connection.commit()
+            values = [data.prefixName, data.firstName, data.lastName, data.email, data.phone, data.address]
+            mask = self._changedMask(values, None if old_data is None else [old_data.prefixName, old_data.firstName, old_data.lastName, old_data.email, old_data.phone, old_data.address])
+
+            if mask != 0:
+                with self._cursor() as (connection, cursor):
+                    self._update(connection, "User", "userId", self.USER_UPDATE_COLUMNS, mask, values, data.userId)
+                    self._logChanges(cursor, "User", [data.userId])
+                    # The history list shows prefix, first and last name
+                    if mask & 0b111:
+                        self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM BorrowHistory WHERE userId = %s", (data.userId, ))
+                    connection.commit()
+                    self.userCache.remove(data.userId)
+                    self.userIndex.put([data])
+                    self.borrowReviewCache.removeWhere(lambda key: key[1] == data.userId)
             else:
                 return (False, "No update")
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return False, str(err)
 
         return (True, None)
 
-    def _listUserProcess(self, execute: Callable[[], Optional[Generator[MySQLCursorAbstract, None, None]]]) -> ExecuteResult[list[UserData]]:
+    def _listUserProcess(self, sql: str, params: tuple = ()) -> ExecuteResult[list[UserData]]:
         try:
-            execute()
-            result = self.cursor.fetchall()
+            with self._cursor() as (connection, cursor):
+                cursor.execute(sql, params)
+                result = cursor.fetchall()
             data: list[UserData] = []
             if type(result) is list:
                 for row in result:
                     if type(row) is tuple:
-                        data.append(self._RowTypeToUserData(row))
+                        data.append(self._RowToUserData(row))
                 return (True, data)
             else:
                 return (False, str("Data process error"))
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
-    def listUser(self) -> ExecuteResult[list[UserData]]:
-        return self._listUserProcess(lambda: self.cursor.execute("SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User"))
+    def listUser(self, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[UserData]]:
+        return self._listUserProcess(
+            "SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User WHERE userId > %s ORDER BY userId LIMIT %s",
+            (afterId, self._pageLimit(limit))
+        )
+
+    def listUserByIds(self, userIds: list[int]) -> ExecuteResult[list[UserData]]:
+        if len(userIds) == 0:
+            return (True, [])
+
+        return self._listUserProcess(
+            f"SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User WHERE userId IN ({self._placeholders(len(userIds))}) ORDER BY userId",
+            tuple(userIds)
+        )
 
-    def searchUserByName(self, firstName: Optional[str], lastName: Optional[str]) -> ExecuteResult[list[UserData]]:
+    def getUserChanges(self, afterChangeId: Optional[int]) -> ExecuteResult[ChangeSetData]:
+        return self._getChanges("User", afterChangeId, self.listUserByIds, lambda user: user.userId)
+
+    def searchUserByName(self, firstName: Optional[str], lastName: Optional[str], afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[UserData]]:
         sql = "SELECT userId, prefixName, firstName, lastName, email, phone, address FROM User WHERE "
+        page = " AND userId > %s ORDER BY userId LIMIT %s"
 
         if firstName is not None and lastName is None:
-            return self._listUserProcess(lambda: self.cursor.execute(sql + "firstName LIKE %s", (f"%{firstName}%", )))
+            return self._listUserProcess(sql + "firstName LIKE %s" + page, (f"%{firstName}%", afterId, self._pageLimit(limit)))
         elif firstName is None and lastName is not None:
-            return self._listUserProcess(lambda: self.cursor.execute(sql + "lastName LIKE %s", (f"%{lastName}%", )))
+            return self._listUserProcess(sql + "lastName LIKE %s" + page, (f"%{lastName}%", afterId, self._pageLimit(limit)))
         else:
-            return self._listUserProcess(lambda: self.cursor.execute(sql + "firstName LIKE %s AND lastName LIKE %s", (f"%{firstName}%", f"%{lastName}%")))
+            return self._listUserProcess(sql + "firstName LIKE %s AND lastName LIKE %s" + page, (f"%{firstName}%", f"%{lastName}%", afterId, self._pageLimit(limit)))
+
+    def syncUserIndex(self) -> ExecuteResult[int]:
+        index = self.userIndex
+        with index.syncLock:
+            if index.ready and monotonic() - index.syncedAt < CONFIG.LMS.USER_INDEX_SYNC_INTERVAL:
+                return (True, len(index))
+
+            # Other desks change users too, their changes come from the change log
+            if index.ready and index.syncedChangeId is not None:
+                changes = self.getUserChanges(index.syncedChangeId)
+                if changes[0] == False:
+                    return changes
+                if not changes[1].cleared:
+                    index.put(changes[1].rows)
+                    index.remove(changes[1].deleted)
+                    index.synced(changes[1].lastChangeId)
+                    return (True, len(index))
+
+            position = self.getUserChanges(None)
+            if position[0] == False:
+                return position
+
+            try:
+                _, rows = self.streamUser()
+                index.load((self._RowToUserData(row) for row in rows), position[1].lastChangeId)
+            except Exception as err:
+                index.clear()
+                return (False, str(err))
+
+        return (True, len(index))
+
+    def searchUser(self, query: str, offset: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[UserData]]:
+        synced = self.syncUserIndex()
+        if synced[0] == False:
+            return synced
+
+        end = offset + self._pageLimit(limit)
+        userIds = self.userIndex.search(query, end)[offset:end]
+        result = self.listUserByIds(userIds)
+        if result[0] == False:
+            return result
+
+        # listUserByIds orders by userId, the page keeps the ranking
+        users = {user.userId: user for user in result[1]}
+        return (True, [users[userId] for userId in userIds if userId in users])
 
     def borrowBookGetReview(self, bookId: int, userId: int) -> ExecuteResult[BookBorrowReviewData]:
+        generation = self.borrowReviewCache.generation
+        found, cached = self.borrowReviewCache.get((bookId, userId))
+        if found and cached is not None:
+            return (True, copy(cached))
+
         try:
-            self.cursor.execute("SELECT Book.bookId, User.userId, Book.title, User.prefixName, User.firstName, User.lastName, Book.image FROM Book, User WHERE Book.bookId = %s AND User.userId = %s", (bookId, userId))
-            result = self.cursor.fetchall()
+            with self._cursor() as (connection, cursor):
+                result = self._queryPrepared(
+                    connection,
+                    "SELECT Book.bookId, User.userId, Book.title, User.prefixName, User.firstName, User.lastName, COALESCE(CoverImage.thumbnail, CoverImage.image) " +
+                    "FROM Book " +
+                    "INNER JOIN User ON User.userId = %s " +
+                    "LEFT JOIN CoverImage ON Book.imageHash = CoverImage.imageHash " +
+                    "WHERE Book.bookId = %s", (userId, bookId))
             if type(result) is list:
                 for row in result:
                     if type(row) is tuple:
@@ -305,16 +838,15 @@ class DBSession:
                         if type(row[3]) is str: name += row[3] + "."
                         if type(row[4]) is str: name += row[4]
                         if type(row[5]) is str: name += " " + row[5]
-                        return (True, BookBorrowReviewData(
+                        data = BookBorrowReviewData(
                             bookId=(row[0] if type(row[0]) is int else 0),
                             userId=(row[1] if type(row[1]) is int else 0),
                             bookTitle=(row[2] if type(row[2]) is str else ""),
                             userName=name,
                             bookImage=(row[6] if type(row[6]) is bytes else b"")
-                        ))
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
+                        )
+                        self.borrowReviewCache.put((bookId, userId), copy(data), generation)
+                        return (True, data)
         except Exception as err:
             return (False, str(err))
 
@@ -322,15 +854,18 @@ class DBSession:
 
     def returnBookGetReview(self, bookId: int) -> ExecuteResult[BookReturnReviewData]:
         try:
-            self.cursor.execute(
-                "SELECT Borrow.bookId, Borrow.userId, Book.title, User.prefixName, User.firstName, User.lastName, Book.image, BorrowHistory.borrowed " +
-                "FROM Borrow " +
-                "INNER JOIN Book ON Borrow.bookId = Book.bookId " +
-                "INNER JOIN User ON Borrow.userId = User.userId " +
-                "INNER JOIN BorrowHistory ON Borrow.historyId = BorrowHistory.historyId " +
-                "WHERE Borrow.bookId = %s AND BorrowHistory.returned IS NULL", (bookId, ))
-            result = self.cursor.fetchone()
-            if type(result) is tuple:
+            with self._cursor() as (connection, cursor):
+                rows = self._queryPrepared(
+                    connection,
+                    "SELECT Borrow.bookId, Borrow.userId, Book.title, User.prefixName, User.firstName, User.lastName, COALESCE(CoverImage.thumbnail, CoverImage.image), BorrowHistory.borrowed " +
+                    "FROM Borrow " +
+                    "INNER JOIN Book ON Borrow.bookId = Book.bookId " +
+                    "LEFT JOIN CoverImage ON Book.imageHash = CoverImage.imageHash " +
+                    "INNER JOIN User ON Borrow.userId = User.userId " +
+                    "INNER JOIN BorrowHistory ON Borrow.historyId = BorrowHistory.historyId " +
+                    "WHERE Borrow.bookId = %s AND BorrowHistory.returned IS NULL", (bookId, ))
+            if len(rows) > 0:
+                result = rows[0]
                 name = ""
                 if type(result[3]) is str: name += result[3] + "."
                 if type(result[4]) is str: name += result[4]
@@ -343,9 +878,6 @@ class DBSession:
                     bookImage=(result[6] if type(result[6]) is bytes else b""),
                     borrowed=(result[7] if type(result[7]) is datetime else datetime.fromtimestamp(0))
                 ))
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
@@ -353,36 +885,165 @@ class DBSession:
 
     def borrowBook(self, bookId: int, userId: int) -> ExecuteResult[None]:
         try:
-            self.cursor.execute("INSERT INTO BorrowHistory (bookId, userId, borrowed) VALUES (%s, %s, %s)", (bookId, userId, datetime.now()))
-            self.cursor.execute("INSERT INTO Borrow (bookId, userId, historyId) VALUES (%s, %s, %s)", (bookId, userId, self.cursor.lastrowid))
-            self.connection.commit()
+            with self._cursor() as (connection, cursor):
+                cursor.execute("INSERT INTO BorrowHistory (bookId, userId, borrowed) VALUES (%s, %s, %s)", (bookId, userId, datetime.now()))
+                historyId = cursor.lastrowid or 0
+                cursor.execute("INSERT INTO Borrow (bookId, userId, historyId) VALUES (%s, %s, %s)", (bookId, userId, historyId))
+                self._logChanges(cursor, "BorrowHistory", [historyId])
+                self._updateStats(cursor, borrowingCount=1, allTimeBorrowedCount=1)
+                connection.commit()
             return (True, None)
-        except MysqlError as err:
-            self.connection.rollback()
-            if err.errno == ER_DUP_ENTRY:
-                return (False, "This book has been borrowed.\n\n" + str(err))
-            return (False, str(err))
         except Exception as err:
+            if self.backend is not None and self.backend.isDuplicateKey(err):
+                return (False, "This book has been borrowed.\n\n" + str(err))
             return False, str(err)
 
     def returnBook(self, bookId: int) -> ExecuteResult[None]:
         try:
-            self.cursor.execute("UPDATE BorrowHistory SET returned = %s WHERE historyId = (SELECT historyId FROM Borrow WHERE bookId = %s)", (datetime.now(), bookId))
-            rowcount = self.cursor.rowcount
-            self.cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (bookId, ))
-            rowcount += self.cursor.rowcount
-            self.connection.commit()
+            with self._cursor() as (connection, cursor):
+                cursor.execute("UPDATE BorrowHistory SET returned = %s WHERE historyId = (SELECT historyId FROM Borrow WHERE bookId = %s)", (datetime.now(), bookId))
+                returnedRows = cursor.rowcount
+                self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM Borrow WHERE bookId = %s", (bookId, ))
+                cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (bookId, ))
+                borrowRows = cursor.rowcount
+                rowcount = returnedRows + borrowRows
+                self._updateStats(cursor, borrowingCount=-borrowRows, returnedCount=returnedRows)
+                connection.commit()
             if rowcount > 0:
                 return (True, None)
             else:
                 return (False, f"This book ID was not found in the borrowing list.")
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return False, str(err)
 
-    def _RowTypeToBorrowHistory(self, row: RowType) -> BookBorrowHistoryData:
+    @staticmethod
+    def _placeholders(count: int) -> str:
+        return ", ".join(["%s"] * count)
+
+    @staticmethod
+    def _uniqueBookIds(bookIds: list[int]) -> tuple[list[int], list[CirculationResultData]]:
+        unique: list[int] = []
+        duplicated: list[CirculationResultData] = []
+        for bookId in bookIds:
+            if bookId in unique:
+                duplicated.append(CirculationResultData(bookId, False, "This book ID is listed more than once."))
+            else:
+                unique.append(bookId)
+        return (unique, duplicated)
+
+    @staticmethod
+    def _borrowResults(bookIds: list[int], found: set[int], borrowed: set[int]) -> list[CirculationResultData]:
+        results: list[CirculationResultData] = []
+        for bookId in bookIds:
+            if bookId not in found:
+                results.append(CirculationResultData(bookId, False, f"Not found book ID {bookId}"))
+            elif bookId in borrowed:
+                results.append(CirculationResultData(bookId, False, "This book has been borrowed."))
+            else:
+                results.append(CirculationResultData(bookId, True, ""))
+        return results
+
+    def borrowBooksGetReview(self, userId: int, bookIds: list[int]) -> ExecuteResult[BooksBorrowReviewData]:
+        # Same checks as borrowBooks without taking the locks, so the review lists what borrowing will do
+        bookIds, duplicated = self._uniqueBookIds(bookIds)
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT prefixName, firstName, lastName FROM User WHERE userId = %s", (userId, ))
+                user = cursor.fetchone()
+                if type(user) is not tuple:
+                    return (False, f"Not found user ID {userId}")
+
+                found: set[int] = set()
+                borrowed: set[int] = set()
+                if len(bookIds) > 0:
+                    placeholders = self._placeholders(len(bookIds))
+                    cursor.execute(f"SELECT bookId FROM Book WHERE bookId IN ({placeholders})", tuple(bookIds))
+                    found = {row[0] for row in cursor.fetchall() if type(row) is tuple}
+                    cursor.execute(f"SELECT bookId FROM Borrow WHERE bookId IN ({placeholders})", tuple(bookIds))
+                    borrowed = {row[0] for row in cursor.fetchall() if type(row) is tuple}
+
+            name = ""
+            if type(user[0]) is str: name += user[0] + "."
+            if type(user[1]) is str: name += user[1]
+            if type(user[2]) is str: name += " " + user[2]
+            return (True, BooksBorrowReviewData(userId, name, self._borrowResults(bookIds, found, borrowed) + duplicated))
+        except Exception as err:
+            return (False, str(err))
+
+    def borrowBooks(self, userId: int, bookIds: list[int]) -> ExecuteResult[list[CirculationResultData]]:
+        bookIds, duplicated = self._uniqueBookIds(bookIds)
+        if len(bookIds) == 0:
+            return (True, duplicated)
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT userId FROM User WHERE userId = %s", (userId, ))
+                if cursor.fetchone() is None:
+                    return (False, f"Not found user ID {userId}")
+
+                placeholders = self._placeholders(len(bookIds))
+                cursor.execute(f"SELECT bookId FROM Book WHERE bookId IN ({placeholders})", tuple(bookIds))
+                found = {row[0] for row in cursor.fetchall() if type(row) is tuple}
+                cursor.execute(f"SELECT bookId FROM Borrow WHERE bookId IN ({placeholders}) FOR UPDATE", tuple(bookIds))
+                borrowed = {row[0] for row in cursor.fetchall() if type(row) is tuple}
+
+                accepted = [bookId for bookId in bookIds if bookId in found and bookId not in borrowed]
+                if len(accepted) > 0:
+                    # DATETIME drops the fraction, match rows on the value that was actually stored
+                    now = datetime.now().replace(microsecond=0)
+                    cursor.execute("SELECT COALESCE(MAX(historyId), 0) FROM BorrowHistory")
+                    lastId = cursor.fetchone()[0] # type: ignore
+                    cursor.execute(
+                        f"INSERT INTO BorrowHistory (bookId, userId, borrowed) VALUES {', '.join(['(%s, %s, %s)'] * len(accepted))}",
+                        tuple(value for bookId in accepted for value in (bookId, userId, now))
+                    )
+                    # Auto increment values of one statement are ascending but not necessarily consecutive,
+                    # and lastrowid is the first of them on MySQL but the last on SQLite
+                    cursor.execute(
+                        "INSERT INTO Borrow (bookId, userId, historyId) SELECT bookId, userId, historyId FROM BorrowHistory " +
+                        f"WHERE historyId > %s AND userId = %s AND borrowed = %s AND bookId IN ({self._placeholders(len(accepted))})",
+                        (lastId, userId, now, *accepted)
+                    )
+                    self._logChangesFrom(cursor, "BorrowHistory", "historyId", f"FROM Borrow WHERE bookId IN ({self._placeholders(len(accepted))})", tuple(accepted))
+                    self._updateStats(cursor, borrowingCount=len(accepted), allTimeBorrowedCount=len(accepted))
+                    connection.commit()
+
+            return (True, self._borrowResults(bookIds, found, borrowed) + duplicated)
+        except Exception as err:
+            return (False, str(err))
+
+    def returnBooks(self, bookIds: list[int]) -> ExecuteResult[list[CirculationResultData]]:
+        bookIds, duplicated = self._uniqueBookIds(bookIds)
+        if len(bookIds) == 0:
+            return (True, duplicated)
+
+        results: list[CirculationResultData] = []
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(f"SELECT bookId, historyId FROM Borrow WHERE bookId IN ({self._placeholders(len(bookIds))}) FOR UPDATE", tuple(bookIds))
+                borrowed = {row[0]: row[1] for row in cursor.fetchall() if type(row) is tuple}
+
+                if len(borrowed) > 0:
+                    historyIds = list(borrowed.values())
+                    cursor.execute(f"UPDATE BorrowHistory SET returned = %s WHERE historyId IN ({self._placeholders(len(historyIds))})", (datetime.now(), *historyIds))
+                    returnedRows = cursor.rowcount
+                    self._logChanges(cursor, "BorrowHistory", historyIds)
+                    cursor.execute(f"DELETE FROM Borrow WHERE bookId IN ({self._placeholders(len(borrowed))})", tuple(borrowed))
+                    self._updateStats(cursor, borrowingCount=-cursor.rowcount, returnedCount=returnedRows)
+                    connection.commit()
+
+            for bookId in bookIds:
+                if bookId in borrowed:
+                    results.append(CirculationResultData(bookId, True, ""))
+                else:
+                    results.append(CirculationResultData(bookId, False, "This book ID was not found in the borrowing list."))
+            return (True, results + duplicated)
+        except Exception as err:
+            return (False, str(err))
+
+    def _RowToBorrowHistory(self, row: Row) -> BookBorrowHistoryData:
         name = ""
         if type(row[4]) is str: name += row[4] + "."
         if type(row[5]) is str: name += row[5]
@@ -398,90 +1059,107 @@ class DBSession:
             returned=(row[8] if type(row[8]) is datetime else None)
         )
 
-    def _listBorrowHistoryProcess(self, execute: Callable[[], Optional[Generator[MySQLCursorAbstract, None, None]]]) -> ExecuteResult[list[BookBorrowHistoryData]]:
+    def _listBorrowHistoryProcess(self, sql: str, params: tuple = ()) -> ExecuteResult[list[BookBorrowHistoryData]]:
         try:
-            execute()
-            result = self.cursor.fetchall()
+            with self._cursor() as (connection, cursor):
+                cursor.execute(sql, params)
+                result = cursor.fetchall()
             data: list[BookBorrowHistoryData] = []
             if type(result) is list:
                 for row in result:
                     if type(row) is tuple:
-                        data.append(self._RowTypeToBorrowHistory(row))
+                        data.append(self._RowToBorrowHistory(row))
                 return (True, data)
             else:
                 return (False, str("Data process error"))
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
-    def listBorrowHistory(self) -> ExecuteResult[list[BookBorrowHistoryData]]:
-        sql = (
-            "SELECT BorrowHistory.historyId, BorrowHistory.bookId, Book.title, BorrowHistory.userId, User.prefixName, User.firstName, User.lastName, BorrowHistory.borrowed, BorrowHistory.returned " +
-            "FROM BorrowHistory " +
-            "INNER JOIN Book ON BorrowHistory.bookId = Book.bookId " +
-            "INNER JOIN User ON BorrowHistory.userId = User.userId"
-        )
-        return self._listBorrowHistoryProcess(lambda: self.cursor.execute(sql))
-
-    def searchBorrowHistoryByBookOrUserId(self, bookId: Optional[int], userId: Optional[int], borrowing: Optional[bool] = None, returned: Optional[bool] = None) -> ExecuteResult[list[BookBorrowHistoryData]]:
-        sql = (
-            "SELECT BorrowHistory.historyId, BorrowHistory.bookId, Book.title, BorrowHistory.userId, User.prefixName, User.firstName, User.lastName, BorrowHistory.borrowed, BorrowHistory.returned " +
-            "FROM BorrowHistory " +
-            "INNER JOIN Book ON BorrowHistory.bookId = Book.bookId " +
-            "INNER JOIN User ON BorrowHistory.userId = User.userId " +
-            "WHERE "
+    def listBorrowHistory(self, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[BookBorrowHistoryData]]:
+        return self.searchBorrowHistoryByBookOrUserId(None, None, afterId=afterId, limit=limit)
+
+    def listBorrowHistoryByIds(self, historyIds: list[int]) -> ExecuteResult[list[BookBorrowHistoryData]]:
+        if len(historyIds) == 0:
+            return (True, [])
+
+        return self._listBorrowHistoryProcess(
+            self.BORROW_HISTORY_SELECT + f"WHERE BorrowHistory.historyId IN ({self._placeholders(len(historyIds))}) ORDER BY BorrowHistory.historyId",
+            tuple(historyIds)
         )
 
+    def getBorrowHistoryChanges(self, afterChangeId: Optional[int]) -> ExecuteResult[ChangeSetData]:
+        return self._getChanges("BorrowHistory", afterChangeId, self.listBorrowHistoryByIds, lambda history: history.historyId)
+
+    def _searchBorrowHistorySql(self, bookId: Optional[int], userId: Optional[int], borrowing: Optional[bool], returned: Optional[bool], afterId: int, limit: Optional[int]) -> tuple[str, tuple]:
+        sql = self.BORROW_HISTORY_SELECT + "WHERE BorrowHistory.historyId > %s"
+
         sql2 = ""
-        values: Union[tuple[int], tuple[int, int], tuple] = ()
-
-        if bookId is not None and userId is None:
-            sql2 = "BorrowHistory.bookId = %s"
-            values = (bookId, )
-        elif bookId is None and userId is not None:
-            sql2 = "BorrowHistory.userId = %s"
-            values = (userId, )
-        elif bookId is not None and userId is not None:
-            sql2 = "BorrowHistory.bookId = %s AND BorrowHistory.userId = %s"
-            values = (bookId, userId)
-        else:
-            sql2 = ""
+        values: tuple = (afterId, )
+
+        if bookId is not None:
+            sql2 += " AND BorrowHistory.bookId = %s"
+            values += (bookId, )
+        if userId is not None:
+            sql2 += " AND BorrowHistory.userId = %s"
+            values += (userId, )
 
         if borrowing is True:
-            sql2 = (" AND " if sql2 != "" else "") + "BorrowHistory.returned IS NULL"
+            sql2 += " AND BorrowHistory.returned IS NULL"
         elif returned is True:
-            sql2 = (" AND " if sql2 != "" else "") + "BorrowHistory.returned IS NOT NULL"
+            sql2 += " AND BorrowHistory.returned IS NOT NULL"
+
+        return (sql + sql2 + " ORDER BY BorrowHistory.historyId LIMIT %s", values + (self._pageLimit(limit), ))
 
-        return self._listBorrowHistoryProcess(lambda: self.cursor.execute(sql + sql2, values))
+    def searchBorrowHistoryByBookOrUserId(self, bookId: Optional[int], userId: Optional[int], borrowing: Optional[bool] = None, returned: Optional[bool] = None, afterId: int = 0, limit: Optional[int] = None) -> ExecuteResult[list[BookBorrowHistoryData]]:
+        return self._listBorrowHistoryProcess(*self._searchBorrowHistorySql(bookId, userId, borrowing, returned, afterId, limit))
+
+    def addBorrowHistory(self, records: list[BookBorrowHistoryData]) -> ExecuteResult[int]:
+        # Records without a returned date become current loans, at most one per book
+        if len(records) == 0:
+            return (True, 0)
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT COALESCE(MAX(historyId), 0) FROM BorrowHistory")
+                lastId = cursor.fetchone()[0] # type: ignore
+                cursor.executemany(
+                    "INSERT INTO BorrowHistory (bookId, userId, borrowed, returned) VALUES (%s, %s, %s, %s)",
+                    [(data.bookId, data.userId, data.borrowed, data.returned) for data in records]
+                )
+                historyRows = cursor.rowcount
+                cursor.execute(
+                    "INSERT INTO Borrow (bookId, userId, historyId) SELECT bookId, userId, historyId FROM BorrowHistory WHERE historyId > %s AND returned IS NULL",
+                    (lastId, )
+                )
+                borrowRows = cursor.rowcount
+                self._logChangesFrom(cursor, "BorrowHistory", "historyId", "FROM BorrowHistory WHERE historyId > %s", (lastId, ))
+                self._updateStats(cursor, borrowingCount=borrowRows, returnedCount=historyRows - borrowRows, allTimeBorrowedCount=historyRows)
+                connection.commit()
+            return (True, historyRows)
+        except Exception as err:
+            return (False, str(err))
 
     def updateBorrowHistory(self, data: BookBorrowHistoryData, old_data: Optional[BookBorrowHistoryData] = None) -> ExecuteResult[None]:
         if data.userId is None:
             return False, "data.userId is None"
 
         try:
-            colvals: list[tuple[str, Union[int, datetime, None]]] = []
-
-            if old_data is not None:
-                if data.bookId != old_data.bookId: colvals.append(("bookId", data.bookId))
-                if data.userId != old_data.userId: colvals.append(("userId", data.userId))
-                if data.borrowed != old_data.borrowed: colvals.append(("borrowed", data.borrowed))
-                if data.returned != old_data.returned: colvals.append(("returned", data.returned))
-            else:
-                colvals = [("bookId", data.bookId), ("userId", data.userId), ("borrowed", data.borrowed), ("returned", data.returned)]
-            if len(colvals) > 0:
-                if old_data is not None and old_data.returned is None and data.returned is not None:
-                    self.cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (old_data.bookId, ))
-                elif old_data is not None and old_data.returned is not None and data.returned is None:
-                    self.cursor.execute("INSERT INTO Borrow (bookId, userId, historyId) VALUES (%s, %s, %s)", (data.bookId, data.userId, data.historyId))
-                self.cursor.execute("UPDATE BorrowHistory SET " + (", ".join([f"{i[0]}=%s" for i in colvals])) + " WHERE historyId = %s", tuple([i[1] for i in colvals] + [data.historyId]))
-                self.connection.commit()
+            values: list[Union[int, datetime, None]] = [data.bookId, data.userId, data.borrowed, data.returned]
+            mask = self._changedMask(values, None if old_data is None else [old_data.bookId, old_data.userId, old_data.borrowed, old_data.returned])
+
+            if mask != 0:
+                with self._cursor() as (connection, cursor):
+                    if old_data is not None and old_data.returned is None and data.returned is not None:
+                        cursor.execute("DELETE FROM Borrow WHERE bookId = %s", (old_data.bookId, ))
+                        self._updateStats(cursor, borrowingCount=-cursor.rowcount, returnedCount=1)
+                    elif old_data is not None and old_data.returned is not None and data.returned is None:
+                        cursor.execute("INSERT INTO Borrow (bookId, userId, historyId) VALUES (%s, %s, %s)", (data.bookId, data.userId, data.historyId))
+                        self._updateStats(cursor, borrowingCount=cursor.rowcount, returnedCount=-1)
+                    self._update(connection, "BorrowHistory", "historyId", self.BORROW_HISTORY_UPDATE_COLUMNS, mask, values, data.historyId)
+                    self._logChanges(cursor, "BorrowHistory", [data.historyId])
+                    connection.commit()
             else:
                 return (False, "No update")
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return False, str(err)
 
@@ -489,49 +1167,169 @@ class DBSession:
 
     def removeBorrowHistory(self, historyId: int) -> ExecuteResult[None]:
         try:
-            self.cursor.execute("DELETE FROM Borrow WHERE historyId = %s", (historyId, ))
-            self.cursor.execute("DELETE FROM BorrowHistory WHERE historyId = %s", (historyId, ))
-            self.connection.commit()
-            if self.cursor.rowcount > 0:
-                return (True, None)
-            else:
-                return (False, f"Not found history ID {historyId}")
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
+            with self._cursor() as (connection, cursor):
+                cursor.execute("DELETE FROM Borrow WHERE historyId = %s", (historyId, ))
+                borrowRows = cursor.rowcount
+                cursor.execute("DELETE FROM BorrowHistory WHERE historyId = %s", (historyId, ))
+                historyRows = cursor.rowcount
+                if historyRows > 0:
+                    self._logChanges(cursor, "BorrowHistory", [historyId], deleted=True)
+                self._removeHistoryStats(cursor, borrowRows, historyRows)
+                connection.commit()
+                if historyRows > 0:
+                    return (True, None)
+                else:
+                    return (False, f"Not found history ID {historyId}")
         except Exception as err:
             return (False, str(err))
 
-    def _getOneCountResult(self, execute: Callable[[], Optional[Generator[MySQLCursorAbstract, None, None]]]) -> ExecuteResult[int]:
+    def _getOneCountResult(self, sql: str) -> ExecuteResult[int]:
         try:
-            execute()
-            result = self.cursor.fetchone()
+            with self._cursor() as (connection, cursor):
+                cursor.execute(sql)
+                result = cursor.fetchone()
             if type(result) is tuple and type(result[0]) is int:
                 return (True, result[0])
             return (True, -1)
-        except MysqlError as err:
-            self.connection.rollback()
-            return (False, str(err))
         except Exception as err:
             return (False, str(err))
 
     def getBookCount(self) -> ExecuteResult[int]:
-        return self._getOneCountResult(lambda: self.cursor.execute("SELECT COUNT(*) FROM Book"))
+        return self._getOneCountResult("SELECT COUNT(*) FROM Book")
 
     def getUserCount(self) -> ExecuteResult[int]:
-        return self._getOneCountResult(lambda: self.cursor.execute("SELECT COUNT(*) FROM User"))
+        return self._getOneCountResult("SELECT COUNT(*) FROM User")
 
     def getBorrowingCount(self) -> ExecuteResult[int]:
-        return self._getOneCountResult(lambda: self.cursor.execute("SELECT COUNT(*) FROM Borrow"))
+        return self._getOneCountResult("SELECT COUNT(*) FROM Borrow")
 
     def getReturnedCount(self) -> ExecuteResult[int]:
-        return self._getOneCountResult(lambda: self.cursor.execute("SELECT COUNT(*) FROM BorrowHistory WHERE returned IS NOT NULL"))
+        return self._getOneCountResult("SELECT COUNT(*) FROM BorrowHistory WHERE returned IS NOT NULL")
 
     def getAllTimeBorrowedCount(self) -> ExecuteResult[int]:
-        return self._getOneCountResult(lambda: self.cursor.execute("SELECT COUNT(*) FROM BorrowHistory"))
+        return self._getOneCountResult("SELECT COUNT(*) FROM BorrowHistory")
+
+    def _streamRows(self, sql: str, params: tuple = ()) -> Generator[Row, None, None]:
+        # Unbuffered cursor, rows are pulled from the server in fetchmany() chunks as the caller consumes them
+        with self._cursor(buffered=False) as (connection, cursor):
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(CONFIG.LMS.EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+
+    def streamBook(self, includeImage: bool = False) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["bookId", "title", "author", "isbn10", "isbn13", "publication", "description"]
+        if not includeImage:
+            return (columns, self._streamRows("SELECT " + (", ".join(columns)) + " FROM Book ORDER BY bookId"))
+
+        return (columns + ["image"], self._streamRows(
+            "SELECT " + (", ".join(f"Book.{column}" for column in columns)) + ", CoverImage.image " +
+            "FROM Book LEFT JOIN CoverImage ON Book.imageHash = CoverImage.imageHash ORDER BY Book.bookId"
+        ))
+
+    def streamUser(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["userId", "prefixName", "firstName", "lastName", "email", "phone", "address"]
+        return (columns, self._streamRows("SELECT " + (", ".join(columns)) + " FROM User ORDER BY userId"))
+
+    def streamBorrowHistory(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["historyId", "bookId", "userId", "borrowed", "returned"]
+        return (columns, self._streamRows("SELECT " + (", ".join(columns)) + " FROM BorrowHistory ORDER BY historyId"))
+
+    def streamBookIsbn(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["bookId", "isbn10", "isbn13"]
+        return (columns, self._streamRows("SELECT bookId, isbn10, isbn13 FROM Book WHERE isbn10 IS NOT NULL OR isbn13 IS NOT NULL ORDER BY bookId"))
+
+    def streamBorrowWithoutOpenHistory(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["bookId", "userId", "historyId", "historyBookId", "historyUserId", "returned"]
+        return (columns, self._streamRows(
+            "SELECT Borrow.bookId, Borrow.userId, Borrow.historyId, BorrowHistory.bookId, BorrowHistory.userId, BorrowHistory.returned " +
+            "FROM Borrow LEFT JOIN BorrowHistory ON Borrow.historyId = BorrowHistory.historyId " +
+            "WHERE BorrowHistory.historyId IS NULL OR BorrowHistory.returned IS NOT NULL " +
+            "OR BorrowHistory.bookId <> Borrow.bookId OR BorrowHistory.userId <> Borrow.userId ORDER BY Borrow.bookId"
+        ))
+
+    def streamOpenHistoryWithoutBorrow(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["historyId", "bookId", "userId", "borrowed"]
+        # Borrow is keyed by bookId, matching on it keeps the anti-join on the primary key
+        return (columns, self._streamRows(
+            "SELECT historyId, bookId, userId, borrowed FROM BorrowHistory " +
+            "WHERE returned IS NULL AND NOT EXISTS (SELECT 1 FROM Borrow WHERE Borrow.bookId = BorrowHistory.bookId AND Borrow.historyId = BorrowHistory.historyId) ORDER BY historyId"
+        ))
+
+    def streamReturnedBeforeBorrowed(self) -> tuple[list[str], Generator[Row, None, None]]:
+        columns = ["historyId", "bookId", "userId", "borrowed", "returned"]
+        return (columns, self._streamRows(
+            "SELECT historyId, bookId, userId, borrowed, returned FROM BorrowHistory WHERE returned < borrowed ORDER BY historyId"
+        ))
+
+    def getDashboardStats(self) -> ExecuteResult[DashboardStatsData]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute("SELECT bookCount, userCount, borrowingCount, returnedCount, allTimeBorrowedCount FROM LibraryStats WHERE statsId = 1")
+                result = cursor.fetchone()
+            if type(result) is tuple:
+                return (True, DashboardStatsData(*[(value if type(value) is int else -1) for value in result]))
+        except Exception as err:
+            return (False, str(err))
+
+        return (False, "Library statistics are not initialized.")
+
+    def rebuildDashboardStats(self) -> ExecuteResult[None]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(
+                    "UPDATE LibraryStats SET " +
+                    "bookCount = (SELECT COUNT(*) FROM Book), " +
+                    "userCount = (SELECT COUNT(*) FROM User), " +
+                    "borrowingCount = (SELECT COUNT(*) FROM Borrow), " +
+                    "returnedCount = (SELECT COUNT(*) FROM BorrowHistory WHERE returned IS NOT NULL), " +
+                    "allTimeBorrowedCount = (SELECT COUNT(*) FROM BorrowHistory) " +
+                    "WHERE statsId = 1"
+                )
+                connection.commit()
+        except Exception as err:
+            return (False, str(err))
+
+        return (True, None)
+
+    def explainIndexUsage(self) -> ExecuteResult[list[IndexUsageData]]:
+        checks: list[tuple[str, str, str, tuple[str, tuple]]] = [
+            ("Borrowing by book", "BorrowHistory", "idxBorrowHistoryBookReturned", self._searchBorrowHistorySql(1, None, True, None, 0, None)),
+            ("Borrowing by user", "BorrowHistory", "idxBorrowHistoryUserReturned", self._searchBorrowHistorySql(None, 1, True, None, 0, None)),
+            ("Returned by user", "BorrowHistory", "idxBorrowHistoryUserReturned", self._searchBorrowHistorySql(None, 1, None, True, 0, None)),
+            ("Returned count", "BorrowHistory", "idxBorrowHistoryReturned", ("SELECT COUNT(*) FROM BorrowHistory WHERE returned IS NOT NULL", ())),
+            ("Book by ISBN-13", "Book", "idxBookIsbn13", ("SELECT bookId FROM Book WHERE isbn13 = %s", ("9780000000002", ))),
+            ("Book by ISBN-10", "Book", "idxBookIsbn10", ("SELECT bookId FROM Book WHERE isbn10 = %s", ("0000000000", )))
+        ]
+
+        try:
+            data: list[IndexUsageData] = []
+            with self._cursor() as (connection, cursor):
+                for name, table, expected, (sql, params) in checks:
+                    used = self._getBackend().usedIndex(cursor, sql, params, table)
+                    data.append(IndexUsageData(name=name, table=table, expected=expected, used=used))
+            return (True, data)
+        except Exception as err:
+            return (False, str(err))
+
+    def getCacheStats(self) -> ExecuteResult[list[CacheStatsData]]:
+        return (True, [self.bookCache.stats(), self.userCache.stats(), self.borrowReviewCache.stats(), self.isbnCache.stats()])
+
+    def getQueryStats(self) -> ExecuteResult[list[QueryStatsData]]:
+        if self.recorder is None:
+            return (False, "Query statistics are disabled")
+        return (True, self.recorder.snapshot())
+
+    def resetQueryStats(self) -> None:
+        if self.recorder is not None:
+            self.recorder.reset()
 
     def close(self):
-        self.cursor.close()
-        self.connection.close()
+        if self.backend is not None:
+            self.statements = {}
+            self.backend.close()
+            self.backend = None
 
 Session = DBSession()
@@ -0,0 +1,83 @@
+import csv
+import json
+
+from sys import stdout, stderr
+from base64 import b64encode
+from datetime import date, datetime
+from argparse import ArgumentParser
+from typing import Callable, Generator, Iterable, Optional, TextIO, Any
+
+from .args import argument_parser
+from .backend import Row
+from .db_session import Session
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    elif isinstance(value, (bytes, bytearray)):
+        return b64encode(value).decode("ascii")
+
+    return value
+
+def write_csv(file: TextIO, columns: list[str], rows: Iterable[Row]) -> int:
+    writer = csv.writer(file)
+    writer.writerow(columns)
+
+    written = 0
+    for row in rows:
+        writer.writerow([_value(value) for value in row])
+        written += 1
+
+    return written
+
+def write_jsonl(file: TextIO, columns: list[str], rows: Iterable[Row]) -> int:
+    written = 0
+    for row in rows:
+        file.write(json.dumps({column: _value(value) for column, value in zip(columns, row)}, ensure_ascii=False))
+        file.write("\n")
+        written += 1
+
+    return written
+
+WRITERS: dict[str, Callable[[TextIO, list[str], Iterable[Row]], int]] = {
+    "csv": write_csv,
+    "jsonl": write_jsonl
+}
+
+TABLES: dict[str, Callable[[bool], tuple[list[str], Generator[Row, None, None]]]] = {
+    "book": lambda includeImages: Session.streamBook(includeImages),
+    "user": lambda includeImages: Session.streamUser(),
+    "borrow-history": lambda includeImages: Session.streamBorrowHistory()
+}
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("table", type=str, choices=tuple(TABLES))
+    parser.add_argument("--format", type=str, choices=tuple(WRITERS), default="csv")
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--include-images", action="store_true")
+
+def run(table: str, format: str, output: Optional[str], include_images: bool) -> int:
+    columns, rows = TABLES[table](include_images)
+
+    if output is None:
+        written = WRITERS[format](stdout, columns, rows)
+    else:
+        with open(output, "w", encoding="utf-8", newline="") as file:
+            written = WRITERS[format](file, columns, rows)
+
+    print(f"exported {written} {table} rows", file=stderr)
+    return 0
+
+def main() -> int:
+    parser = ArgumentParser(description="Export a table to CSV or JSONL")
+    add_arguments(parser)
+    args = argument_parser(parser)
+
+    Session.init()
+    try:
+        return run(args.table, args.format, args.output, args.include_images)
+    finally:
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,194 @@
+import re
+
+from sys import stderr
+from threading import Lock
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from time import perf_counter
+from typing import Optional, Sequence, Any
+
+from .backend import Cursor
+from .lms_types import QueryStatsData
+
+# Upper bounds in milliseconds, the last bucket takes everything slower
+LATENCY_BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+@lru_cache(maxsize=1024)
+def query_shape(sql: str) -> str:
+    shape = " ".join(sql.split())
+    # Batched statements differ only in how many placeholders they carry
+    shape = re.sub(r"\(%s(, ?%s)+\)", "(%s, ...)", shape)
+    shape = re.sub(r"\(%s, \.\.\.\)(, ?\(%s, \.\.\.\))+", "(%s, ...), ...", shape)
+    return re.sub(r"(?<![\w%])\d+(?!\w)", "?", shape)
+
+def _size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return 8 if value is not None else 0
+
+class QueryRecorder:
+    slowMs: float
+    slowLog: Optional[str]
+    stats: dict[str, QueryStatsData]
+    lock: Lock
+
+    def __init__(self, slowMs: float, slowLog: Optional[str]) -> None:
+        self.slowMs = slowMs
+        self.slowLog = slowLog
+        self.stats = {}
+        self.lock = Lock()
+
+    def record(self, sql: str, elapsedMs: float, rows: int, fetched: int) -> None:
+        shape = query_shape(sql)
+
+        with self.lock:
+            stats = self.stats.get(shape)
+            if stats is None:
+                stats = self.stats[shape] = QueryStatsData(shape=shape, buckets=[0] * (len(LATENCY_BUCKETS) + 1))
+
+            stats.count += 1
+            stats.totalMs += elapsedMs
+            stats.maxMs = max(stats.maxMs, elapsedMs)
+            stats.rows += rows
+            stats.bytes += fetched
+            stats.buckets[bisect_left(LATENCY_BUCKETS, elapsedMs)] += 1
+
+        if elapsedMs >= self.slowMs:
+            self.logSlow(shape, elapsedMs, rows, fetched)
+
+    def logSlow(self, shape: str, elapsedMs: float, rows: int, fetched: int) -> None:
+        line = f"{datetime.now().isoformat(timespec='milliseconds')}\t{elapsedMs:.1f}ms\t{rows} rows\t{fetched} bytes\t{shape}\n"
+        try:
+            if self.slowLog is None:
+                stderr.write("slow query: " + line)
+            else:
+                with open(self.slowLog, "a", encoding="utf-8") as file:
+                    file.write(line)
+        except OSError:
+            pass
+
+    def snapshot(self) -> list[QueryStatsData]:
+        with self.lock:
+            return sorted(
+                (QueryStatsData(stats.shape, stats.count, stats.totalMs, stats.maxMs, stats.rows, stats.bytes, list(stats.buckets)) for stats in self.stats.values()),
+                key=lambda stats: stats.totalMs, reverse=True
+            )
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats.clear()
+
+class InstrumentedCursor:
+    # Only handed out while instrumentation is enabled, DBSession uses the bare cursor otherwise
+    cursor: Cursor
+    recorder: QueryRecorder
+    sql: Optional[str]
+    elapsed: float
+    rows: int
+    fetched: int
+
+    def __init__(self, cursor: Cursor, recorder: QueryRecorder) -> None:
+        self.cursor = cursor
+        self.recorder = recorder
+        self.sql = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.cursor, name)
+
+    @property
+    def rowcount(self) -> int:
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self.cursor.lastrowid
+
+    @property
+    def description(self) -> Any:
+        return self.cursor.description
+
+    @property
+    def with_rows(self) -> bool:
+        return self.cursor.with_rows
+
+    def _begin(self, sql: str) -> float:
+        self._finish()
+        self.sql = sql
+        self.elapsed = 0.0
+        self.rows = 0
+        self.fetched = 0
+        return perf_counter()
+
+    def _executed(self, start: float) -> None:
+        self.elapsed += perf_counter() - start
+        # Statements without a result set are complete once they return
+        if not self.cursor.with_rows:
+            self.rows = max(self.cursor.rowcount, 0)
+            self._finish()
+
+    def _fetched(self, start: float, rows: Sequence[Any]) -> None:
+        self.elapsed += perf_counter() - start
+        self.rows += len(rows)
+        self.fetched += sum(_size(value) for row in rows for value in row)
+
+    def _finish(self) -> None:
+        if self.sql is not None:
+            self.recorder.record(self.sql, self.elapsed * 1000, self.rows, self.fetched)
+            self.sql = None
+
+    def execute(self, operation: str, params: Any = (), *args: Any, **kwargs: Any) -> Any:
+        start = self._begin(operation)
+        try:
+            return self.cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._executed(start)
+
+    def executemany(self, operation: str, seq_params: Any, *args: Any, **kwargs: Any) -> Any:
+        start = self._begin(operation)
+        try:
+            return self.cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._executed(start)
+
+    def fetchone(self) -> Any:
+        start = perf_counter()
+        row = self.cursor.fetchone()
+        if self.sql is not None:
+            self._fetched(start, [row] if row is not None else [])
+            if row is None:
+                self._finish()
+        return row
+
+    def fetchmany(self, size: int = 1) -> list[Any]:
+        start = perf_counter()
+        rows = self.cursor.fetchmany(size)
+        if self.sql is not None:
+            self._fetched(start, rows)
+            if len(rows) == 0:
+                self._finish()
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        start = perf_counter()
+        rows = self.cursor.fetchall()
+        if self.sql is not None:
+            self._fetched(start, rows)
+            self._finish()
+        return rows
+
+    def close(self) -> Any:
+        self._finish()
+        return self.cursor.close()
+
+def format_stats(stats: list[QueryStatsData]) -> str:
+    bounds = [f"<{bound:g}" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}"]
+    lines: list[str] = []
+    for item in stats:
+        histogram = " ".join(f"{bound}:{count}" for bound, count in zip(bounds, item.buckets) if count > 0)
+        lines.append(
+            f"{item.count:>7} calls {item.totalMs:>10.1f}ms total {item.totalMs / item.count:>8.2f}ms avg {item.maxMs:>8.1f}ms max " +
+            f"{item.rows:>8} rows {item.bytes:>11} bytes  {item.shape}\n{'':>9}{histogram} (ms)"
+        )
+
+    return "\n".join(lines)
@@ -1,7 +1,8 @@
-from typing import Callable
+from typing import Callable, Optional, Sequence, Any
 from itertools import cycle
 
 from .errors import ISBNValueError
+from .lms_types import ISBNBatchData
 
 class ISBN:
     digit_length: int
@@ -55,6 +56,9 @@ class ISBN10(ISBN):
             return "X"
         return chr(add + 48)
 
+    def to_isbn13(self) -> "ISBN13":
+        return ISBN13("978" + self.digits)
+
 class ISBN13(ISBN):
     digit_length = 13
 
@@ -70,3 +74,82 @@ class ISBN13(ISBN):
             sum += mul * (ord(digit) - 48)
 
         return chr(((10 - sum) % 10) + 48)
+
+    def to_isbn10(self) -> Optional[ISBN10]:
+        # Only the 978 prefix was ever issued as ISBN-10
+        if not self.digits.startswith("978"):
+            return None
+        return ISBN10(self.digits[3:])
+
+def parse_isbn(chars: str) -> ISBN13:
+    chars = chars.replace("-", "").replace(" ", "").upper()
+    isbn: ISBN
+    if len(chars) == 10:
+        isbn = ISBN10(chars)
+    elif len(chars) == 13:
+        isbn = ISBN13(chars)
+    else:
+        raise ISBNValueError()
+
+    if not isbn.verify():
+        raise ISBNValueError()
+    return isbn.to_isbn13() if isinstance(isbn, ISBN10) else isbn
+
+def _numpy() -> Any:
+    # Imported on demand, the classes above do not need NumPy
+    import numpy
+    return numpy
+
+def _codes(values: Sequence[Optional[str]], width: int) -> tuple[Any, Any]:
+    numpy = _numpy()
+    # One row of UTF-32 code points per value, one column longer than an ISBN so longer values show up
+    text = numpy.array(["" if value is None else value for value in values], dtype=f"U{width + 1}")
+    codes = text.view(numpy.int32).reshape(len(values), width + 1)
+    return (codes, numpy.count_nonzero(codes, axis=1))
+
+def _chars(numpy: Any, digits: Any, mask: Any, width: int) -> Any:
+    # Digit values back to strings, "" where the row is masked out
+    chars = (digits + 48).astype(numpy.uint8)
+    chars[~mask] = 0
+    return numpy.ascontiguousarray(chars).view(f"S{width}").reshape(-1).astype(f"U{width}")
+
+def check_isbn10(values: Sequence[Optional[str]]) -> ISBNBatchData:
+    numpy = _numpy()
+    codes, lengths = _codes(values, 10)
+    digits = codes[:, :10] - 48
+    isDigit = (digits >= 0) & (digits <= 9)
+    isX = codes[:, 9] == 88
+
+    wellFormed = (lengths == 10) & isDigit[:, :9].all(axis=1) & (isDigit[:, 9] | isX)
+    body = numpy.where(isDigit[:, :9], digits[:, :9], 0)
+    check = (11 - (body * numpy.arange(10, 1, -1, dtype=numpy.int32)).sum(axis=1) % 11) % 11
+    given = numpy.where(isX, 10, digits[:, 9])
+    valid = wellFormed & (check == given)
+
+    # 978 carries 9 * 1 + 7 * 3 + 8 * 1 = 38 into the ISBN-13 sum, the body takes weights 3, 1, 3, ...
+    check13 = (10 - (38 + (body * numpy.tile(numpy.int32((3, 1)), 5)[:9]).sum(axis=1)) % 10) % 10
+    isbn13 = numpy.concatenate((numpy.broadcast_to((9, 7, 8), (len(values), 3)), body, check13[:, None]), axis=1)
+
+    # Like ISBN10, nine digits are enough to compute the check digit. 10 stands for "X"
+    checkDigit = numpy.where(numpy.isin(lengths, (9, 10)) & isDigit[:, :9].all(axis=1), check, -1)
+    return ISBNBatchData(valid=valid, wellFormed=wellFormed, checkDigit=checkDigit, converted=_chars(numpy, isbn13, valid, 13))
+
+def check_isbn13(values: Sequence[Optional[str]]) -> ISBNBatchData:
+    numpy = _numpy()
+    codes, lengths = _codes(values, 13)
+    digits = codes[:, :13] - 48
+    isDigit = (digits >= 0) & (digits <= 9)
+
+    wellFormed = (lengths == 13) & isDigit.all(axis=1)
+    body = numpy.where(isDigit[:, :12], digits[:, :12], 0)
+    check = (10 - (body * numpy.tile(numpy.int32((1, 3)), 6)).sum(axis=1) % 10) % 10
+    valid = wellFormed & (check == digits[:, 12])
+
+    # Only the 978 prefix was ever issued as ISBN-10
+    convertible = valid & (body[:, 0] == 9) & (body[:, 1] == 7) & (body[:, 2] == 8)
+    check10 = (11 - (body[:, 3:12] * numpy.arange(10, 1, -1, dtype=numpy.int32)).sum(axis=1) % 11) % 11
+    # 40 + 48 is the code of "X"
+    isbn10 = numpy.concatenate((body[:, 3:12], numpy.where(check10 == 10, 40, check10)[:, None]), axis=1)
+
+    checkDigit = numpy.where(numpy.isin(lengths, (12, 13)) & isDigit[:, :12].all(axis=1), check, -1)
+    return ISBNBatchData(valid=valid, wellFormed=wellFormed, checkDigit=checkDigit, converted=_chars(numpy, isbn10, convertible, 10))
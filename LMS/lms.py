@@ -1,3 +1,5 @@
+import asyncio
+
 from sys import argv
 
 from PyQt6.QtWidgets import QApplication
@@ -6,6 +8,11 @@ from .config import CONFIG
 from .args import argument_parser
 from .ui import MainWindow_UI
 
+try:
+    import qasync # type: ignore[import]
+except ImportError:
+    qasync = None
+
 def main() -> int:
     argument_parser()
 
@@ -17,4 +24,13 @@ def main() -> int:
 
     MainWindowForm = MainWindow_UI()
 
-    return app.exec()
+    if qasync is None:
+        return app.exec()
+
+    # Run asyncio on the Qt event loop so DBWorker.submitAsync can await AsyncSession on the GUI thread
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        loop.run_forever()
+
+    return 0
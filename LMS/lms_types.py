@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import TypeVar, Union, Optional, Literal
+from typing import TypeVar, Union, Optional, Literal, Any
 
 T = TypeVar('T')
 
@@ -29,6 +29,7 @@ class BookData:
     isbn13: Optional[str]
     publication: Optional[str]
     description: Optional[str]
+    thumbnail: Optional[bytes] = None
 
 @dataclass
 class BookBorrowHistoryData:
@@ -51,3 +52,63 @@ class BookBorrowReviewData:
 @dataclass
 class BookReturnReviewData(BookBorrowReviewData):
     borrowed: datetime
+
+@dataclass
+class CirculationResultData:
+    bookId: int
+    success: bool
+    message: str
+
+@dataclass
+class BooksBorrowReviewData:
+    userId: int
+    userName: str
+    items: list[CirculationResultData]
+
+@dataclass
+class ChangeSetData:
+    lastChangeId: int
+    rows: list[Any] = field(default_factory=list)
+    deleted: list[int] = field(default_factory=list)
+    cleared: bool = False
+
+@dataclass
+class ISBNBatchData:
+    # NumPy arrays with one entry per input value. checkDigit is -1 where it cannot be computed,
+    # converted is the other ISBN form or "" where there is none
+    valid: Any
+    wellFormed: Any
+    checkDigit: Any
+    converted: Any
+
+@dataclass
+class CacheStatsData:
+    name: str
+    hits: int
+    misses: int
+    size: int
+
+@dataclass
+class QueryStatsData:
+    shape: str
+    count: int = 0
+    totalMs: float = 0.0
+    maxMs: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    buckets: list[int] = field(default_factory=list)
+
+@dataclass
+class IndexUsageData:
+    name: str
+    table: str
+    expected: str
+    used: Optional[str]
+
+@dataclass
+class DashboardStatsData:
+    bookCount: int
+    userCount: int
+    borrowingCount: int
+    returnedCount: int
+    allTimeBorrowedCount: int
@@ -0,0 +1,36 @@
+from sys import stderr
+
+from .args import argument_parser
+from .db_session import Session
+
+def run() -> int:
+    migrated = 0
+    lastId = 0
+
+    while True:
+        result = Session.migrateCovers(lastId)
+        if result[0] == False:
+            print(f"\nError after book ID {lastId}: {result[1]}", file=stderr)
+            return 1
+
+        count, lastId = result[1]
+        if count == 0:
+            break
+
+        migrated += count
+        print(f"\rmigrated {migrated} covers, last book ID {lastId}", end="", file=stderr, flush=True)
+
+    print(f"\rmigrated {migrated} covers", file=stderr)
+    return 0
+
+def main() -> int:
+    argument_parser()
+
+    Session.init()
+    try:
+        return run()
+    finally:
+        Session.close()
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,93 @@
+import mysql.connector.pooling
+
+from time import sleep, monotonic
+from typing import Optional
+
+from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection
+from mysql.connector.errorcode import ER_DUP_ENTRY, ER_UNKNOWN_STMT_HANDLER
+from mysql.connector.errors import Error as MysqlError, PoolError, InterfaceError
+
+from .config import CONFIG
+from .backend import Backend, Connection, Cursor
+
+class MySQLBackend(Backend):
+    Error = MysqlError
+
+    pool: Optional[MySQLConnectionPool] = None
+
+    def init(self) -> None:
+        self.pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_size=CONFIG.REMOTE.POOL_SIZE,
+            host=CONFIG.REMOTE.HOST,
+            port=CONFIG.REMOTE.PORT,
+            user=CONFIG.USER.USERNAME,
+            password=CONFIG.USER.PASSWORD,
+            database=CONFIG.REMOTE.DATABASE,
+            ssl_disabled=False,
+            # COM_RESET_CONNECTION would deallocate the prepared statements on every checkout
+            pool_reset_session=False
+        )
+
+    def getConnection(self) -> PooledMySQLConnection:
+        if self.pool is None:
+            raise InterfaceError("Session is not initialized")
+
+        deadline = monotonic() + CONFIG.REMOTE.POOL_TIMEOUT
+        attempts = 0
+
+        while True:
+            try:
+                # get_connection() pings the connection and reconnects it when it has gone stale
+                return self.pool.get_connection()
+            except PoolError:
+                if monotonic() >= deadline:
+                    raise
+                sleep(0.01)
+            except InterfaceError:
+                attempts += 1
+                if attempts >= CONFIG.REMOTE.RECONNECT_ATTEMPTS:
+                    raise
+                sleep(CONFIG.REMOTE.RECONNECT_DELAY)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool._remove_connections()
+            self.pool = None
+
+    def isDuplicateKey(self, err: Exception) -> bool:
+        return isinstance(err, MysqlError) and err.errno == ER_DUP_ENTRY
+
+    def isStatementLost(self, err: Exception) -> bool:
+        return isinstance(err, MysqlError) and err.errno == ER_UNKNOWN_STMT_HANDLER
+
+    def connectionKey(self, connection: Connection) -> int:
+        # Every checkout wraps the pooled connection in a new PooledMySQLConnection, the connection inside is kept
+        return id(getattr(connection, "_cnx", connection))
+
+    def upsertSql(self, table: str, columns: tuple[str, ...], keyColumn: str, update: str) -> str:
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) ON DUPLICATE KEY UPDATE {update}"
+
+    def olderThanDaysSql(self, column: str) -> str:
+        return f"{column} < NOW() - INTERVAL %s DAY"
+
+    def fulltextQuery(self, words: list[str]) -> str:
+        return " ".join(f"+{word}*" for word in words)
+
+    def bookSearchSql(self, select: str, fulltext: str, limit: int, offset: int) -> tuple[str, tuple]:
+        return (
+            f"{select}, MATCH (title, author, publication, description) AGAINST (%s IN BOOLEAN MODE) AS relevance " +
+            "FROM Book WHERE MATCH (title, author, publication, description) AGAINST (%s IN BOOLEAN MODE) " +
+            "ORDER BY relevance DESC, bookId LIMIT %s OFFSET %s",
+            (fulltext, fulltext, limit, offset)
+        )
+
+    def usedIndex(self, cursor: Cursor, sql: str, params: tuple, table: str) -> Optional[str]:
+        cursor.execute("EXPLAIN " + sql, params)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description or ()]
+        for row in rows:
+            plan = {column: (value.decode() if isinstance(value, (bytes, bytearray)) else value) for column, value in zip(columns, row)}
+            if plan.get("table") == table:
+                return plan.get("key") if type(plan.get("key")) is str else None
+
+        return None
@@ -0,0 +1,179 @@
+import re
+import sqlite3
+
+from datetime import datetime
+from functools import lru_cache
+from threading import Lock, local
+from typing import Optional, Sequence, Any
+
+from .config import CONFIG
+from .backend import Backend, Cursor, Row
+
+# DATETIME columns round-trip as datetime like they do with mysql-connector
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+@lru_cache(maxsize=1024)
+def _translate(sql: str) -> tuple[str, bool]:
+    # DBSession writes %s placeholders, and locks rows with FOR UPDATE where SQLite locks the whole database
+    forUpdate = sql.endswith(" FOR UPDATE")
+    if forUpdate:
+        sql = sql[:-len(" FOR UPDATE")]
+    return (sql.replace("%s", "?"), forUpdate)
+
+class SQLiteCursor:
+    connection: "SQLiteConnection"
+    cursor: sqlite3.Cursor
+
+    def __init__(self, connection: "SQLiteConnection") -> None:
+        self.connection = connection
+        self.cursor = connection.connection.cursor()
+
+    @property
+    def rowcount(self) -> int:
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self.cursor.lastrowid
+
+    @property
+    def description(self) -> Any:
+        return self.cursor.description
+
+    @property
+    def with_rows(self) -> bool:
+        return self.cursor.description is not None
+
+    def execute(self, operation: str, params: Sequence[Any] = ()) -> None:
+        sql, forUpdate = _translate(operation)
+        if forUpdate and not self.connection.in_transaction:
+            # Take the write lock up front, a deferred transaction could not upgrade after another writer committed
+            self.cursor.execute("BEGIN IMMEDIATE")
+        self.cursor.execute(sql, tuple(params))
+
+    def executemany(self, operation: str, seq_params: Sequence[Sequence[Any]]) -> None:
+        self.cursor.executemany(_translate(operation)[0], [tuple(params) for params in seq_params])
+
+    def fetchone(self) -> Optional[Row]:
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size: int = 1) -> list[Row]:
+        return self.cursor.fetchmany(size)
+
+    def fetchall(self) -> list[Row]:
+        return self.cursor.fetchall()
+
+    def close(self) -> None:
+        self.cursor.close()
+
+class SQLiteConnection:
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    @property
+    def connection_id(self) -> Optional[int]:
+        return id(self.connection)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.connection.in_transaction
+
+    def cursor(self, buffered: Optional[bool] = None, prepared: Optional[bool] = None) -> SQLiteCursor:
+        # sqlite3 keeps its own statement cache, and every result is read from the local file
+        return SQLiteCursor(self)
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+
+    def close(self) -> None:
+        # Connections stay open for the thread that made them, DBSession closes its checkout after every call
+        pass
+
+class SQLiteBackend(Backend):
+    Error = sqlite3.Error
+
+    path: Optional[str]
+    threads: local
+    connections: list[sqlite3.Connection]
+    lock: Lock
+
+    def __init__(self) -> None:
+        self.path = None
+        self.threads = local()
+        self.connections = []
+        self.lock = Lock()
+
+    def init(self) -> None:
+        self.path = CONFIG.REMOTE.DATABASE
+        self.threads = local()
+
+        connection = self.getConnection().connection
+        if connection.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] == 0:
+            with open(CONFIG.LMS.SQLITE_SCHEMA, "r", encoding="utf-8") as file:
+                connection.executescript(file.read())
+            connection.commit()
+
+    def getConnection(self) -> SQLiteConnection:
+        if self.path is None:
+            raise sqlite3.InterfaceError("Session is not initialized")
+
+        connection: Optional[sqlite3.Connection] = getattr(self.threads, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=CONFIG.REMOTE.POOL_TIMEOUT,
+                detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            self.threads.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+
+        return SQLiteConnection(connection)
+
+    def close(self) -> None:
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+
+        self.path = None
+        self.threads = local()
+
+    def isDuplicateKey(self, err: Exception) -> bool:
+        return isinstance(err, sqlite3.IntegrityError) and "UNIQUE" in str(err)
+
+    def upsertSql(self, table: str, columns: tuple[str, ...], keyColumn: str, update: str) -> str:
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) ON CONFLICT ({keyColumn}) DO UPDATE SET {update}"
+
+    def olderThanDaysSql(self, column: str) -> str:
+        # CURRENT_TIMESTAMP is UTC in SQLite
+        return f"{column} < datetime('now', '-' || %s || ' days')"
+
+    def fulltextQuery(self, words: list[str]) -> str:
+        return " ".join(f"\"{word}\"*" for word in words)
+
+    def bookSearchSql(self, select: str, fulltext: str, limit: int, offset: int) -> tuple[str, tuple]:
+        return (
+            f"{select} FROM Book " +
+            "INNER JOIN (SELECT rowid AS matchId, rank AS relevance FROM BookSearch WHERE BookSearch MATCH %s) AS Matched ON Book.bookId = Matched.matchId " +
+            "ORDER BY Matched.relevance, bookId LIMIT %s OFFSET %s",
+            (fulltext, limit, offset)
+        )
+
+    def usedIndex(self, cursor: Cursor, sql: str, params: tuple, table: str) -> Optional[str]:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        for row in cursor.fetchall():
+            match = re.search(r"(?:SCAN|SEARCH) (\w+)(?: AS \w+)? USING (?:COVERING )?INDEX (\w+)", str(row[-1]))
+            if match is not None and match.group(1) == table:
+                return match.group(2)
+
+        return None
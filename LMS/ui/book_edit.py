@@ -2,11 +2,11 @@ from typing import Callable, Optional
 from copy import copy
 
 from PyQt6.QtWidgets import QLabel, QFileDialog, QWidget, QPushButton, QLineEdit, QPlainTextEdit, QCheckBox, QMessageBox
-from PyQt6 import uic
 
-from ..config import CONFIG
 from ..isbn import ISBN, ISBN10, ISBN13
 from ..lms_types import BookData
+from .ui_loader import load_ui
+from .cover import normalize_cover
 
 class BookEdit_UI(QWidget):
     lineEditTitle: QLineEdit
@@ -38,7 +38,7 @@ class BookEdit_UI(QWidget):
 
     def __init__(self, callback_func: Callback, old_data: Optional[BookData] = None, _closeEvent: CallbackCloseEvent = None) -> None:
         super().__init__()
-        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(self.DESIGNER_FILE), self)
+        load_ui(self, self.DESIGNER_FILE)
 
         self.ISBNCheck(self.lineEditISBN10, ISBN10, self.ISBN10_CURRECT)
         self.ISBNCheck(self.lineEditISBN13, ISBN13, self.ISBN13_CURRECT)
@@ -106,17 +106,19 @@ class BookEdit_UI(QWidget):
                 QMessageBox.warning(self, "Error", "ISBN-13 is incurract")
                 return
 
-            self.hide()
             if self.callback_func is not None:
+                # The cover is converted here and may fail, keep the window open so another file can be picked
                 try:
                     data = self.DumpBookEditData()
                 except Exception as err:
                     QMessageBox.warning(self, "Error", str(err))
                     return
 
+                self.hide()
                 if self.callback_func(data, self.old_data) and self._closeEvent is not None:
                     self._closeEvent(self)
             else:
+                self.hide()
                 QMessageBox.critical(self, "Runtime Error", "No callback function !")
 
     def LoadBookEditData(self, instance: BookData) -> None:
@@ -129,11 +131,14 @@ class BookEdit_UI(QWidget):
 
     def DumpBookEditData(self) -> BookData:
         image: Optional[bytes] = None
+        thumbnail: Optional[bytes] = None
 
-        if self.imageFileName is not None:
-            image = open(self.imageFileName, "rb").read()
+        if self.imageFileName:
+            with open(self.imageFileName, "rb") as file:
+                image, thumbnail = normalize_cover(file.read())
         elif self.old_data is not None:
             image = self.old_data.image
+            thumbnail = self.old_data.thumbnail
 
         author = self.lineEditAuthor.text().strip()
         isbn10 = self.lineEditISBN10.text().strip()
@@ -149,7 +154,8 @@ class BookEdit_UI(QWidget):
             isbn10=(isbn10 if isbn10 != "" else None),
             isbn13=(isbn13 if isbn13 != "" else None),
             publication=(publication if publication != "" else None),
-            description=(description if description != "" else None)
+            description=(description if description != "" else None),
+            thumbnail=thumbnail
         )
 
     def getFile(self) -> None:
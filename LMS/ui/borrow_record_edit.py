@@ -3,12 +3,11 @@ from enum import Enum
 from copy import copy
 from datetime import datetime
 
-from PyQt6 import uic
 from PyQt6.QtGui import QIntValidator
 from PyQt6.QtWidgets import QWidget, QPushButton, QCheckBox, QDateTimeEdit, QLineEdit, QMessageBox
 
-from ..config import CONFIG
 from ..lms_types import BookBorrowHistoryData
+from .ui_loader import load_ui
 
 class BorrowRecordEdit_UI(QWidget):
     lineEditUserID: QLineEdit
@@ -34,7 +33,7 @@ class BorrowRecordEdit_UI(QWidget):
 
     def __init__(self, callback_func: Callback, old_data: BookBorrowHistoryData, _closeEvent: Optional[Callable[["BorrowRecordEdit_UI"], None]] = None) -> None:
         super().__init__()
-        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(self.DESIGNER_FILE), self)
+        load_ui(self, self.DESIGNER_FILE)
 
         self.callback_func = callback_func
         self._closeEvent = _closeEvent
@@ -0,0 +1,19 @@
+from PyQt6.uic import compileUi
+
+from ..config import CONFIG
+from .ui_loader import compiled_module_name
+
+def main() -> int:
+    CONFIG.LMS.COMPILED_UI.mkdir(exist_ok=True)
+    CONFIG.LMS.COMPILED_UI.joinpath("__init__.py").touch()
+
+    for source in sorted(CONFIG.LMS.DESIGNER_FILES.glob("*.ui")):
+        target = CONFIG.LMS.COMPILED_UI.joinpath(compiled_module_name(source.name) + ".py")
+        with open(source, "r", encoding="utf-8") as ui_file, open(target, "w", encoding="utf-8") as py_file:
+            compileUi(ui_file, py_file)
+        print(f"{source.name} -> {target.relative_to(CONFIG.LMS.COMPILED_UI.parents[1])}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
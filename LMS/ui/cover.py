@@ -0,0 +1,43 @@
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QImage, QImageReader, QPainter, QColor
+
+from ..config import CONFIG
+
+def _scaled(image: QImage, size: tuple[int, int]) -> QImage:
+    if image.width() <= size[0] and image.height() <= size[1]:
+        return image
+    return image.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+def _encode(image: QImage) -> bytes:
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    if not image.save(buffer, CONFIG.LMS.COVER_FORMAT, CONFIG.LMS.COVER_QUALITY):
+        raise ValueError(f"Failed to encode cover image as {CONFIG.LMS.COVER_FORMAT}")
+    buffer.close()
+    return bytes(data.data())
+
+def normalize_cover(raw: bytes) -> tuple[bytes, bytes]:
+    # QBuffer keeps a pointer to the array, a temporary one would be freed before the read
+    data = QByteArray(raw)
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    # Phone photos are often stored sideways with an EXIF orientation tag
+    reader.setAutoTransform(True)
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Failed to read cover image: {reader.errorString()}")
+
+    if image.hasAlphaChannel():
+        flat = QImage(image.size(), QImage.Format.Format_RGB32)
+        flat.fill(QColor(Qt.GlobalColor.white))
+        painter = QPainter(flat)
+        painter.drawImage(0, 0, image)
+        painter.end()
+        image = flat
+
+    cover = _scaled(image, CONFIG.LMS.COVER_MAX_SIZE)
+    thumbnail = _scaled(cover, CONFIG.LMS.COVER_THUMBNAIL_SIZE)
+
+    return (_encode(cover), _encode(thumbnail))
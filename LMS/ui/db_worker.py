@@ -0,0 +1,120 @@
+import asyncio
+
+from typing import Callable, Coroutine, Optional, Any
+from itertools import count
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from ..config import CONFIG
+from ..lms_types import ExecuteResult
+
+ResultCallback = Callable[[ExecuteResult[Any]], None]
+CoroutineFactory = Callable[[], Coroutine[Any, Any, ExecuteResult[Any]]]
+
+class DBTask(QRunnable):
+    worker: "DBWorker"
+    ticket: int
+    func: Callable[..., ExecuteResult[Any]]
+    args: tuple
+
+    def __init__(self, worker: "DBWorker", ticket: int, func: Callable[..., ExecuteResult[Any]], args: tuple) -> None:
+        super().__init__()
+        self.worker = worker
+        self.ticket = ticket
+        self.func = func
+        self.args = args
+
+    def run(self) -> None:
+        # Superseded or cancelled before a thread picked it up, skip the round-trip
+        if not self.worker.isPending(self.ticket):
+            return None
+
+        try:
+            result = self.func(*self.args)
+        except Exception as err:
+            result = (False, str(err))
+
+        self.worker.finished.emit(self.ticket, result)
+
+class DBWorker(QObject):
+    finished = pyqtSignal(int, object)
+
+    pool: QThreadPool
+    tickets: count
+    pending: dict[int, tuple[Optional[str], ResultCallback]]
+    latest: dict[str, int]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(CONFIG.REMOTE.POOL_SIZE)
+        self.tickets = count(1)
+        self.pending = {}
+        self.latest = {}
+
+        # Emitted from pool threads, delivered on the GUI thread through a queued connection
+        self.finished.connect(self.deliver)
+
+    def _register(self, callback: ResultCallback, key: Optional[str]) -> int:
+        ticket = next(self.tickets)
+
+        if key is not None:
+            self.cancelKey(key)
+            self.latest[key] = ticket
+
+        self.pending[ticket] = (key, callback)
+        return ticket
+
+    def submit(self, func: Callable[..., ExecuteResult[Any]], *args: Any, callback: ResultCallback, key: Optional[str] = None) -> int:
+        ticket = self._register(callback, key)
+        self.pool.start(DBTask(self, ticket, func, args))
+
+        return ticket
+
+    def submitAsync(self, coroutine: CoroutineFactory, callback: ResultCallback, key: Optional[str] = None) -> int:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Plain Qt event loop, give the coroutine an asyncio loop of its own on a pool thread
+            return self.submit(lambda: asyncio.run(coroutine()), callback=callback, key=key)
+
+        # qasync drives asyncio from the Qt event loop, the coroutine runs on the GUI thread
+        ticket = self._register(callback, key)
+        task = loop.create_task(coroutine())
+        task.add_done_callback(lambda task: self.asyncDone(ticket, task))
+
+        return ticket
+
+    def asyncDone(self, ticket: int, task: "asyncio.Task[ExecuteResult[Any]]") -> None:
+        if task.cancelled():
+            self.cancel(ticket)
+        elif task.exception() is not None:
+            self.deliver(ticket, (False, str(task.exception())))
+        else:
+            self.deliver(ticket, task.result())
+
+    def isPending(self, ticket: int) -> bool:
+        return ticket in self.pending
+
+    def cancel(self, ticket: int) -> None:
+        entry = self.pending.pop(ticket, None)
+        if entry is not None and entry[0] is not None and self.latest.get(entry[0]) == ticket:
+            del self.latest[entry[0]]
+
+    def cancelKey(self, key: str) -> None:
+        ticket = self.latest.pop(key, None)
+        if ticket is not None:
+            self.pending.pop(ticket, None)
+
+    def cancelAll(self) -> None:
+        self.pending.clear()
+        self.latest.clear()
+        self.pool.clear()
+
+    def deliver(self, ticket: int, result: ExecuteResult[Any]) -> None:
+        entry = self.pending.get(ticket)
+        if entry is None:
+            return None
+
+        self.cancel(ticket)
+        entry[1](result)
@@ -1,10 +1,12 @@
 from typing import Callable
 
 from PyQt6.QtWidgets import QDialog, QMessageBox, QPushButton, QLineEdit, QLabel
-from PyQt6 import uic
 
 from ..config import CONFIG
 from ..db_session import Session
+from ..lms_types import ExecuteResult
+from .db_worker import DBWorker
+from .ui_loader import load_ui
 
 class Login_UI(QDialog):
     lineEditUsername: QLineEdit
@@ -16,14 +18,16 @@ class Login_UI(QDialog):
     pushButtonLogin: QPushButton
 
     callback: Callable
+    worker: DBWorker
 
     DESIGNER_FILE: str = "login.ui"
 
-    def __init__(self, callback: Callable) -> None:
+    def __init__(self, callback: Callable, worker: DBWorker) -> None:
         super().__init__()
-        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(self.DESIGNER_FILE), self)
+        load_ui(self, self.DESIGNER_FILE)
 
         self.callback = callback
+        self.worker = worker
 
         self.lineEditUsername.setText(CONFIG.USER.USERNAME)
         self.lineEditPassword.setText(CONFIG.USER.PASSWORD)
@@ -49,8 +53,18 @@ class Login_UI(QDialog):
 
         CONFIG.USER.PASSWORD = self.lineEditPassword.text()
 
-        try:
-            Session.init()
+        self.pushButtonLogin.setEnabled(False)
+        self.worker.submit(self.connectSession, callback=self.sessionConnected, key="Login")
+
+    @staticmethod
+    def connectSession() -> ExecuteResult[None]:
+        Session.init()
+        return (True, None)
+
+    def sessionConnected(self, result: ExecuteResult[None]) -> None:
+        self.pushButtonLogin.setEnabled(True)
+
+        if result[0] == True:
             self.callback()
-        except Exception as err:
-            QMessageBox.warning(self, "Error", str(err))
+        else:
+            QMessageBox.warning(self, "Error", result[1])
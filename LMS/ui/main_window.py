@@ -1,21 +1,29 @@
-from typing import Callable, Optional, Any
+import re
+
+from typing import Callable, Optional, Union, Any
 from datetime import datetime
 
-from PyQt6.QtCore import Qt, QEvent, QTimer
+from PyQt6.QtCore import Qt, QEvent, QTimer, QRegularExpression
 from PyQt6.QtWidgets import (
     QLabel, QAbstractItemView, QRadioButton, QInputDialog, QGroupBox, QHeaderView, QStackedWidget,
-    QMessageBox, QStatusBar, QMenuBar, QMainWindow, QPushButton, QTableWidget, QLineEdit, QTableWidgetItem, QWidget
+    QMessageBox, QStatusBar, QMenuBar, QMainWindow, QPushButton, QTableView, QLineEdit, QWidget
 )
-from PyQt6.QtGui import QIntValidator, QPixmap, QCloseEvent
-from PyQt6 import uic
+from PyQt6.QtGui import QIntValidator, QRegularExpressionValidator, QPixmap, QCloseEvent
 
 from ..config import CONFIG
 from ..db_session import Session
+from ..async_session import AsyncSession
+from ..instrumentation import format_stats
 from ..ui import Login_UI, BookEdit_UI, UserEdit_UI, BorrowRecordEdit_UI
-from ..lms_types import BookData, UserData, BookBorrowHistoryData, BookReturnReviewData, BookBorrowReviewData
+from .pixmap_cache import PixmapCache
+from .table_model import PagedTableModel, TableColumn, PageFetcher
+from .db_worker import DBWorker
+from ..lms_types import BookData, UserData, BookBorrowHistoryData, BookReturnReviewData, BookBorrowReviewData, BooksBorrowReviewData, CirculationResultData, DashboardStatsData, ExecuteResult
 from ..utils import exclude_range
+from .ui_loader import load_ui
 
 class MainWindow_UI(QMainWindow):
+    worker: DBWorker
     LoginForm: Login_UI
     BookEditForms: list[BookEdit_UI]
     UserEditForms: list[UserEdit_UI]
@@ -33,10 +41,11 @@ class MainWindow_UI(QMainWindow):
     labelD_AllTimeBorrowedCount: QLabel
     labelD_Datetime: QLabel
     DatetimeTimer: QTimer
+    BookSearchTimer: QTimer
 
     Borrowing: QWidget
     defaultBorrowingBookImage: QPixmap
-    BorrowingCurrentBookId: Optional[int]
+    BorrowingCurrentBookIds: list[int]
     BorrowingCurrentUserId: Optional[int]
     groupBoxB: QGroupBox
     lineEditB_BookID: QLineEdit
@@ -51,7 +60,7 @@ class MainWindow_UI(QMainWindow):
 
     Returning: QWidget
     defaultReturningBookImage: QPixmap
-    ReturningCurrentBookId: Optional[int]
+    ReturningCurrentBookIds: list[int]
     groupBoxR: QGroupBox
     lineEditR_BookID: QLineEdit
     pushButtonR_Review: QPushButton
@@ -66,7 +75,7 @@ class MainWindow_UI(QMainWindow):
     BorrowingManagement: QWidget
     currentSelectRecord: Optional[int]
     currentSelectRecordHistoryId: Optional[int]
-    listBorrowingHistory: list[BookBorrowHistoryData]
+    borrowHistoryModel: PagedTableModel
     BWMGMTcurrentSelectRadioButton = 0
     radioButtonBWMGMT_All: QRadioButton
     radioButtonBWMGMT_WaitReturn: QRadioButton
@@ -74,16 +83,17 @@ class MainWindow_UI(QMainWindow):
     lineEditBWMGMT_BookID: QLineEdit
     lineEditBWMGMT_UserID: QLineEdit
     pushButtonBWMGMT_Refresh: QPushButton
-    tableWidgetBWMGMT: QTableWidget
+    tableViewBWMGMT: QTableView
 
     BookManagement: QWidget
     currentSelectBook: Optional[int]
     currentSelectBookId: Optional[int]
-    bookList: list[BookData]
+    bookModel: PagedTableModel
+    bookImageCache: PixmapCache
     defaultBookImage: QPixmap
     lineEditBMGMT_Search: QLineEdit
     labelBMGMT_BookImage: QLabel
-    tableWidgetBMGMT: QTableWidget
+    tableViewBMGMT: QTableView
     pushButtonBMGMT_Refresh: QPushButton
     pushButtonBMGMT_Add: QPushButton
     pushButtonBMGMT_Edit: QPushButton
@@ -99,10 +109,10 @@ class MainWindow_UI(QMainWindow):
     labelBMGMT_Description: QLabel
 
     UserManagement: QWidget
-    userList: list[UserData]
+    userModel: PagedTableModel
     currentSelectUser: Optional[int]
     currentSelectUserId: Optional[int]
-    tableWidgetUMGMT: QTableWidget
+    tableViewUMGMT: QTableView
     pushButtonUMGMT_Add: QPushButton
     pushButtonUMGMT_Edit: QPushButton
     pushButtonUMGMT_EditByID: QPushButton
@@ -127,9 +137,11 @@ class MainWindow_UI(QMainWindow):
 
     def __init__(self) -> None:
         super().__init__()
-        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(self.DESIGNER_FILE), self)
+        load_ui(self, self.DESIGNER_FILE)
+
+        self.worker = DBWorker()
 
-        self.LoginForm = Login_UI(self.init)
+        self.LoginForm = Login_UI(self.init, self.worker)
         self.LoginForm.open()
 
         self.BookEditForms = []
@@ -163,54 +175,84 @@ class MainWindow_UI(QMainWindow):
         self.defaultBookImage = self.labelBMGMT_BookImage.pixmap()
 
         self.lineEditBMGMT_Search.returnPressed.connect(self.BookManagement_listBookRefresh)
+        self.BookSearchTimer = QTimer()
+        self.BookSearchTimer.setSingleShot(True)
+        self.BookSearchTimer.setInterval(300)
+        self.BookSearchTimer.timeout.connect(self.BookManagement_listBookRefresh)
+        self.lineEditBMGMT_Search.textEdited.connect(lambda: self.BookSearchTimer.start())
         self.pushButtonBMGMT_Refresh.clicked.connect(self.BookManagement_listBookRefresh)
         self.pushButtonBMGMT_Edit.clicked.connect(self.BookManagement_pushButton_editBook)
         self.pushButtonBMGMT_EditByID.clicked.connect(self.BookManagement_pushButton_editBookByID)
         self.pushButtonBMGMT_Remove.clicked.connect(self.BookManagement_pushButton_removeBook)
         self.pushButtonBMGMT_ClearBook.clicked.connect(self.BookManagement_pushButton_ClearBook)
-        self.tableWidgetBMGMT.verticalHeader().setVisible(True)
-        self.tableWidgetBMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.tableWidgetBMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tableWidgetBMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.tableWidgetBMGMT.cellClicked.connect(self.BookManagement_SelectRow)
-        self.tableWidgetBMGMT.cellDoubleClicked.connect(self.BookManagement_pushButton_editBook)
-        _ = self.tableWidgetBMGMT.horizontalHeader()
+        self.bookModel = PagedTableModel([
+            TableColumn("ID", lambda book: book.bookId, center=True),
+            TableColumn("Title", lambda book: book.title),
+            TableColumn("Author", lambda book: book.author),
+            TableColumn("Publication", lambda book: book.publication),
+            TableColumn("ISBN-10", lambda book: book.isbn10),
+            TableColumn("ISBN-13", lambda book: book.isbn13)
+        ], self.worker, key=lambda book: book.bookId)
+        self.bookModel.firstPageLoaded.connect(self.BookManagement_listBookLoaded)
+        self.bookModel.patched.connect(self.BookManagement_listBookLoaded)
+        self.bookModel.fetchFailed.connect(lambda message: QMessageBox.warning(self, "Error", message))
+        self.tableViewBMGMT.setModel(self.bookModel)
+        self.tableViewBMGMT.verticalHeader().setVisible(True)
+        self.tableViewBMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tableViewBMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableViewBMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tableViewBMGMT.clicked.connect(lambda index: self.BookManagement_SelectRow(index.row()))
+        self.tableViewBMGMT.doubleClicked.connect(self.BookManagement_pushButton_editBook)
+        _ = self.tableViewBMGMT.horizontalHeader()
         _.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         for i in range(1, 6): _.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
-        self.tableWidgetBMGMT.setStyleSheet("QTableWidget::item { padding: 0px 10px }")
+        self.tableViewBMGMT.setStyleSheet("QTableView::item { padding: 0px 10px }")
 
         self.lineEditUMGMT_FirstName.returnPressed.connect(self.UserManagement_listUserRefresh)
         self.lineEditUMGMT_LastName.returnPressed.connect(self.UserManagement_listUserRefresh)
+        self.lineEditUMGMT_FirstName.textEdited.connect(self.UserManagement_listUserRefresh)
+        self.lineEditUMGMT_LastName.textEdited.connect(self.UserManagement_listUserRefresh)
         self.pushButtonUMGMT_Add.clicked.connect(self.UserManagement_pushButton_addUser)
         self.pushButtonUMGMT_Edit.clicked.connect(self.UserManagement_pushButton_editUser)
         self.pushButtonUMGMT_EditByID.clicked.connect(self.UserManagement_pushButton_editUserById)
         self.pushButtonUMGMT_Remove.clicked.connect(self.UserManagement_pushButton_removeUser)
         self.pushButtonUMGMT_Refresh.clicked.connect(self.UserManagement_listUserRefresh)
         self.pushButtonUMGMT_ClearUser.clicked.connect(self.UserManagement_pushButton_ClearUser)
-        self.tableWidgetUMGMT.cellClicked.connect(self.UserManagement_SelectRow)
-        self.tableWidgetUMGMT.cellDoubleClicked.connect(self.UserManagement_pushButton_editUser)
-        self.tableWidgetUMGMT.verticalHeader().setVisible(True)
-        self.tableWidgetUMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.tableWidgetUMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tableWidgetUMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        _ = self.tableWidgetUMGMT.horizontalHeader()
+        self.userModel = PagedTableModel([
+            TableColumn("User ID", lambda user: user.userId, center=True),
+            TableColumn("First Name", lambda user: (user.prefixName + "." if user.prefixName else "") + user.firstName),
+            TableColumn("Last Name", lambda user: user.lastName),
+            TableColumn("Email", lambda user: user.email),
+            TableColumn("Phone", lambda user: user.phone),
+            TableColumn("Address", lambda user: user.address)
+        ], self.worker, key=lambda user: user.userId)
+        self.userModel.firstPageLoaded.connect(self.UserManagement_listUserLoaded)
+        self.userModel.patched.connect(self.UserManagement_listUserLoaded)
+        self.userModel.fetchFailed.connect(lambda message: QMessageBox.warning(self, "Error", message))
+        self.tableViewUMGMT.setModel(self.userModel)
+        self.tableViewUMGMT.clicked.connect(lambda index: self.UserManagement_SelectRow(index.row()))
+        self.tableViewUMGMT.doubleClicked.connect(self.UserManagement_pushButton_editUser)
+        self.tableViewUMGMT.verticalHeader().setVisible(True)
+        self.tableViewUMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tableViewUMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableViewUMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        _ = self.tableViewUMGMT.horizontalHeader()
         for i in range(0, 5):  _.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
         _.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
-        self.tableWidgetUMGMT.setStyleSheet("QTableWidget::item { padding: 0px 10px }")
+        self.tableViewUMGMT.setStyleSheet("QTableView::item { padding: 0px 10px }")
 
         self.installEventFilter(self)
 
         self.currentSelectBook = None
         self.currentSelectBookId = None
-        self.bookList = []
+        self.bookImageCache = PixmapCache(CONFIG.LMS.BOOK_IMAGE_CACHE_SIZE)
 
         self.BookManagement_SetDisplayBook(BookData(None, None, "", "", "", "", "", ""))
 
         self.currentSelectUser = None
         self.currentSelectUserId = None
-        self.userList = []
 
-        self.lineEditB_BookID.setValidator(QIntValidator())
+        self.lineEditB_BookID.setValidator(QRegularExpressionValidator(QRegularExpression(r"[0-9Xx,\s-]*")))
         self.lineEditB_UserID.setValidator(QIntValidator())
         self.lineEditB_BookID.returnPressed.connect(lambda: self.lineEditB_UserID.setFocus())
         self.lineEditB_UserID.returnPressed.connect(lambda: self.Borrowing_ReviewClicked())
@@ -218,20 +260,18 @@ class MainWindow_UI(QMainWindow):
         self.pushButtonB_Borrow.clicked.connect(self.Borrowing_BorrowClicked)
         self.defaultBorrowingBookImage = self.labelB_Image.pixmap()
         self.Borrowing_ReviewClear()
-        self.BorrowingCurrentBookId = None
+        self.BorrowingCurrentBookIds = []
         self.BorrowingCurrentUserId = None
         self.groupBoxB.hide()
 
-        self.lineEditR_BookID.setValidator(QIntValidator())
+        self.lineEditR_BookID.setValidator(QRegularExpressionValidator(QRegularExpression(r"[0-9Xx,\s-]*")))
         self.lineEditR_BookID.returnPressed.connect(self.Returning_ReviewClicked)
         self.pushButtonR_Review.clicked.connect(self.Returning_ReviewClicked)
         self.pushButtonR_Return.clicked.connect(self.Returning_ReturnClicked)
         self.defaultReturningBookImage = self.labelR_Image.pixmap()
-        self.ReturningCurrentBookId = None
+        self.ReturningCurrentBookIds = []
         self.groupBoxR.hide()
 
-        self.lineEditR_BookID.setValidator(QIntValidator())
-
         self.radioButtonBWMGMT_All.toggled.connect(lambda: self.BorrowingManagement_RadioButton(0))
         self.radioButtonBWMGMT_WaitReturn.toggled.connect(lambda: self.BorrowingManagement_RadioButton(1))
         self.radioButtonBWMGMT_Returned.toggled.connect(lambda: self.BorrowingManagement_RadioButton(2))
@@ -241,19 +281,35 @@ class MainWindow_UI(QMainWindow):
         self.pushButtonBWMGMT_Refresh.clicked.connect(self.BorrowingManagement_listRefresh)
         self.lineEditBWMGMT_BookID.returnPressed.connect(lambda: self.lineEditBWMGMT_UserID.setFocus())
         self.lineEditBWMGMT_UserID.returnPressed.connect(self.BorrowingManagement_listRefresh)
-        self.tableWidgetBWMGMT.cellClicked.connect(self.BorrowingManagement_SelectRow)
-        self.tableWidgetBWMGMT.cellDoubleClicked.connect(self.BorrowingManagement_pushButton_edit)
-        self.tableWidgetBWMGMT.verticalHeader().setVisible(True)
-        self.tableWidgetBWMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.tableWidgetBWMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tableWidgetBWMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        _ = self.tableWidgetBWMGMT.horizontalHeader()
+        self.borrowHistoryModel = PagedTableModel([
+            TableColumn("History ID", lambda record: record.historyId, center=True),
+            TableColumn("User ID", lambda record: record.userId, center=True),
+            TableColumn("Name", lambda record: record.userName),
+            TableColumn("Book ID", lambda record: record.bookId, center=True),
+            TableColumn("Book Title", lambda record: record.bookTitle),
+            TableColumn("Borrowed", lambda record: record.borrowed, center=True),
+            TableColumn("Returned", lambda record: record.returned if record.returned else "-", center=True),
+            TableColumn(
+                "Status", lambda record: "Returned" if record.returned else "Borrowing", center=True,
+                color=lambda record: Qt.GlobalColor.green if record.returned else Qt.GlobalColor.red
+            )
+        ], self.worker, key=lambda record: record.historyId)
+        self.borrowHistoryModel.firstPageLoaded.connect(self.BorrowingManagement_listBorrowHistoryLoaded)
+        self.borrowHistoryModel.patched.connect(self.BorrowingManagement_listBorrowHistoryLoaded)
+        self.borrowHistoryModel.fetchFailed.connect(lambda message: QMessageBox.warning(self, "Error", message))
+        self.tableViewBWMGMT.setModel(self.borrowHistoryModel)
+        self.tableViewBWMGMT.clicked.connect(lambda index: self.BorrowingManagement_SelectRow(index.row()))
+        self.tableViewBWMGMT.doubleClicked.connect(self.BorrowingManagement_pushButton_edit)
+        self.tableViewBWMGMT.verticalHeader().setVisible(True)
+        self.tableViewBWMGMT.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tableViewBWMGMT.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableViewBWMGMT.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        _ = self.tableViewBWMGMT.horizontalHeader()
         for i in exclude_range(0, 8, (2, 4)): _.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
         for i in (2, 4): _.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
-        self.tableWidgetBWMGMT.setStyleSheet("QTableWidget::item { padding: 0px 10px }")
+        self.tableViewBWMGMT.setStyleSheet("QTableView::item { padding: 0px 10px }")
         self.currentSelectRecord = None
         self.currentSelectRecordHistoryId = None
-        self.listBorrowingHistory = []
 
         self.DatetimeTimer = QTimer()
         self.DatetimeTimer.timeout.connect(lambda: self.labelD_Datetime.setText(datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
@@ -269,12 +325,13 @@ class MainWindow_UI(QMainWindow):
         self.show()
         self.DashboardUpdate()
         self.BookManagement_listBook()
-        if len(self.bookList) > 0:
-            self.BookManagement_SelectRow(0)
         self.UserManagement_listUser()
         self.BorrowingManagement_listBorrowHistory()
+        # Built in the background so the first search does not wait for it
+        self.worker.submit(Session.syncUserIndex, callback=lambda result: None)
 
     def HookCloseEvent(self, a0: QCloseEvent) -> None:
+        self.worker.cancelAll()
         self.BookEditForm_Clear()
         self.UserEditForm_Clear()
         self.closeEventOld(a0)
@@ -289,60 +346,179 @@ class MainWindow_UI(QMainWindow):
                     self.BookManagement_listBookRefresh()
                 elif self.stackedWidget.currentIndex() == 5:
                     self.UserManagement_listUserRefresh()
+            elif key == Qt.Key.Key_F12:
+                self.QueryStats_show()
 
         return super().eventFilter(obj, event)
 
-    def DashboardUpdate(self) -> None:
-        book_count = Session.getBookCount()
-        if book_count[0]:
-            self.labelD_BookCount.setText(str(book_count[1]))
+    def QueryStats_show(self) -> None:
+        result = Session.getQueryStats()
+        if result[0] == False:
+            QMessageBox.information(self, "Query statistics", result[1] + "\n\nStart with --query-stats to collect them.")
+            return None
 
-        user_count = Session.getUserCount()
-        if user_count[0]:
-            self.labelD_UserCount.setText(str(user_count[1]))
+        box = QMessageBox(QMessageBox.Icon.Information, "Query statistics", f"{len(result[1])} query shapes, slowest total first", parent=self)
+        box.setDetailedText(format_stats(result[1]))
+        box.exec()
 
-        borrow_count = Session.getBorrowingCount()
-        if borrow_count[0]:
-            self.labelD_BorrowingCount.setText(str(borrow_count[1]))
+    def DashboardUpdate(self) -> None:
+        self.worker.submit(Session.getDashboardStats, callback=self.DashboardLoaded, key="Dashboard")
 
-        all_time_borrow_count = Session.getAllTimeBorrowedCount()
-        if all_time_borrow_count[0]:
-            self.labelD_AllTimeBorrowedCount.setText(str(all_time_borrow_count[1]))
+    def DashboardLoaded(self, result: ExecuteResult[DashboardStatsData]) -> None:
+        if result[0] == True:
+            self.labelD_BookCount.setText(str(result[1].bookCount))
+            self.labelD_UserCount.setText(str(result[1].userCount))
+            self.labelD_BorrowingCount.setText(str(result[1].borrowingCount))
+            self.labelD_AllTimeBorrowedCount.setText(str(result[1].allTimeBorrowedCount))
 
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def Circulation_parseBookIds(text: str) -> list[Union[int, str]]:
+        # A scanned barcode is an ISBN, anything shorter is a Book ID
+        return [int(i) if i.isdigit() and len(i) < 10 else i for i in re.split(r"[,\s]+", text.strip()) if i != ""]
+
+    def Circulation_resolveBookIds(self, title: str, items: list[Union[int, str]], borrowed: bool, then: Callable[[list[int]], None]) -> None:
+        isbns = [item for item in items if type(item) is str]
+        if len(isbns) == 0:
+            then([item for item in items if type(item) is int])
+            return None
+
+        self.worker.submit(
+            Session.resolveBookIsbns, isbns, borrowed,
+            callback=lambda result: self.Circulation_resolveBookIdsDone(title, items, then, result), key=f"ResolveIsbn-{title}"
+        )
+
+    def Circulation_resolveBookIdsDone(self, title: str, items: list[Union[int, str]], then: Callable[[list[int]], None], result: ExecuteResult[list[Optional[int]]]) -> None:
+        if result[0] == False:
+            QMessageBox.warning(self, title, result[1])
+            return None
+
+        resolved = iter(result[1])
+        bookIds: list[int] = []
+        missing: list[str] = []
+        for item in items:
+            bookId = item if type(item) is int else next(resolved)
+            if bookId is None:
+                missing.append(str(item))
+            else:
+                bookIds.append(bookId) # type: ignore
+
+        if len(missing) > 0:
+            QMessageBox.warning(self, title, "Not Found, ISBN " + ", ".join(missing))
+        else:
+            then(bookIds)
+
+    @staticmethod
+    async def Circulation_findMissingBooks(bookIds: list[int]) -> ExecuteResult[list[int]]:
+        results = await AsyncSession.gather("getBook", [(bookId, ) for bookId in bookIds])
+        for result in results:
+            if result[0] == False:
+                return result
+
+        return (True, [bookId for bookId, result in zip(bookIds, results) if result[1] is None])
+
+    def Circulation_validateBookIds(self, title: str, bookIds: list[int]) -> None:
+        # Scanned IDs are looked up concurrently, so a mistyped one shows up before borrowing or returning
+        self.worker.submitAsync(
+            lambda: self.Circulation_findMissingBooks(bookIds),
+            callback=lambda result: self.Circulation_validateBookIdsDone(title, result), key=f"ValidateBookIds-{title}"
+        )
+
+    def Circulation_validateBookIdsDone(self, title: str, result: ExecuteResult[list[int]]) -> None:
+        if result[0] == False:
+            QMessageBox.warning(self, title, result[1])
+        elif len(result[1]) > 0:
+            QMessageBox.warning(self, title, "Not Found, Book ID " + ", ".join(str(i) for i in result[1]))
+
+    def Circulation_batchDone(self, title: str, action: str, result: ExecuteResult[list[CirculationResultData]]) -> bool:
+        if result[0] == False:
+            QMessageBox.warning(self, title, f"Failed to {action} these books.\n\n" + str(result[1]))
+            return False
+
+        failed = [item for item in result[1] if not item.success]
+        if len(failed) == 0:
+            QMessageBox.information(self, title, f"Saved successfully, {len(result[1])} books.")
+        else:
+            QMessageBox.warning(
+                self, title, f"Saved {len(result[1]) - len(failed)} of {len(result[1])} books.\n\n" +
+                "\n".join(f"Book ID {item.bookId}: {item.message}" for item in failed)
+            )
+        return True
+
     def Borrowing_ReviewClicked(self) -> None:
-        bookId = self.lineEditB_BookID.text().strip()
+        items = self.Circulation_parseBookIds(self.lineEditB_BookID.text())
         userId = self.lineEditB_UserID.text().strip()
 
-        if bookId == "" and userId == "":
+        if len(items) == 0 and userId == "":
             self.Borrowing_ReviewClear()
-        elif bookId == "":
+        elif len(items) == 0:
             QMessageBox.warning(self, "Warning", "Book ID should not be empty.")
         elif userId == "":
             QMessageBox.warning(self, "Warning", "User ID should not be empty.")
         else:
             self.Borrowing_ReviewClear()
-            IntBookId = int(bookId)
             IntUserId = int(userId)
-            result = Session.borrowBookGetReview(IntBookId, IntUserId)
-            self.BorrowingCurrentBookId = (IntBookId if result[0] else None)
-            self.BorrowingCurrentUserId = (IntUserId if result[0] else None)
-            if result[0] == True:
-                self.lineEditB_BookID.setText("")
-                self.lineEditB_UserID.setText("")
-                self.Borrowing_ReviewSetDisplay(result[1])
-            else:
-                QMessageBox.warning(self, "Error", result[1])
+            self.Circulation_resolveBookIds("Borrowing Book", items, False, lambda bookIds: self.Borrowing_Review(bookIds, IntUserId))
+
+    def Borrowing_Review(self, bookIds: list[int], userId: int) -> None:
+        if len(bookIds) == 1:
+            self.worker.submit(
+                Session.borrowBookGetReview, bookIds[0], userId,
+                callback=lambda result: self.Borrowing_ReviewLoaded(bookIds, userId, result), key="BorrowingReview"
+            )
+        else:
+            self.worker.submit(
+                Session.borrowBooksGetReview, userId, bookIds,
+                callback=lambda result: self.Borrowing_BatchReviewLoaded(bookIds, userId, result), key="BorrowingReview"
+            )
+
+    def Borrowing_ReviewLoaded(self, bookIds: list[int], userId: int, result: ExecuteResult[BookBorrowReviewData]) -> None:
+        self.BorrowingCurrentBookIds = (bookIds if result[0] else [])
+        self.BorrowingCurrentUserId = (userId if result[0] else None)
+        if result[0] == True:
+            self.lineEditB_BookID.setText("")
+            self.lineEditB_UserID.setText("")
+            self.Borrowing_ReviewSetDisplay(result[1])
+        else:
+            QMessageBox.warning(self, "Error", result[1])
+
+    def Borrowing_BatchReviewLoaded(self, bookIds: list[int], userId: int, result: ExecuteResult[BooksBorrowReviewData]) -> None:
+        self.BorrowingCurrentBookIds = (bookIds if result[0] else [])
+        self.BorrowingCurrentUserId = (userId if result[0] else None)
+        if result[0] == False:
+            QMessageBox.warning(self, "Error", result[1])
+            return None
+
+        failed = [item for item in result[1].items if not item.success]
+        self.lineEditB_BookID.setText("")
+        self.lineEditB_UserID.setText("")
+        self.labelB_BookID.setText(", ".join(str(i) for i in bookIds))
+        self.labelB_BookTitle.setText(f"{len(result[1].items) - len(failed)} of {len(result[1].items)} books can be borrowed")
+        self.labelB_UserID.setText(str(result[1].userId))
+        self.labelB_UserName.setText(result[1].userName)
+        self.labelB_Image.setPixmap(self.defaultBorrowingBookImage)
+        self.groupBoxB.show()
+
+        if len(failed) > 0:
+            QMessageBox.warning(self, "Borrowing Book", "\n".join(f"Book ID {item.bookId}: {item.message}" for item in failed))
 
     def Borrowing_BorrowClicked(self) -> None:
-        if self.BorrowingCurrentBookId and self.BorrowingCurrentUserId:
-            result = Session.borrowBook(self.BorrowingCurrentBookId, self.BorrowingCurrentUserId)
-            if result[0]:
-                QMessageBox.information(self, "Borrowing Book", "Saved successfully.")
-                self.Borrowing_ReviewClear()
-            else:
-                QMessageBox.warning(self, "Borrowing Book", "Failed to borrow this book.\n\n" + str(result[1]))
+        if len(self.BorrowingCurrentBookIds) == 1 and self.BorrowingCurrentUserId:
+            self.worker.submit(Session.borrowBook, self.BorrowingCurrentBookIds[0], self.BorrowingCurrentUserId, callback=self.Borrowing_BorrowDone)
+        elif len(self.BorrowingCurrentBookIds) > 1 and self.BorrowingCurrentUserId:
+            self.worker.submit(Session.borrowBooks, self.BorrowingCurrentUserId, self.BorrowingCurrentBookIds, callback=self.Borrowing_BorrowBatchDone)
+
+    def Borrowing_BorrowBatchDone(self, result: ExecuteResult[list[CirculationResultData]]) -> None:
+        if self.Circulation_batchDone("Borrowing Book", "borrow", result):
+            self.Borrowing_ReviewClear()
+
+    def Borrowing_BorrowDone(self, result: ExecuteResult[None]) -> None:
+        if result[0]:
+            QMessageBox.information(self, "Borrowing Book", "Saved successfully.")
+            self.Borrowing_ReviewClear()
+        else:
+            QMessageBox.warning(self, "Borrowing Book", "Failed to borrow this book.\n\n" + str(result[1]))
 
     def Borrowing_ReviewClear(self) -> None:
         self.groupBoxB.hide()
@@ -373,29 +549,54 @@ class MainWindow_UI(QMainWindow):
     # ------------------------------------------------------------------
 
     def Returning_ReviewClicked(self) -> None:
-        bookId = self.lineEditR_BookID.text().strip()
+        items = self.Circulation_parseBookIds(self.lineEditR_BookID.text())
 
-        if bookId == "":
+        if len(items) == 0:
             self.Returning_ReviewClear()
             QMessageBox.warning(self, "Warning", "Book ID should not be empty.")
         else:
-            IntBookId = int(bookId)
-            result = Session.returnBookGetReview(IntBookId)
-            self.ReturningCurrentBookId = (IntBookId if result[0] else None)
-            if result[0] == True:
-                self.lineEditR_BookID.setText("")
-                self.Returning_ReviewSetDisplay(result[1])
-            else:
-                QMessageBox.warning(self, "Error", result[1])
+            self.Circulation_resolveBookIds("Returning Book", items, True, self.Returning_Review)
+
+    def Returning_Review(self, bookIds: list[int]) -> None:
+        if len(bookIds) == 1:
+            self.worker.submit(
+                Session.returnBookGetReview, bookIds[0],
+                callback=lambda result: self.Returning_ReviewLoaded(bookIds, result), key="ReturningReview"
+            )
+        else:
+            # Each book may belong to a different patron, returnBooks reports the ones that are not borrowed
+            self.Returning_ReviewClear()
+            self.ReturningCurrentBookIds = bookIds
+            self.lineEditR_BookID.setText("")
+            self.labelR_BookID.setText(", ".join(str(i) for i in bookIds))
+            self.labelR_BookTitle.setText(f"{len(bookIds)} books")
+            self.groupBoxR.show()
+            self.Circulation_validateBookIds("Returning Book", bookIds)
+
+    def Returning_ReviewLoaded(self, bookIds: list[int], result: ExecuteResult[BookReturnReviewData]) -> None:
+        self.ReturningCurrentBookIds = (bookIds if result[0] else [])
+        if result[0] == True:
+            self.lineEditR_BookID.setText("")
+            self.Returning_ReviewSetDisplay(result[1])
+        else:
+            QMessageBox.warning(self, "Error", result[1])
 
     def Returning_ReturnClicked(self) -> None:
-        if self.ReturningCurrentBookId:
-            result = Session.returnBook(self.ReturningCurrentBookId)
-            if result[0]:
-                QMessageBox.information(self, "Returning Book", "Saved successfully.")
-                self.Returning_ReviewClear()
-            else:
-                QMessageBox.warning(self, "Returning Book", "Failed to borrow this book.\n\n" + str(result[1]))
+        if len(self.ReturningCurrentBookIds) == 1:
+            self.worker.submit(Session.returnBook, self.ReturningCurrentBookIds[0], callback=self.Returning_ReturnDone)
+        elif len(self.ReturningCurrentBookIds) > 1:
+            self.worker.submit(Session.returnBooks, self.ReturningCurrentBookIds, callback=self.Returning_ReturnBatchDone)
+
+    def Returning_ReturnBatchDone(self, result: ExecuteResult[list[CirculationResultData]]) -> None:
+        if self.Circulation_batchDone("Returning Book", "return", result):
+            self.Returning_ReviewClear()
+
+    def Returning_ReturnDone(self, result: ExecuteResult[None]) -> None:
+        if result[0]:
+            QMessageBox.information(self, "Returning Book", "Saved successfully.")
+            self.Returning_ReviewClear()
+        else:
+            QMessageBox.warning(self, "Returning Book", "Failed to borrow this book.\n\n" + str(result[1]))
 
     def Returning_ReviewClear(self) -> None:
         self.groupBoxR.hide()
@@ -450,23 +651,15 @@ class MainWindow_UI(QMainWindow):
                 btn.setChecked(False)
 
     def BorrowingManagement_pushButton_edit(self) -> None:
-        if self.currentSelectRecord is not None and self.currentSelectRecord < len(self.listBorrowingHistory):
-            self.BorrowRecordEditForm_New(self.BorrowingManagement_edit, self.listBorrowingHistory[self.currentSelectRecord])
+        if self.currentSelectRecord is not None and self.currentSelectRecord < self.borrowHistoryModel.rowCount():
+            self.BorrowRecordEditForm_New(self.BorrowingManagement_edit, self.borrowHistoryModel.rows[self.currentSelectRecord])
 
     def BorrowingManagement_edit(self, action: BorrowRecordEdit_UI.BorrowRecordEditAction, data: Optional[BookBorrowHistoryData], old_data: Optional[BookBorrowHistoryData]) -> bool:
         if action == BorrowRecordEdit_UI.BorrowRecordEditAction.SAVE and data is not None and old_data is not None:
             if data == old_data:
                 return True
 
-            result = Session.updateBorrowHistory(data, old_data)
-
-            if result[0] == True:
-                QMessageBox.information(self, "Update borrowing history", "Record updated successfully")
-            else:
-                QMessageBox.warning(self, "Update borrowing history", f"Failed to update record\n{result[1]}")
-                return False
-
-            self.BorrowingManagement_listRefresh()
+            self.worker.submit(Session.updateBorrowHistory, data, old_data, callback=self.BorrowingManagement_editDone)
             return True
         elif action == BorrowRecordEdit_UI.BorrowRecordEditAction.REMOVE:
             reply = QMessageBox.question(
@@ -474,80 +667,75 @@ class MainWindow_UI(QMainWindow):
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes
             )
             if reply == QMessageBox.StandardButton.Yes:
-                if self.currentSelectRecord is not None and self.currentSelectRecordHistoryId is not None and self.currentSelectRecord < len(self.listBorrowingHistory):
-                    result = Session.removeBorrowHistory(self.currentSelectRecordHistoryId)
-                    if result[0] == True:
-                        QMessageBox.information(self, "Remove borrowing history", "This record has been successfully removed.")
-                    else:
-                        QMessageBox.warning(self, "Error", f"Failed to remove this record\n\n{result[1]}")
+                if self.currentSelectRecord is not None and self.currentSelectRecordHistoryId is not None and self.currentSelectRecord < self.borrowHistoryModel.rowCount():
+                    self.worker.submit(Session.removeBorrowHistory, self.currentSelectRecordHistoryId, callback=self.BorrowingManagement_removeDone)
                 else:
                     QMessageBox.warning(self, "Warning", "Please select an item.")
-
-                self.BorrowingManagement_listRefresh()
+                    self.BorrowingManagement_listRefresh()
             return True
         else:
             return False
 
-    def BorrowingManagement_SelectRow(self, row: Optional[int] = None) -> None:
-        if row is not None:
-            self.currentSelectRecord = row
-            self.currentSelectRecordHistoryId = self.listBorrowingHistory[row].historyId
+    def BorrowingManagement_editDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Update borrowing history", "Record updated successfully")
+            self.BorrowingManagement_listRefresh()
+        else:
+            QMessageBox.warning(self, "Update borrowing history", f"Failed to update record\n{result[1]}")
+
+    def BorrowingManagement_removeDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Remove borrowing history", "This record has been successfully removed.")
         else:
-            row = self.tableWidgetBMGMT.currentRow()
-            self.currentSelectRecordHistoryId = self.listBorrowingHistory[row].historyId
-            try:
-                self.currentSelectUser = row
-            except Exception as err:
-                QMessageBox.critical(self, "Error", str(err))
+            QMessageBox.warning(self, "Error", f"Failed to remove this record\n\n{result[1]}")
+
+        self.BorrowingManagement_listRefresh()
+
+    def BorrowingManagement_SelectRow(self, row: Optional[int] = None) -> None:
+        if row is None:
+            row = self.tableViewBWMGMT.currentIndex().row()
+
+        record: Optional[BookBorrowHistoryData] = self.borrowHistoryModel.row(row)
+        self.currentSelectRecord = row if record is not None else None
+        self.currentSelectRecordHistoryId = record.historyId if record is not None else None
 
     def BorrowingManagement_listRefresh(self) -> None:
         bookId = self.lineEditBWMGMT_BookID.text().strip()
         userId = self.lineEditBWMGMT_UserID.text().strip()
         borrowing=self.radioButtonBWMGMT_WaitReturn.isChecked()
         returned=self.radioButtonBWMGMT_Returned.isChecked()
+        IntBookId = int(bookId) if bookId != "" else None
+        IntUserId = int(userId) if userId != "" else None
+        syncKey = (IntBookId, IntUserId, borrowing, returned)
+        if self.borrowHistoryModel.sync(syncKey):
+            return None
+
         if (bookId != "" or userId != "") or borrowing or returned:
-            result = Session.searchBorrowHistoryByBookOrUserId(
-                int(bookId) if bookId != "" else None,
-                int(userId) if userId != "" else None,
-                borrowing=borrowing,
-                returned=returned
+            self.BorrowingManagement_listBorrowHistory(
+                lambda last, offset, limit: Session.searchBorrowHistoryByBookOrUserId(
+                    IntBookId, IntUserId, borrowing=borrowing, returned=returned,
+                    afterId=(last.historyId if last else 0), limit=limit
+                ),
+                lambda record: (
+                    (IntBookId is None or record.bookId == IntBookId) and (IntUserId is None or record.userId == IntUserId) and
+                    (not borrowing or record.returned is None) and (not returned or record.returned is not None)
+                ),
+                syncKey
             )
-            if result[0] == True:
-                self.BorrowingManagement_listBorrowHistory(result[1])
-            else:
-                QMessageBox.warning(self, "Error", result[1])
         else:
-            self.BorrowingManagement_listBorrowHistory()
+            self.BorrowingManagement_listBorrowHistory(syncKey=syncKey)
 
-    def BorrowingManagement_listBorrowHistory(self, data: Optional[list[BookBorrowHistoryData]] = None) -> None:
-        self.tableWidgetBWMGMT.clearFocus()
+    def BorrowingManagement_listBorrowHistory(self, fetchPage: Optional[PageFetcher] = None, accept: Optional[Callable[[BookBorrowHistoryData], bool]] = None, syncKey: Any = None) -> None:
+        self.tableViewBWMGMT.clearFocus()
 
-        if data is None:
-            list_result = Session.listBorrowHistory()
+        if fetchPage is None:
+            fetchPage = lambda last, offset, limit: Session.listBorrowHistory(last.historyId if last else 0, limit)
 
-            if list_result[0] == True:
-                data = list_result[1]
-            else:
-                QMessageBox.warning(self, "Error", list_result[1])
-                return None
+        self.borrowHistoryModel.reset(fetchPage, Session.getBorrowHistoryChanges, accept, syncKey)
 
-        self.listBorrowingHistory.clear()
-        self.tableWidgetBWMGMT.setRowCount(len(data))
-
-        if data:
-            for row, record in enumerate(data):
-                self.listBorrowingHistory.append(record)
-                color = Qt.GlobalColor.green if record.returned else Qt.GlobalColor.red
-                self.tableWidgetBWMGMT.setItem(row, 0, self.toTableWidgetItem(record.historyId, center=True))
-                self.tableWidgetBWMGMT.setItem(row, 1, self.toTableWidgetItem(record.userId, center=True))
-                self.tableWidgetBWMGMT.setItem(row, 2, self.toTableWidgetItem(record.userName))
-                self.tableWidgetBWMGMT.setItem(row, 3, self.toTableWidgetItem(record.bookId, center=True))
-                self.tableWidgetBWMGMT.setItem(row, 4, self.toTableWidgetItem(record.bookTitle))
-                self.tableWidgetBWMGMT.setItem(row, 5, self.toTableWidgetItem(record.borrowed, center=True))
-                self.tableWidgetBWMGMT.setItem(row, 6, self.toTableWidgetItem((record.returned if record.returned else "-"), center=True))
-                self.tableWidgetBWMGMT.setItem(row, 7, self.toTableWidgetItem(("Returned" if record.returned else "Borrowing"), center=True, color=color))
-        else:
-            self.currentSelectRecord = None
+    def BorrowingManagement_listBorrowHistoryLoaded(self) -> None:
+        self.currentSelectRecord = self.borrowHistoryModel.indexOfKey(self.currentSelectRecordHistoryId)
+        if self.currentSelectRecord is None:
             self.currentSelectRecordHistoryId = None
 
     # ------------------------------------------------------------------
@@ -570,35 +758,35 @@ class MainWindow_UI(QMainWindow):
         self.BookEditForm_New(self.BookManagement_addBook)
 
     def BookManagement_addBook(self, data: BookData, _) -> bool:
-        result = Session.addBook(data)
+        self.worker.submit(Session.addBook, data, callback=self.BookManagement_addBookDone)
+        return True
 
+    def BookManagement_addBookDone(self, result: ExecuteResult[Optional[int]]) -> None:
         if result[0] == True:
             QMessageBox.information(self, "Add book", "Book added successfully" + (f", ID is {result[1]}" if result[1] else ""))
+            self.BookManagement_listBookRefresh()
         else:
             QMessageBox.warning(self, "Add book", f"Failed to add book\n{result[1]}")
-            return False
-
-        self.BookManagement_listBookRefresh()
-        return True
 
     def BookManagement_pushButton_editBook(self) -> None:
-        if self.currentSelectBook is not None and self.currentSelectBook < len(self.bookList):
-            self.BookEditForm_New(self.BookManagement_editBook, self.bookList[self.currentSelectBook])
+        if self.currentSelectBook is not None and self.currentSelectBook < self.bookModel.rowCount():
+            self.BookEditForm_New(self.BookManagement_editBook, self.bookModel.rows[self.currentSelectBook])
 
     def BookManagement_editBook(self, data: BookData, old_data: Optional[BookData]) -> bool:
         if data == old_data:
             return True
 
-        result = Session.updateBook(data, old_data)
+        self.worker.submit(Session.updateBook, data, old_data, callback=lambda result: self.BookManagement_editBookDone(data, result))
+        return True
 
+    def BookManagement_editBookDone(self, data: BookData, result: ExecuteResult[None]) -> None:
         if result[0] == True:
+            if data.bookId is not None:
+                self.bookImageCache.remove(data.bookId)
             QMessageBox.information(self, "Update book", "Book updated successfully")
+            self.BookManagement_listBookRefresh()
         else:
             QMessageBox.warning(self, "Update book", f"Failed to update data\n{result[1]}")
-            return False
-
-        self.BookManagement_listBookRefresh()
-        return True
 
     def BookManagement_pushButton_removeBook(self) -> None:
         reply = QMessageBox.question(
@@ -606,16 +794,20 @@ class MainWindow_UI(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes
         )
         if reply == QMessageBox.StandardButton.Yes:
-            if self.currentSelectBook is not None and self.currentSelectBookId is not None and self.currentSelectBook < len(self.bookList):
-                result = Session.removeBook(self.currentSelectBookId)
-                if result[0] == True:
-                    QMessageBox.information(self, "Remove book", "This book has been successfully removed.")
-                else:
-                    QMessageBox.warning(self, "Error", f"Failed to remove this book\n\n{result[1]}")
+            if self.currentSelectBook is not None and self.currentSelectBookId is not None and self.currentSelectBook < self.bookModel.rowCount():
+                self.bookImageCache.remove(self.currentSelectBookId)
+                self.worker.submit(Session.removeBook, self.currentSelectBookId, callback=self.BookManagement_removeBookDone)
             else:
                 QMessageBox.warning(self, "Warning", "Please select an item.")
+                self.BookManagement_listBookRefresh()
 
-            self.BookManagement_listBookRefresh()
+    def BookManagement_removeBookDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Remove book", "This book has been successfully removed.")
+        else:
+            QMessageBox.warning(self, "Error", f"Failed to remove this book\n\n{result[1]}")
+
+        self.BookManagement_listBookRefresh()
 
     def BookManagement_pushButton_editBookByID(self) -> None:
         reply = QInputDialog.getText(self, "Edit by ID", "Book ID")
@@ -624,90 +816,94 @@ class MainWindow_UI(QMainWindow):
             if text == "":
                 QMessageBox.warning(self, "Error", "Book ID should not be empty.")
             else:
-                result = Session.getBook(int(text))
-                if result[0] == True:
-                    if result[1] is None:
-                        QMessageBox.information(self, "Result", f"Not Found, Book ID {text}")
-                    else:
-                        self.BookEditForm_New(self.BookManagement_editBook, result[1])
-                else:
-                    QMessageBox.warning(self, "Error", result[1])
+                self.worker.submit(Session.getBook, int(text), callback=lambda result: self.BookManagement_editBookByIDLoaded(text, result))
 
         self.BookManagement_listBookRefresh()
 
+    def BookManagement_editBookByIDLoaded(self, text: str, result: ExecuteResult[Optional[BookData]]) -> None:
+        if result[0] == True:
+            if result[1] is None:
+                QMessageBox.information(self, "Result", f"Not Found, Book ID {text}")
+            else:
+                self.BookEditForm_New(self.BookManagement_editBook, result[1])
+        else:
+            QMessageBox.warning(self, "Error", result[1])
+
     def BookManagement_listBookRefresh(self) -> None:
         title = self.lineEditBMGMT_Search.text().strip()
         if title != "":
-            result = Session.searchBookByTitle(title)
-            if result[0] == True:
-                self.BookManagement_listBook(result[1])
-            else:
-                QMessageBox.warning(self, "Error", result[1])
-        else:
+            # Search results are ordered by relevance, they can't be patched by bookId
+            self.BookManagement_listBook(lambda last, offset, limit: Session.searchBook(title, offset, limit))
+        elif not self.bookModel.sync():
             self.BookManagement_listBook()
 
-        if len(self.bookList) > 0:
-            if self.currentSelectBookId:
-                select = self.bookList[0]
-                for item in self.bookList:
-                    if item.bookId == self.currentSelectBookId:
-                        select = item
-                        break
+    def BookManagement_listBook(self, fetchPage: Optional[PageFetcher] = None) -> None:
+        self.tableViewBMGMT.clearFocus()
 
-                self.BookManagement_SetDisplayBook(select)
+        if fetchPage is None:
+            self.bookModel.reset(lambda last, offset, limit: Session.listBook(last.bookId if last else 0, limit), Session.getBookChanges)
         else:
-            self.BookManagement_SetDisplayBook(BookData(None, None, "", "", "", "", "", ""))
+            self.bookModel.reset(fetchPage)
 
-    def BookManagement_listBook(self, data: Optional[list[BookData]] = None) -> None:
-        self.tableWidgetBMGMT.clearFocus()
-
-        if data is None:
-            listbook_result = Session.listBook()
-
-            if listbook_result[0] == True:
-                data = listbook_result[1]
-            else:
-                QMessageBox.warning(self, "Error", listbook_result[1])
-                return None
-
-        self.bookList.clear()
-        self.tableWidgetBMGMT.setRowCount(len(data))
-
-        if data:
-            for row, book in enumerate(data):
-                self.bookList.append(book)
-                self.tableWidgetBMGMT.setItem(row, 0, self.toTableWidgetItem(book.bookId, center=True))
-                self.tableWidgetBMGMT.setItem(row, 1, self.toTableWidgetItem(book.title))
-                self.tableWidgetBMGMT.setItem(row, 2, self.toTableWidgetItem(book.author))
-                self.tableWidgetBMGMT.setItem(row, 3, self.toTableWidgetItem(book.publication))
-                self.tableWidgetBMGMT.setItem(row, 4, self.toTableWidgetItem(book.isbn10))
-                self.tableWidgetBMGMT.setItem(row, 5, self.toTableWidgetItem(book.isbn13))
+    def BookManagement_listBookLoaded(self) -> None:
+        if self.bookModel.rowCount() > 0:
+            row = self.bookModel.indexOfKey(self.currentSelectBookId) if self.currentSelectBookId else None
+            self.BookManagement_SelectRow(row if row is not None else 0)
         else:
             self.currentSelectBook = None
             self.currentSelectBookId = None
+            self.BookManagement_SetDisplayBook(BookData(None, None, "", "", "", "", "", ""))
 
     def BookManagement_SelectRow(self, row: Optional[int] = None) -> None:
-        if row is not None:
+        if row is None:
+            row = self.tableViewBMGMT.currentIndex().row()
+
+        book: Optional[BookData] = self.bookModel.row(row)
+        if book is not None:
             self.currentSelectBook = row
-            self.currentSelectBookId = self.bookList[row].bookId
-            self.BookManagement_SetDisplayBook(self.bookList[row])
-        else:
-            row = self.tableWidgetBMGMT.currentRow()
-            try:
-                self.currentSelectBook = row
-                self.currentSelectBookId = self.bookList[row].bookId
-                self.BookManagement_SetDisplayBook(self.bookList[row])
-            except Exception as err:
-                QMessageBox.critical(self, "Error", str(err))
+            self.currentSelectBookId = book.bookId
+            self.BookManagement_SetDisplayBook(book)
+
+    def BookManagement_getBookImage(self, data: BookData) -> Optional[QPixmap]:
+        if data.bookId is None:
+            return None
+
+        image = self.bookImageCache.get(data.bookId)
+
+        if image is None:
+            raw = data.thumbnail if data.thumbnail is not None else data.image
+            if raw is None:
+                bookId = data.bookId
+                self.worker.submit(Session.getBookImage, bookId, callback=lambda result: self.BookManagement_bookImageLoaded(bookId, result), key="BookImage")
+                return None
+
+            image = self.BookManagement_cacheBookImage(data.bookId, raw)
+
+        return None if image.isNull() else image
+
+    def BookManagement_cacheBookImage(self, bookId: int, raw: Optional[bytes]) -> QPixmap:
+        image = QPixmap()
+        if raw:
+            image.loadFromData(raw) # type: ignore
+        self.bookImageCache.put(bookId, image)
+        return image
+
+    def BookManagement_bookImageLoaded(self, bookId: int, result: ExecuteResult[Optional[bytes]]) -> None:
+        if result[0] == False:
+            QMessageBox.critical(self, "Error", result[1])
+            return None
 
-    def BookManagement_SetDisplayBook(self, data: BookData) -> None:
         try:
-            if data.image:
-                image = QPixmap()
-                image.loadFromData(data.image) # type: ignore
+            image = self.BookManagement_cacheBookImage(bookId, result[1])
+            if self.labelBMGMT_bookId.text() == str(bookId) and not image.isNull():
                 self.labelBMGMT_BookImage.setPixmap(image)
-            else:
-                self.labelBMGMT_BookImage.setPixmap(self.defaultBookImage)
+        except Exception as err:
+            QMessageBox.critical(self, "Error", str(err))
+
+    def BookManagement_SetDisplayBook(self, data: BookData) -> None:
+        try:
+            image = self.BookManagement_getBookImage(data)
+            self.labelBMGMT_BookImage.setPixmap(image if image is not None else self.defaultBookImage)
         except Exception as err:
             QMessageBox.critical(self, "Error", str(err))
             return None
@@ -726,12 +922,15 @@ class MainWindow_UI(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes
         )
         if reply == QMessageBox.StandardButton.Yes:
-            result = Session.clearBook()
-            if result[0] == True:
-                QMessageBox.information(self, "Clear book", "All books have been successfully removed from the database.")
-                self.BookManagement_listBookRefresh()
-            else:
-                QMessageBox.warning(self, "Clear book", "Failed to clear book from the database.\n\n" + result[1])
+            self.bookImageCache.clear()
+            self.worker.submit(Session.clearBook, callback=self.BookManagement_ClearBookDone)
+
+    def BookManagement_ClearBookDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Clear book", "All books have been successfully removed from the database.")
+            self.BookManagement_listBookRefresh()
+        else:
+            QMessageBox.warning(self, "Clear book", "Failed to clear book from the database.\n\n" + result[1])
 
     # ------------------------------------------------------------------
 
@@ -753,35 +952,33 @@ class MainWindow_UI(QMainWindow):
         self.UserEditForm_New(self.UserManagement_addUser)
 
     def UserManagement_addUser(self, data: UserData, _) -> bool:
-        result = Session.addUser(data)
+        self.worker.submit(Session.addUser, data, callback=self.UserManagement_addUserDone)
+        return True
 
+    def UserManagement_addUserDone(self, result: ExecuteResult[Any]) -> None:
         if result[0] == True:
             QMessageBox.information(self, "Add user", "User added successfully" + (f", ID is {result[1]}" if result[1] else ""))
+            self.UserManagement_listUserRefresh()
         else:
             QMessageBox.warning(self, "Add user", f"Failed to add user\n\n{result[1]}")
-            return False
-
-        self.UserManagement_listUserRefresh()
-        return True
 
     def UserManagement_pushButton_editUser(self) -> None:
-        if self.currentSelectUser is not None and self.currentSelectUser < len(self.userList):
-            self.UserEditForm_New(self.UserManagement_editUser, self.userList[self.currentSelectUser])
+        if self.currentSelectUser is not None and self.currentSelectUser < self.userModel.rowCount():
+            self.UserEditForm_New(self.UserManagement_editUser, self.userModel.rows[self.currentSelectUser])
 
     def UserManagement_editUser(self, data: UserData, old_data: Optional[UserData]) -> bool:
         if data == old_data:
             return True
 
-        result = Session.updateUser(data, old_data)
+        self.worker.submit(Session.updateUser, data, old_data, callback=self.UserManagement_editUserDone)
+        return True
 
+    def UserManagement_editUserDone(self, result: ExecuteResult[None]) -> None:
         if result[0] == True:
             QMessageBox.information(self, "Update user", "User updated successfully")
+            self.UserManagement_listUserRefresh()
         else:
             QMessageBox.warning(self, "Update user", f"Failed to update data\n\n{result[1]}")
-            return False
-
-        self.UserManagement_listUserRefresh()
-        return True
 
     def UserManagement_pushButton_removeUser(self) -> None:
         reply = QMessageBox.question(
@@ -789,16 +986,19 @@ class MainWindow_UI(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes
         )
         if reply == QMessageBox.StandardButton.Yes:
-            if self.currentSelectUser is not None and self.currentSelectUserId is not None and self.currentSelectUser < len(self.userList):
-                result = Session.removeUser(self.currentSelectUserId)
-                if result[0] == True:
-                    QMessageBox.information(self, "Remove user", "This user has been successfully removed.")
-                else:
-                    QMessageBox.warning(self, "Error", f"Failed to remove this user\n\n{result[1]}")
+            if self.currentSelectUser is not None and self.currentSelectUserId is not None and self.currentSelectUser < self.userModel.rowCount():
+                self.worker.submit(Session.removeUser, self.currentSelectUserId, callback=self.UserManagement_removeUserDone)
             else:
                 QMessageBox.warning(self, "Warning", "Please select an item.")
+                self.UserManagement_listUserRefresh()
 
-            self.UserManagement_listUserRefresh()
+    def UserManagement_removeUserDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Remove user", "This user has been successfully removed.")
+        else:
+            QMessageBox.warning(self, "Error", f"Failed to remove this user\n\n{result[1]}")
+
+        self.UserManagement_listUserRefresh()
 
     def UserManagement_pushButton_editUserById(self) -> None:
         reply = QInputDialog.getText(self, "Edit by ID", "User ID")
@@ -807,70 +1007,48 @@ class MainWindow_UI(QMainWindow):
             if text == "":
                 QMessageBox.warning(self, "Error", "User ID should not be empty.")
             else:
-                result = Session.getUser(int(text))
-                if result[0] == True:
-                    if result[1] is None:
-                        QMessageBox.information(self, "Result", f"Not Found, User ID {text}")
-                    else:
-                        self.UserEditForm_New(self.UserManagement_editUser, result[1])
-                else:
-                    QMessageBox.warning(self, "Error", result[1])
+                self.worker.submit(Session.getUser, int(text), callback=lambda result: self.UserManagement_editUserByIdLoaded(text, result))
 
         self.UserManagement_listUserRefresh()
 
-    def UserManagement_SelectRow(self, row: Optional[int] = None) -> None:
-        if row is not None:
-            self.currentSelectUser = row
-            self.currentSelectUserId = self.userList[row].userId
+    def UserManagement_editUserByIdLoaded(self, text: str, result: ExecuteResult[Optional[UserData]]) -> None:
+        if result[0] == True:
+            if result[1] is None:
+                QMessageBox.information(self, "Result", f"Not Found, User ID {text}")
+            else:
+                self.UserEditForm_New(self.UserManagement_editUser, result[1])
         else:
-            row = self.tableWidgetBMGMT.currentRow()
-            try:
-                self.currentSelectUser = row
-                self.currentSelectUserId = self.userList[row].userId
-            except Exception as err:
-                QMessageBox.critical(self, "Error", str(err))
+            QMessageBox.warning(self, "Error", result[1])
+
+    def UserManagement_SelectRow(self, row: Optional[int] = None) -> None:
+        if row is None:
+            row = self.tableViewUMGMT.currentIndex().row()
+
+        user: Optional[UserData] = self.userModel.row(row)
+        self.currentSelectUser = row if user is not None else None
+        self.currentSelectUserId = user.userId if user is not None else None
 
     def UserManagement_listUserRefresh(self) -> None:
         firstName = self.lineEditUMGMT_FirstName.text().strip()
         lastName = self.lineEditUMGMT_LastName.text().strip()
         if firstName != "" or lastName != "":
-            result = Session.searchUserByName(
-                firstName if firstName != "" else None,
-                lastName if lastName != "" else None
-            )
-            if result[0] == True:
-                self.UserManagement_listUser(result[1])
-            else:
-                QMessageBox.warning(self, "Error", result[1])
-        else:
+            # Searched as you type from the in-memory index, across names, email and phone, best matches first
+            query = f"{firstName} {lastName}"
+            self.UserManagement_listUser(lambda last, offset, limit: Session.searchUser(query, offset, limit))
+        elif not self.userModel.sync():
             self.UserManagement_listUser()
 
-    def UserManagement_listUser(self, data: Optional[list[UserData]] = None) -> None:
-        self.tableWidgetUMGMT.clearFocus()
-
-        if data is None:
-            result = Session.listUser()
-
-            if result[0] == True:
-                data = result[1]
-            else:
-                QMessageBox.warning(self, "Error", result[1])
-                return None
+    def UserManagement_listUser(self, fetchPage: Optional[PageFetcher] = None) -> None:
+        self.tableViewUMGMT.clearFocus()
 
-        self.userList.clear()
-        self.tableWidgetUMGMT.setRowCount(len(data))
-
-        if data:
-            for row, user in enumerate(data):
-                self.userList.append(user)
-                self.tableWidgetUMGMT.setItem(row, 0, self.toTableWidgetItem(user.userId, center=True))
-                self.tableWidgetUMGMT.setItem(row, 1, self.toTableWidgetItem((user.prefixName + "." if user.prefixName else "") + user.firstName))
-                self.tableWidgetUMGMT.setItem(row, 2, self.toTableWidgetItem(user.lastName))
-                self.tableWidgetUMGMT.setItem(row, 3, self.toTableWidgetItem(user.email if user.email else ""))
-                self.tableWidgetUMGMT.setItem(row, 4, self.toTableWidgetItem(user.phone if user.phone else ""))
-                self.tableWidgetUMGMT.setItem(row, 5, self.toTableWidgetItem(user.address if user.address else ""))
+        if fetchPage is None:
+            self.userModel.reset(lambda last, offset, limit: Session.listUser(last.userId if last else 0, limit), Session.getUserChanges)
         else:
-            self.currentSelectUser = None
+            self.userModel.reset(fetchPage)
+
+    def UserManagement_listUserLoaded(self) -> None:
+        self.currentSelectUser = self.userModel.indexOfKey(self.currentSelectUserId)
+        if self.currentSelectUser is None:
             self.currentSelectUserId = None
 
     def UserManagement_pushButton_ClearUser(self) -> None:
@@ -879,12 +1057,14 @@ class MainWindow_UI(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes
         )
         if reply == QMessageBox.StandardButton.Yes:
-            result = Session.clearUser()
-            if result[0] == True:
-                QMessageBox.information(self, "Clear user", "All users have been successfully removed from the database.")
-                self.UserManagement_listUserRefresh()
-            else:
-                QMessageBox.warning(self, "Clear user", "Failed to clear user from the database.\n\n" + result[1])
+            self.worker.submit(Session.clearUser, callback=self.UserManagement_ClearUserDone)
+
+    def UserManagement_ClearUserDone(self, result: ExecuteResult[None]) -> None:
+        if result[0] == True:
+            QMessageBox.information(self, "Clear user", "All users have been successfully removed from the database.")
+            self.UserManagement_listUserRefresh()
+        else:
+            QMessageBox.warning(self, "Clear user", "Failed to clear user from the database.\n\n" + result[1])
 
     # ------------------------------------------------------------------
 
@@ -897,17 +1077,9 @@ class MainWindow_UI(QMainWindow):
             self.BookEditForm_Clear()
             self.UserEditForm_Clear()
             self.BorrowRecordForm_Clear()
+            self.worker.cancelAll()
             Session.close()
+            AsyncSession.close()
+            self.bookImageCache.clear()
             self.hide()
             self.LoginForm.open()
-
-    # ------------------------------------------------------------------
-
-    @staticmethod
-    def toTableWidgetItem(text: Any, center: bool = False, color: Optional[Qt.GlobalColor] = None) -> QTableWidgetItem:
-        item = QTableWidgetItem(str(text if text is not None else ""))
-        if center:
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        if color:
-            item.setForeground(color)
-        return item
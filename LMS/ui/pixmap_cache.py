@@ -0,0 +1,30 @@
+from collections import OrderedDict
+from typing import Optional
+
+from PyQt6.QtGui import QPixmap
+
+class PixmapCache:
+    capacity: int
+    items: OrderedDict[int, QPixmap]
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.items = OrderedDict()
+
+    def get(self, key: int) -> Optional[QPixmap]:
+        pixmap = self.items.get(key)
+        if pixmap is not None:
+            self.items.move_to_end(key)
+        return pixmap
+
+    def put(self, key: int, pixmap: QPixmap) -> None:
+        self.items[key] = pixmap
+        self.items.move_to_end(key)
+        while len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+    def remove(self, key: int) -> None:
+        self.items.pop(key, None)
+
+    def clear(self) -> None:
+        self.items.clear()
@@ -0,0 +1,237 @@
+from typing import Callable, Optional, Any
+from dataclasses import dataclass
+from bisect import bisect_left
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QFont, QColor
+
+from ..config import CONFIG
+from ..lms_types import ChangeSetData, ExecuteResult
+from .db_worker import DBWorker
+
+# (last loaded row or None, rows already loaded, page size) -> next page
+PageFetcher = Callable[[Optional[Any], int, int], ExecuteResult[list[Any]]]
+# last synced change or None for the current position -> rows changed since then
+ChangeFetcher = Callable[[Optional[int]], ExecuteResult[ChangeSetData]]
+
+@dataclass
+class TableColumn:
+    header: str
+    value: Callable[[Any], Any]
+    center: bool = False
+    color: Optional[Callable[[Any], Optional[Qt.GlobalColor]]] = None
+
+class PagedTableModel(QAbstractTableModel):
+    fetchFailed = pyqtSignal(str)
+    firstPageLoaded = pyqtSignal()
+    patched = pyqtSignal()
+
+    columns: list[TableColumn]
+    rows: list[Any]
+    key: Callable[[Any], int]
+    worker: DBWorker
+    workerKey: str
+    fetchPage: Optional[PageFetcher]
+    fetchChanges: Optional[ChangeFetcher]
+    accept: Optional[Callable[[Any], bool]]
+    syncKey: Any
+    syncedChangeId: Optional[int]
+    exhausted: bool
+    loading: bool
+    syncing: bool
+    headerFont: QFont
+
+    def __init__(self, columns: list[TableColumn], worker: DBWorker, key: Callable[[Any], int]) -> None:
+        super().__init__()
+        self.columns = columns
+        self.rows = []
+        self.key = key
+        self.worker = worker
+        self.workerKey = f"PagedTableModel-{id(self)}"
+        self.fetchPage = None
+        self.fetchChanges = None
+        self.accept = None
+        self.syncKey = None
+        self.syncedChangeId = None
+        self.exhausted = True
+        self.loading = False
+        self.syncing = False
+        self.headerFont = QFont()
+        self.headerFont.setBold(True)
+
+    def reset(self, fetchPage: Optional[PageFetcher], fetchChanges: Optional[ChangeFetcher] = None, accept: Optional[Callable[[Any], bool]] = None, syncKey: Any = None) -> None:
+        # fetchChanges can only be given when fetchPage returns rows ordered by key,
+        # accept has to match the rows fetchPage filters on
+        self.beginResetModel()
+        self.rows = []
+        self.fetchPage = fetchPage
+        self.fetchChanges = fetchChanges
+        self.accept = accept
+        self.syncKey = syncKey
+        self.syncedChangeId = None
+        self.exhausted = fetchPage is None
+        self.loading = False
+        self.syncing = False
+        self.worker.cancelKey(self.workerKey)
+        self.worker.cancelKey(self.workerKey + "-sync")
+        self.endResetModel()
+
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def sync(self, syncKey: Any = None) -> bool:
+        if self.fetchChanges is None or self.syncedChangeId is None or self.loading or syncKey != self.syncKey:
+            return False
+
+        if not self.syncing:
+            self.syncing = True
+            self.worker.submit(self.fetchChanges, self.syncedChangeId, callback=self.changesFetched, key=self.workerKey + "-sync")
+
+        return True
+
+    def changesFetched(self, result: ExecuteResult[ChangeSetData]) -> None:
+        self.syncing = False
+
+        if result[0] == False or result[1].cleared:
+            self.reset(self.fetchPage, self.fetchChanges, self.accept, self.syncKey)
+            return None
+
+        self.syncedChangeId = result[1].lastChangeId
+        self.patch(result[1].rows, result[1].deleted)
+        self.patched.emit()
+
+    def patch(self, rows: list[Any], deleted: list[int]) -> None:
+        # Rows are patched in place rather than reloaded, so the view keeps its selection and scroll position
+        keys = [self.key(row) for row in self.rows]
+
+        removed = set(deleted)
+        removed.update(self.key(row) for row in rows if self.accept is not None and not self.accept(row))
+        for key in removed:
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                self.beginRemoveRows(QModelIndex(), index, index)
+                del self.rows[index]
+                del keys[index]
+                self.endRemoveRows()
+
+        for row in rows:
+            key = self.key(row)
+            if key in removed:
+                continue
+
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                self.rows[index] = row
+                self.dataChanged.emit(self.index(index, 0), self.index(index, len(self.columns) - 1))
+            elif index < len(keys) or self.exhausted:
+                # Past the last loaded row the next page picks it up
+                self.beginInsertRows(QModelIndex(), index, index)
+                self.rows.insert(index, row)
+                keys.insert(index, key)
+                self.endInsertRows()
+
+    def indexOfKey(self, key: Optional[int]) -> Optional[int]:
+        for index, row in enumerate(self.rows):
+            if self.key(row) == key:
+                return index
+
+        return None
+
+    def row(self, row: int) -> Optional[Any]:
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        record = self.rows[index.row()]
+        column = self.columns[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = column.value(record)
+            return str(value if value is not None else "")
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column.center:
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ForegroundRole and column.color is not None:
+            color = column.color(record)
+            return QColor(color) if color is not None else None
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.columns[section].header
+            elif role == Qt.ItemDataRole.FontRole:
+                return self.headerFont
+        elif role == Qt.ItemDataRole.DisplayRole:
+            return str(section + 1)
+
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self.exhausted and not self.loading and not self.syncing
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid() or self.fetchPage is None or self.loading or self.syncing:
+            return None
+
+        self.loading = True
+        if self.fetchChanges is not None and len(self.rows) == 0:
+            self.worker.submit(
+                self.fetchFirstPage, self.fetchPage, self.fetchChanges, CONFIG.LMS.PAGE_SIZE,
+                callback=self.firstPageFetched, key=self.workerKey
+            )
+        else:
+            self.worker.submit(
+                self.fetchPage, self.rows[-1] if self.rows else None, len(self.rows), CONFIG.LMS.PAGE_SIZE,
+                callback=self.pageFetched, key=self.workerKey
+            )
+
+    @staticmethod
+    def fetchFirstPage(fetchPage: PageFetcher, fetchChanges: ChangeFetcher, limit: int) -> ExecuteResult[tuple[int, list[Any]]]:
+        # Read the change position before the page, anything committed in between is patched on the next sync
+        changes = fetchChanges(None)
+        if changes[0] == False:
+            return changes
+
+        page = fetchPage(None, 0, limit)
+        if page[0] == False:
+            return page
+
+        return (True, (changes[1].lastChangeId, page[1]))
+
+    def firstPageFetched(self, result: ExecuteResult[tuple[int, list[Any]]]) -> None:
+        if result[0] == False:
+            self.pageFetched(result)
+            return None
+
+        self.syncedChangeId = result[1][0]
+        self.pageFetched((True, result[1][1]))
+
+    def pageFetched(self, result: ExecuteResult[list[Any]]) -> None:
+        self.loading = False
+
+        if result[0] == False:
+            self.exhausted = True
+            self.fetchFailed.emit(result[1])
+            return None
+
+        page = result[1]
+        first = len(self.rows) == 0
+        if len(page) < CONFIG.LMS.PAGE_SIZE:
+            self.exhausted = True
+
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+        if first:
+            self.firstPageLoaded.emit()
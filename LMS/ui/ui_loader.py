@@ -0,0 +1,44 @@
+from typing import Optional, Any
+from pathlib import Path
+from importlib import import_module
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6 import uic
+
+from ..config import CONFIG
+
+_forms: dict[str, Optional[type]] = {}
+
+def compiled_module_name(designer_file: str) -> str:
+    return "ui_" + Path(designer_file).stem.replace("-", "_")
+
+def compiled_form(designer_file: str) -> Optional[type]:
+    if not CONFIG.LMS.USE_COMPILED_UI:
+        return None
+    if designer_file in _forms:
+        return _forms[designer_file]
+
+    source = CONFIG.LMS.DESIGNER_FILES.joinpath(designer_file)
+    compiled = CONFIG.LMS.COMPILED_UI.joinpath(compiled_module_name(designer_file) + ".py")
+
+    form: Optional[type] = None
+    # A module older than its .ui file is stale, fall back to parsing until build_ui is run again
+    if compiled.exists() and compiled.stat().st_mtime >= source.stat().st_mtime:
+        module = import_module(f"{__package__}.compiled.{compiled_module_name(designer_file)}")
+        form = next((value for name, value in vars(module).items() if name.startswith("Ui_") and isinstance(value, type)), None)
+
+    _forms[designer_file] = form
+    return form
+
+def load_ui(widget: QWidget, designer_file: str) -> None:
+    form = compiled_form(designer_file)
+    if form is None:
+        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(designer_file), widget)
+        return None
+
+    ui: Any = form()
+    ui.setupUi(widget)
+
+    # setupUi() keeps the child widgets on the form object, loadUi() puts them on the widget
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
@@ -2,10 +2,9 @@ from typing import Callable, Optional
 from copy import copy
 
 from PyQt6.QtWidgets import QWidget, QPushButton, QLineEdit, QMessageBox
-from PyQt6 import uic
 
-from ..config import CONFIG
 from ..lms_types import UserData
+from .ui_loader import load_ui
 
 class UserEdit_UI(QWidget):
     lineEditPrefixName: QLineEdit
@@ -26,7 +25,7 @@ class UserEdit_UI(QWidget):
 
     def __init__(self, callback_func: Callback, old_data: Optional[UserData] = None, _closeEvent: Optional[Callable[["UserEdit_UI"], None]] = None) -> None:
         super().__init__()
-        uic.load_ui.loadUi(CONFIG.LMS.DESIGNER_FILES.joinpath(self.DESIGNER_FILE), self)
+        load_ui(self, self.DESIGNER_FILE)
 
         self.pushButtonSave.clicked.connect(self.pushButtonSaveClicked)
 
@@ -0,0 +1,197 @@
+from array import array
+from collections import defaultdict
+from threading import Lock
+from time import monotonic
+from typing import Iterable, Optional, Sequence
+
+from .lms_types import UserData
+
+def _text(user: UserData) -> str:
+    words: list[str] = []
+    for value in (user.firstName, user.lastName, user.email, user.phone):
+        if value:
+            words.extend(value.casefold().split())
+
+    # Phone numbers are typed without the separators they were saved with
+    if user.phone:
+        digits = "".join(char for char in user.phone if char.isdigit())
+        if digits != "" and digits != user.phone:
+            words.append(digits)
+
+    # Two spaces between words, so " jo" only matches the start of a word and no trigram spans two words
+    return "  " + "  ".join(words) + " "
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _initials(text: str) -> set[str]:
+    return {word[0] for word in text.split()}
+
+class UserSearchIndex:
+    # Slots are append-only, an updated user gets a new slot and the old one is dropped,
+    # so every posting list stays sorted without being rewritten
+    userIds: array
+    texts: list[str]
+    slots: dict[int, int]
+    postings: dict[str, array]
+    initials: dict[str, array]
+    dropped: int
+    lock: Lock
+    syncLock: Lock
+    ready: bool
+    syncedChangeId: Optional[int]
+    syncedAt: float
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.syncLock = Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self.lock:
+            self._reset()
+            self.ready = False
+            self.syncedChangeId = None
+            self.syncedAt = 0.0
+
+    def _reset(self) -> None:
+        self.userIds = array("q")
+        self.texts = []
+        self.slots = {}
+        self.postings = {}
+        self.initials = {}
+        self.dropped = 0
+
+    def _add(self, userId: int, text: str) -> None:
+        slot = len(self.userIds)
+        self.userIds.append(userId)
+        self.texts.append(text)
+        self.slots[userId] = slot
+
+        for key in _trigrams(text):
+            posting = self.postings.get(key)
+            if posting is None:
+                posting = self.postings[key] = array("I")
+            posting.append(slot)
+
+        for key in _initials(text):
+            posting = self.initials.get(key)
+            if posting is None:
+                posting = self.initials[key] = array("I")
+            posting.append(slot)
+
+    def _drop(self, userId: int) -> None:
+        slot = self.slots.pop(userId, None)
+        if slot is not None:
+            self.userIds[slot] = 0
+            self.texts[slot] = ""
+            self.dropped += 1
+
+    def _build(self, users: Iterable[tuple[int, str]]) -> None:
+        # Lists grow faster than arrays, they are packed once every user is in
+        postings: defaultdict[str, list[int]] = defaultdict(list)
+        initials: defaultdict[str, list[int]] = defaultdict(list)
+        self._reset()
+        for userId, text in users:
+            slot = len(self.texts)
+            self.userIds.append(userId)
+            self.texts.append(text)
+            self.slots[userId] = slot
+            for key in _trigrams(text):
+                postings[key].append(slot)
+            for key in _initials(text):
+                initials[key].append(slot)
+
+        self.postings = {key: array("I", slots) for key, slots in postings.items()}
+        self.initials = {key: array("I", slots) for key, slots in initials.items()}
+
+    def load(self, users: Iterable[UserData], changeId: int) -> None:
+        with self.lock:
+            self._build((user.userId, _text(user)) for user in users if user.userId is not None)
+            self.ready = True
+            self.synced(changeId)
+
+    def synced(self, changeId: int) -> None:
+        self.syncedChangeId = changeId
+        self.syncedAt = monotonic()
+
+    def expire(self) -> None:
+        self.syncedAt = 0.0
+
+    def put(self, users: Iterable[UserData]) -> None:
+        with self.lock:
+            if not self.ready:
+                return None
+
+            for user in users:
+                if user.userId is not None:
+                    self._drop(user.userId)
+                    self._add(user.userId, _text(user))
+
+            if self.dropped > 1024 and self.dropped * 2 > len(self.userIds):
+                self._build([(userId, text) for userId, text in zip(self.userIds, self.texts) if userId != 0])
+
+    def remove(self, userIds: Iterable[int]) -> None:
+        with self.lock:
+            for userId in userIds:
+                self._drop(userId)
+
+    def _searchInitials(self, terms: list[str], limit: Optional[int]) -> list[int]:
+        # Nearly every user matches a single letter, they are listed in index order up to the page asked for
+        candidates = min((self.initials.get(term, array("I")) for term in terms), key=len)
+        starts = [" " + term for term in terms]
+        userIds: list[int] = []
+        for slot in candidates:
+            text = self.texts[slot]
+            if all(start in text for start in starts):
+                userIds.append(self.userIds[slot])
+                if limit is not None and len(userIds) >= limit:
+                    break
+        return userIds
+
+    def search(self, query: str, limit: Optional[int] = None) -> list[int]:
+        terms = query.casefold().split()
+        if len(terms) == 0:
+            return []
+
+        with self.lock:
+            if all(len(term) < 2 for term in terms):
+                return self._searchInitials(terms, limit)
+
+            # Candidates come from the shortest posting list of any term, the rest is checked on the text
+            candidates: Optional[Sequence[int]] = None
+            for term in terms:
+                if len(term) < 2:
+                    continue
+                for key in _trigrams(term if len(term) > 2 else " " + term):
+                    posting = self.postings.get(key)
+                    if posting is None:
+                        return []
+                    if candidates is None or len(posting) < len(candidates):
+                        candidates = posting
+
+            # Whole words first, then word prefixes, then matches inside a word
+            ranked: list[list[int]] = [[] for _ in range(len(terms) * 3 + 1)]
+            for slot in candidates or ():
+                text = self.texts[slot]
+                score = 0
+                for term in terms:
+                    if " " + term + " " in text:
+                        score += 3
+                    elif " " + term in text:
+                        score += 2
+                    elif len(term) > 2 and term in text:
+                        score += 1
+                    else:
+                        score = 0
+                        break
+                if score > 0:
+                    ranked[score].append(self.userIds[slot])
+                    # Later users can only rank after a full page of the best possible matches
+                    if limit is not None and len(ranked[-1]) >= limit:
+                        break
+
+        return [userId for userIds in reversed(ranked) for userId in userIds][:limit]
+
+    def __len__(self) -> int:
+        return len(self.slots)
@@ -0,0 +1,166 @@
+import json
+
+from sys import stderr
+from time import perf_counter
+from random import Random
+from datetime import datetime
+from platform import python_version
+from statistics import median, quantiles
+from argparse import ArgumentParser
+from typing import Callable, Optional, Any
+
+from LMS.args import argument_parser
+from LMS.config import CONFIG
+from LMS.db_session import Session
+from LMS.lms_types import ExecuteResult
+
+Case = Callable[[], ExecuteResult[Any]]
+
+def measure(case: Case, repeat: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = case()
+        timings.append((perf_counter() - start) * 1000)
+
+        if result[0] == False:
+            raise RuntimeError(result[1])
+
+    return {
+        "median_ms": median(timings),
+        "p95_ms": quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    }
+
+def measure_circulation(bookIds: list[int], userIds: list[int], count: int, random: Random) -> dict[str, float]:
+    # Each round borrows and returns a book that is on the shelf, so the library ends up as it started
+    borrowing = Session.searchBorrowHistoryByBookOrUserId(None, None, borrowing=True, limit=len(bookIds) * 100)
+    if borrowing[0] == False:
+        raise RuntimeError(borrowing[1])
+    onLoan = {record.bookId for record in borrowing[1]}
+    available = [bookId for bookId in bookIds if bookId not in onLoan]
+
+    borrowTotal = 0.0
+    returnTotal = 0.0
+    for _ in range(count):
+        bookId = random.choice(available)
+
+        start = perf_counter()
+        result = Session.borrowBook(bookId, random.choice(userIds))
+        borrowTotal += perf_counter() - start
+        if result[0] == False:
+            raise RuntimeError(result[1])
+
+        start = perf_counter()
+        result = Session.returnBook(bookId)
+        returnTotal += perf_counter() - start
+        if result[0] == False:
+            raise RuntimeError(result[1])
+
+    return {
+        "borrow_per_s": count / borrowTotal,
+        "return_per_s": count / returnTotal
+    }
+
+def sample_ids(fetch: Callable[[int, int], ExecuteResult[list[Any]]], key: Callable[[Any], Optional[int]]) -> list[int]:
+    result = fetch(0, 1000)
+    if result[0] == False or len(result[1]) == 0:
+        raise RuntimeError("the database is empty, run python -m benchmarks.generate_library first")
+
+    return [rowId for rowId in map(key, result[1]) if rowId is not None]
+
+def run(repeat: int, circulation: int, seed: int) -> dict[str, Any]:
+    random = Random(seed)
+    bookIds = sample_ids(Session.listBook, lambda book: book.bookId)
+    userIds = sample_ids(Session.listUser, lambda user: user.userId)
+    bookId = random.choice(bookIds)
+    userId = random.choice(userIds)
+    bookCount = Session.getBookCount()
+    if bookCount[0] == False:
+        raise RuntimeError(bookCount[1])
+    middle = bookIds[0] + bookCount[1] // 2
+
+    cases: dict[str, Case] = {
+        "listBook first page": lambda: Session.listBook(0),
+        "listBook deep page": lambda: Session.listBook(middle),
+        "searchBookByTitle": lambda: Session.searchBookByTitle("river"),
+        "searchUserByName": lambda: Session.searchUserByName("Mal", None),
+        "searchUser one letter": lambda: Session.searchUser("m"),
+        "searchUser word": lambda: Session.searchUser("malee"),
+        "searchBorrowHistory by book": lambda: Session.searchBorrowHistoryByBookOrUserId(bookId, None),
+        "searchBorrowHistory by user": lambda: Session.searchBorrowHistoryByBookOrUserId(None, userId),
+        "searchBorrowHistory borrowing": lambda: Session.searchBorrowHistoryByBookOrUserId(None, None, borrowing=True),
+        "getDashboardStats": Session.getDashboardStats,
+        "getBookCount": Session.getBookCount,
+        "getBorrowingCount": Session.getBorrowingCount,
+        "getReturnedCount": Session.getReturnedCount
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, case in cases.items():
+        results[name] = measure(case, repeat)
+        print(f"{name:<32}{results[name]['median_ms']:>10.2f}ms", file=stderr)
+
+    results["borrow/return"] = measure_circulation(bookIds, userIds, circulation, random)
+    print(f"{'borrow/return':<32}{results['borrow/return']['borrow_per_s']:>10.0f}/s", file=stderr)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": python_version(),
+        "pool_size": CONFIG.REMOTE.POOL_SIZE,
+        "results": results
+    }
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for name, metrics in report["results"].items():
+        for metric, value in metrics.items():
+            old = baseline.get("results", {}).get(name, {}).get(metric)
+            if old is None or old == 0:
+                continue
+
+            # Timings regress upwards, throughput downwards
+            change = (value - old) / old if metric.endswith("_ms") else (old - value) / old
+            if change > tolerance:
+                regressions.append(f"{name} {metric}: {old:.2f} -> {value:.2f} ({change:+.0%})")
+
+    return regressions
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--circulation", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+
+def main() -> int:
+    parser = ArgumentParser(description="Time DBSession hot paths and compare them against a baseline")
+    add_arguments(parser)
+    args = argument_parser(parser)
+
+    Session.init()
+    try:
+        report = run(args.repeat, args.circulation, args.seed)
+    finally:
+        Session.close()
+
+    text = json.dumps(report, indent=4)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+
+        for line in regressions:
+            print(f"regression: {line}", file=stderr)
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
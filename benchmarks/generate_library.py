@@ -0,0 +1,130 @@
+from sys import stderr
+from random import Random
+from datetime import datetime, timedelta
+from argparse import ArgumentParser
+from typing import Any
+
+from LMS.args import argument_parser
+from LMS.db_session import Session
+from LMS.isbn import ISBN10, ISBN13
+from LMS.lms_types import BookData, UserData, BookBorrowHistoryData, ExecuteResult
+
+WORDS = (
+    "shadow", "river", "garden", "empire", "silent", "winter", "machine", "ocean", "letters", "history",
+    "python", "night", "journey", "stone", "secret", "modern", "light", "city", "kingdom", "data",
+    "algorithm", "summer", "island", "memory", "theory", "north", "glass", "fire", "crown", "engine"
+)
+FIRST_NAMES = ("Somchai", "Anong", "Kittisak", "Malee", "Niran", "Pim", "Arthit", "Suda", "John", "Emma", "Liam", "Olivia", "Noah", "Ava")
+LAST_NAMES = ("Srisuk", "Wongsa", "Chaiyaporn", "Rattanakul", "Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis")
+PREFIXES = (None, "Mr", "Mrs", "Ms", "Dr")
+PUBLISHERS = ("Penguin", "O'Reilly", "Springer", "Nanmeebooks", "HarperCollins", "Wiley", "Se-Education")
+
+# Normalized covers are JPEGs of up to COVER_MAX_SIZE, random bytes compress about as badly
+COVER_SIZE = (40_000, 120_000)
+THUMBNAIL_SIZE = (6_000, 15_000)
+
+def _title(random: Random) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(random.randint(1, 5))).title()[:64]
+
+def make_book(random: Random, covers: float) -> BookData:
+    isbn13 = ISBN13("978" + "".join(random.choice("0123456789") for _ in range(9)))
+    hasCover = random.random() < covers
+
+    return BookData(
+        bookId=None,
+        image=random.randbytes(random.randint(*COVER_SIZE)) if hasCover else None,
+        thumbnail=random.randbytes(random.randint(*THUMBNAIL_SIZE)) if hasCover else None,
+        title=_title(random),
+        author=f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
+        isbn10=str(ISBN10(str(isbn13)[3:12])),
+        isbn13=str(isbn13),
+        publication=random.choice(PUBLISHERS),
+        description=" ".join(random.choice(WORDS) for _ in range(random.randint(20, 120)))[:1024]
+    )
+
+def make_user(random: Random, index: int) -> UserData:
+    firstName = random.choice(FIRST_NAMES)
+    lastName = random.choice(LAST_NAMES)
+
+    return UserData(
+        userId=None,
+        prefixName=random.choice(PREFIXES),
+        firstName=firstName,
+        lastName=lastName,
+        email=f"{firstName}.{lastName}.{index}@example.com".lower(),
+        phone="0" + "".join(random.choice("0123456789") for _ in range(9)),
+        address=f"{random.randint(1, 999)} {random.choice(WORDS).title()} Road"
+    )
+
+def make_history(random: Random, bookIds: list[int], userIds: list[int], years: int, loansPerDay: int, now: datetime) -> list[BookBorrowHistoryData]:
+    records: list[BookBorrowHistoryData] = []
+    onLoan: set[int] = set()
+    start = now - timedelta(days=365 * years)
+
+    for day in range(365 * years):
+        date = start + timedelta(days=day)
+        for _ in range(random.randint(loansPerDay // 2, loansPerDay * 3 // 2)):
+            borrowed = date + timedelta(seconds=random.randint(8 * 3600, 20 * 3600))
+            returned = borrowed + timedelta(days=random.randint(1, 30), seconds=random.randint(0, 86400))
+
+            bookId = random.choice(bookIds)
+            if returned > now:
+                # Still out, Borrow allows a single open loan per book
+                if bookId in onLoan:
+                    continue
+                onLoan.add(bookId)
+
+            records.append(BookBorrowHistoryData(
+                0, bookId, "", random.choice(userIds), "",
+                borrowed.replace(microsecond=0), returned.replace(microsecond=0) if returned <= now else None
+            ))
+
+    return records
+
+def _check(result: ExecuteResult[Any], what: str) -> None:
+    if result[0] == False:
+        raise RuntimeError(f"failed to add {what}: {result[1]}")
+
+def generate(books: int, users: int, years: int, loansPerDay: int, covers: float, batchSize: int, seed: int) -> None:
+    random = Random(seed)
+
+    for start in range(0, books, batchSize):
+        _check(Session.addBooks([make_book(random, covers) for _ in range(min(batchSize, books - start))]), "books")
+        print(f"\rbooks {min(start + batchSize, books)}/{books}", end="", file=stderr, flush=True)
+    print(file=stderr)
+
+    for start in range(0, users, batchSize):
+        _check(Session.addUsers([make_user(random, start + i) for i in range(min(batchSize, users - start))]), "users")
+    print(f"users {users}", file=stderr)
+
+    bookIds = [book.bookId for book in Session.listBook(0, books)[1] if book.bookId is not None] # type: ignore
+    userIds = [user.userId for user in Session.listUser(0, users)[1] if user.userId is not None] # type: ignore
+    records = make_history(random, bookIds, userIds, years, loansPerDay, datetime.now())
+    for start in range(0, len(records), batchSize):
+        _check(Session.addBorrowHistory(records[start:start + batchSize]), "borrow history")
+    print(f"borrow history {len(records)}", file=stderr)
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--loans-per-day", type=int, default=40)
+    parser.add_argument("--covers", type=float, default=0.8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+
+def main() -> int:
+    parser = ArgumentParser(description="Fill an empty database with a synthetic library")
+    add_arguments(parser)
+    args = argument_parser(parser)
+
+    Session.init()
+    try:
+        generate(args.books, args.users, args.years, args.loans_per_day, args.covers, args.batch_size, args.seed)
+    finally:
+        Session.close()
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
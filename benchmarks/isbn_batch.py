@@ -0,0 +1,105 @@
+import json
+
+from sys import stderr
+from time import perf_counter
+from random import Random
+from statistics import median
+from argparse import ArgumentParser
+from typing import Callable, Optional, Any
+
+from LMS.errors import ISBNValueError
+from LMS.isbn import ISBN10, ISBN13, check_isbn10, check_isbn13
+
+def generate(count: int, random: Random) -> tuple[list[Optional[str]], list[Optional[str]]]:
+    # Mostly valid numbers, with some wrong check digits, short values and blanks like a real catalogue
+    isbn10: list[Optional[str]] = []
+    isbn13: list[Optional[str]] = []
+    for _ in range(count):
+        isbn = ISBN13("978" + "".join(random.choice("0123456789") for _ in range(9)))
+        text13 = str(isbn)
+        text10 = str(isbn.to_isbn10())
+
+        roll = random.random()
+        if roll < 0.05:
+            text10 = text10[:9] + random.choice("0123456789X")
+            text13 = text13[:12] + random.choice("0123456789")
+        elif roll < 0.07:
+            text10 = text10[:random.randint(0, 9)]
+            text13 = text13[:random.randint(0, 12)]
+
+        isbn10.append(text10 if roll < 0.95 else None)
+        isbn13.append(text13 if roll < 0.97 else None)
+
+    return (isbn10, isbn13)
+
+def scalar_isbn10(values: list[Optional[str]]) -> list[Optional[str]]:
+    converted: list[Optional[str]] = []
+    for value in values:
+        try:
+            isbn = ISBN10(value) # type: ignore
+            converted.append(str(isbn.to_isbn13()) if len(value) == 10 and isbn.verify() else None) # type: ignore
+        except ISBNValueError:
+            converted.append(None)
+
+    return converted
+
+def scalar_isbn13(values: list[Optional[str]]) -> list[Optional[str]]:
+    converted: list[Optional[str]] = []
+    for value in values:
+        try:
+            isbn = ISBN13(value) # type: ignore
+            isbn10 = isbn.to_isbn10() if len(value) == 13 and isbn.verify() else None # type: ignore
+            converted.append(str(isbn10) if isbn10 is not None else None)
+        except ISBNValueError:
+            converted.append(None)
+
+    return converted
+
+def measure(case: Callable[[], Any], repeat: int) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        case()
+        timings.append(perf_counter() - start)
+
+    return median(timings) * 1000
+
+def run(rows: int, repeat: int, seed: int) -> dict[str, Any]:
+    isbn10, isbn13 = generate(rows, Random(seed))
+
+    # Both paths have to agree before their timings mean anything
+    if [value or None for value in check_isbn10(isbn10).converted.tolist()] != scalar_isbn10(isbn10):
+        raise RuntimeError("check_isbn10 disagrees with ISBN10")
+    if [value or None for value in check_isbn13(isbn13).converted.tolist()] != scalar_isbn13(isbn13):
+        raise RuntimeError("check_isbn13 disagrees with ISBN13")
+
+    cases: dict[str, Callable[[], Any]] = {
+        "ISBN10 scalar": lambda: scalar_isbn10(isbn10),
+        "ISBN10 batch": lambda: check_isbn10(isbn10),
+        "ISBN13 scalar": lambda: scalar_isbn13(isbn13),
+        "ISBN13 batch": lambda: check_isbn13(isbn13)
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, case in cases.items():
+        elapsed = measure(case, repeat)
+        results[name] = {"median_ms": elapsed, "rows_per_s": rows / elapsed * 1000}
+        print(f"{name:<16}{elapsed:>10.2f}ms{results[name]['rows_per_s']:>14.0f} rows/s", file=stderr)
+
+    for form in ("ISBN10", "ISBN13"):
+        print(f"{form} speedup {results[form + ' scalar']['median_ms'] / results[form + ' batch']['median_ms']:.1f}x", file=stderr)
+
+    return {"rows": rows, "results": results}
+
+def main() -> int:
+    parser = ArgumentParser(description="Compare the batch ISBN checks against the ISBN10 and ISBN13 classes")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.repeat, args.seed), indent=4))
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,63 @@
+import os
+
+from sys import argv
+from time import perf_counter
+from statistics import median
+from argparse import ArgumentParser
+from typing import Callable
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from LMS.config import CONFIG
+from LMS.ui import MainWindow_UI, BookEdit_UI, UserEdit_UI
+from LMS.ui.ui_loader import compiled_form
+
+def measure(app: QApplication, create: Callable[[], QWidget], repeat: int) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        widget = create()
+        app.processEvents()
+        timings.append(perf_counter() - start)
+
+        widget.close()
+        widget.deleteLater()
+        app.processEvents()
+
+    return median(timings) * 1000
+
+def main() -> int:
+    parser = ArgumentParser(description="Compare precompiled UI modules against runtime loadUi parsing")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if compiled_form(MainWindow_UI.DESIGNER_FILE) is None:
+        print("No compiled UI modules found, run python -m LMS.ui.build_ui first")
+        return 1
+
+    # The login dialog only shows the connection settings, nothing is connected while measuring
+    CONFIG.REMOTE.HOST = "127.0.0.1"
+    CONFIG.REMOTE.PORT = 3306
+    CONFIG.REMOTE.DATABASE = "LMS_DB"
+
+    app = QApplication(argv)
+    cases: dict[str, Callable[[], QWidget]] = {
+        "main window": MainWindow_UI,
+        "book edit dialog": lambda: BookEdit_UI(lambda data, old_data: True),
+        "user edit dialog": lambda: UserEdit_UI(lambda data, old_data: True)
+    }
+
+    print(f"{'':<20}{'loadUi':>12}{'compiled':>12}")
+    for name, create in cases.items():
+        CONFIG.LMS.USE_COMPILED_UI = False
+        parsed = measure(app, create, args.repeat)
+        CONFIG.LMS.USE_COMPILED_UI = True
+        compiled = measure(app, create, args.repeat)
+        print(f"{name:<20}{parsed:>10.1f}ms{compiled:>10.1f}ms")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -13,16 +13,28 @@ CREATE TABLE User (
     PRIMARY KEY (userId)
 ) ENGINE=InnoDB;
 
+CREATE TABLE CoverImage (
+    imageHash BINARY(32) NOT NULL,
+    image MEDIUMBLOB NOT NULL,
+    thumbnail BLOB,
+    refCount INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (imageHash)
+) ENGINE=InnoDB;
+
 CREATE TABLE Book (
     bookId INT NOT NULL AUTO_INCREMENT,
-    image MEDIUMBLOB,
+    imageHash BINARY(32),
     title VARCHAR(64) NOT NULL,
     author VARCHAR(64),
     isbn13 VARCHAR(13),
     isbn10 VARCHAR(10),
     publication VARCHAR(64),
     description VARCHAR(1024),
-    PRIMARY KEY (bookId)
+    PRIMARY KEY (bookId),
+    FOREIGN KEY (imageHash) REFERENCES CoverImage(imageHash),
+    INDEX idxBookIsbn13 (isbn13),
+    INDEX idxBookIsbn10 (isbn10),
+    FULLTEXT INDEX ftBookSearch (title, author, publication, description)
 ) ENGINE=InnoDB;
 
 CREATE TABLE BorrowHistory (
@@ -32,6 +44,9 @@ CREATE TABLE BorrowHistory (
     borrowed DATETIME NOT NULL,
     returned DATETIME DEFAULT NULL,
     PRIMARY KEY (historyId),
+    INDEX idxBorrowHistoryBookReturned (bookId, returned),
+    INDEX idxBorrowHistoryUserReturned (userId, returned),
+    INDEX idxBorrowHistoryReturned (returned),
     FOREIGN KEY (bookId) REFERENCES Book(bookId),
     FOREIGN KEY (userId) REFERENCES User(userId)
 ) ENGINE=InnoDB;
@@ -45,3 +60,26 @@ CREATE TABLE Borrow (
     FOREIGN KEY (userId) REFERENCES User(userId),
     FOREIGN KEY (historyId) REFERENCES BorrowHistory(historyId)
 ) ENGINE=InnoDB;
+
+CREATE TABLE LibraryStats (
+    statsId TINYINT NOT NULL,
+    bookCount INT NOT NULL DEFAULT 0,
+    userCount INT NOT NULL DEFAULT 0,
+    borrowingCount INT NOT NULL DEFAULT 0,
+    returnedCount INT NOT NULL DEFAULT 0,
+    allTimeBorrowedCount INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (statsId)
+) ENGINE=InnoDB;
+
+CREATE TABLE ChangeLog (
+    changeId BIGINT NOT NULL AUTO_INCREMENT,
+    tableName VARCHAR(16) NOT NULL,
+    rowId INT NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    changed TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (changeId),
+    INDEX idxChangeLogTable (tableName, changeId),
+    INDEX idxChangeLogChanged (changed)
+) ENGINE=InnoDB;
+
+INSERT INTO LibraryStats (statsId) VALUES (1);
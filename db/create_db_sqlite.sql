@@ -0,0 +1,88 @@
+-- Same tables as create_db.sql, applied by the SQLite backend when it opens an empty database file
+
+CREATE TABLE User (
+    userId INTEGER PRIMARY KEY AUTOINCREMENT,
+    prefixName VARCHAR(16),
+    firstName VARCHAR(32) NOT NULL,
+    lastName VARCHAR(32) NOT NULL,
+    email VARCHAR(64),
+    phone VARCHAR(16),
+    address VARCHAR(128)
+);
+
+CREATE TABLE CoverImage (
+    imageHash BLOB NOT NULL PRIMARY KEY,
+    image BLOB NOT NULL,
+    thumbnail BLOB,
+    refCount INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE Book (
+    bookId INTEGER PRIMARY KEY AUTOINCREMENT,
+    imageHash BLOB REFERENCES CoverImage(imageHash),
+    title VARCHAR(64) NOT NULL,
+    author VARCHAR(64),
+    isbn13 VARCHAR(13),
+    isbn10 VARCHAR(10),
+    publication VARCHAR(64),
+    description VARCHAR(1024)
+);
+
+CREATE INDEX idxBookIsbn13 ON Book (isbn13);
+CREATE INDEX idxBookIsbn10 ON Book (isbn10);
+
+-- Stands in for the FULLTEXT index ftBookSearch
+CREATE VIRTUAL TABLE BookSearch USING fts5(title, author, publication, description, content='Book', content_rowid='bookId');
+
+CREATE TRIGGER BookSearchInsert AFTER INSERT ON Book BEGIN
+    INSERT INTO BookSearch (rowid, title, author, publication, description) VALUES (new.bookId, new.title, new.author, new.publication, new.description);
+END;
+
+CREATE TRIGGER BookSearchDelete AFTER DELETE ON Book BEGIN
+    INSERT INTO BookSearch (BookSearch, rowid, title, author, publication, description) VALUES ('delete', old.bookId, old.title, old.author, old.publication, old.description);
+END;
+
+CREATE TRIGGER BookSearchUpdate AFTER UPDATE OF title, author, publication, description ON Book BEGIN
+    INSERT INTO BookSearch (BookSearch, rowid, title, author, publication, description) VALUES ('delete', old.bookId, old.title, old.author, old.publication, old.description);
+    INSERT INTO BookSearch (rowid, title, author, publication, description) VALUES (new.bookId, new.title, new.author, new.publication, new.description);
+END;
+
+CREATE TABLE BorrowHistory (
+    historyId INTEGER PRIMARY KEY AUTOINCREMENT,
+    bookId INTEGER NOT NULL REFERENCES Book(bookId),
+    userId INTEGER NOT NULL REFERENCES User(userId),
+    borrowed DATETIME NOT NULL,
+    returned DATETIME DEFAULT NULL
+);
+
+CREATE INDEX idxBorrowHistoryBookReturned ON BorrowHistory (bookId, returned);
+CREATE INDEX idxBorrowHistoryUserReturned ON BorrowHistory (userId, returned);
+CREATE INDEX idxBorrowHistoryReturned ON BorrowHistory (returned);
+
+CREATE TABLE Borrow (
+    bookId INTEGER NOT NULL PRIMARY KEY REFERENCES Book(bookId),
+    userId INTEGER NOT NULL REFERENCES User(userId),
+    historyId INTEGER NOT NULL REFERENCES BorrowHistory(historyId)
+);
+
+CREATE TABLE LibraryStats (
+    statsId INTEGER NOT NULL PRIMARY KEY,
+    bookCount INTEGER NOT NULL DEFAULT 0,
+    userCount INTEGER NOT NULL DEFAULT 0,
+    borrowingCount INTEGER NOT NULL DEFAULT 0,
+    returnedCount INTEGER NOT NULL DEFAULT 0,
+    allTimeBorrowedCount INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO LibraryStats (statsId) VALUES (1);
+
+CREATE TABLE ChangeLog (
+    changeId INTEGER PRIMARY KEY AUTOINCREMENT,
+    tableName VARCHAR(16) NOT NULL,
+    rowId INTEGER NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    changed TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idxChangeLogTable ON ChangeLog (tableName, changeId);
+CREATE INDEX idxChangeLogChanged ON ChangeLog (changed);
@@ -0,0 +1,3 @@
+USE LMS_DB;
+
+ALTER TABLE Book ADD FULLTEXT INDEX ftBookSearch (title, author, publication, description);
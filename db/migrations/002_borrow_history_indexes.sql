@@ -0,0 +1,6 @@
+USE LMS_DB;
+
+ALTER TABLE BorrowHistory
+    ADD INDEX idxBorrowHistoryBookReturned (bookId, returned),
+    ADD INDEX idxBorrowHistoryUserReturned (userId, returned),
+    ADD INDEX idxBorrowHistoryReturned (returned);
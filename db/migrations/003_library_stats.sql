@@ -0,0 +1,20 @@
+USE LMS_DB;
+
+CREATE TABLE LibraryStats (
+    statsId TINYINT NOT NULL,
+    bookCount INT NOT NULL DEFAULT 0,
+    userCount INT NOT NULL DEFAULT 0,
+    borrowingCount INT NOT NULL DEFAULT 0,
+    returnedCount INT NOT NULL DEFAULT 0,
+    allTimeBorrowedCount INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (statsId)
+) ENGINE=InnoDB;
+
+INSERT INTO LibraryStats (statsId, bookCount, userCount, borrowingCount, returnedCount, allTimeBorrowedCount) VALUES (
+    1,
+    (SELECT COUNT(*) FROM Book),
+    (SELECT COUNT(*) FROM User),
+    (SELECT COUNT(*) FROM Borrow),
+    (SELECT COUNT(*) FROM BorrowHistory WHERE returned IS NOT NULL),
+    (SELECT COUNT(*) FROM BorrowHistory)
+);
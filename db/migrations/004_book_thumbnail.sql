@@ -0,0 +1,3 @@
+USE LMS_DB;
+
+ALTER TABLE Book ADD COLUMN thumbnail BLOB AFTER image;
@@ -0,0 +1,13 @@
+USE LMS_DB;
+
+CREATE TABLE CoverImage (
+    imageHash BINARY(32) NOT NULL,
+    image MEDIUMBLOB NOT NULL,
+    thumbnail BLOB,
+    refCount INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (imageHash)
+) ENGINE=InnoDB;
+
+ALTER TABLE Book
+    ADD COLUMN imageHash BINARY(32) AFTER bookId,
+    ADD FOREIGN KEY (imageHash) REFERENCES CoverImage(imageHash);
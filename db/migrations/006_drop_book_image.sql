@@ -0,0 +1,5 @@
+USE LMS_DB;
+
+ALTER TABLE Book
+    DROP COLUMN image,
+    DROP COLUMN thumbnail;
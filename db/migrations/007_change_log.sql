@@ -0,0 +1,12 @@
+USE LMS_DB;
+
+CREATE TABLE ChangeLog (
+    changeId BIGINT NOT NULL AUTO_INCREMENT,
+    tableName VARCHAR(16) NOT NULL,
+    rowId INT NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+    changed TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (changeId),
+    INDEX idxChangeLogTable (tableName, changeId),
+    INDEX idxChangeLogChanged (changed)
+) ENGINE=InnoDB;
@@ -0,0 +1,6 @@
+USE LMS_DB;
+
+-- Not unique, every copy of an edition is its own Book row with the same ISBN
+ALTER TABLE Book
+    ADD INDEX idxBookIsbn13 (isbn13),
+    ADD INDEX idxBookIsbn10 (isbn10);